@@ -0,0 +1,65 @@
+from benchmarks.timing import best_of
+from frontend.parser import Parser
+from runtime.engines import ENGINES, create_env, execute
+from util.printer import print
+
+"""
+Arithmetic benchmark:
+    `python -m benchmarks.arith_bench` assigns deeply nested arithmetic
+    expressions, ((((x + x) * y) - 7) / 3) % 1000 ... with a BinaryExpr per
+    level, to a variable on every engine and reports nanoseconds per operator.
+
+    The script is parsed once and run `rounds` times, each run in a fresh
+    environment, the best run counts. The compiled engines compile
+    recursively, so the nesting stays well below the recursion limit and
+    there are many statements instead.
+"""
+
+ARITH_BENCH_DEPTH = 200
+ARITH_BENCH_STATEMENTS = 500
+
+# Applied in turn, one per nesting level. The modulo keeps the value finite
+# and the divisor is never zero.
+ARITH_BENCH_STEPS = ("+ x", "* y", "- 7", "/ 3", "% 1000")
+
+
+def arith_bench_source(
+    depth: int = ARITH_BENCH_DEPTH, statements: int = ARITH_BENCH_STATEMENTS
+) -> str:
+    steps = ARITH_BENCH_STEPS
+    tail = "".join(f" {steps[level % len(steps)]})" for level in range(depth))
+    assignment = f"r = {'(' * depth}x{tail};"
+    return "\n".join(
+        ["let x = 3;", "let y = 5;", "let r = 0;"] + [assignment] * statements
+    )
+
+
+def arith_benchmark(engine: str, rounds: int = 5) -> tuple[float, float]:
+    # Best time of `rounds` runs in seconds, and the value of r.
+    program = Parser().produce_ast(arith_bench_source())
+
+    def run(env):
+        nonlocal result
+        result = execute(program, env, engine)
+
+    result = None
+    best = best_of(rounds, run, setup=lambda: create_env(engine))
+    return best, result.value
+
+
+def arith_bench():
+    operators = ARITH_BENCH_DEPTH * ARITH_BENCH_STATEMENTS
+    print(
+        f"{ARITH_BENCH_STATEMENTS} expressions of {ARITH_BENCH_DEPTH} nested "
+        f"binary operators, {operators} in all"
+    )
+    for engine in ENGINES:
+        seconds, result = arith_benchmark(engine)
+        print(
+            f"{engine:<8} {seconds * 1000:.1f} ms: "
+            f"{seconds / operators * 1e9:.0f} ns per operator, result {result}"
+        )
+
+
+if __name__ == "__main__":
+    arith_bench()
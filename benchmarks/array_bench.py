@@ -0,0 +1,103 @@
+from benchmarks.timing import best_of
+from frontend.parser import Parser
+from runtime.engines import ENGINES, create_env, execute
+from runtime.eval.expressions import eval_numeric_binary_expr
+from runtime.values import MK_ARRAY, MK_NUMBER, numpy_module
+from util.printer import print
+
+"""
+Array benchmark:
+    `python -m benchmarks.array_bench` evaluates ARRAY_BENCH_EXPRESSION on two
+    arrays of a million elements, declared as `a` and `b` before the run, on
+    every engine and reports elements per second.
+
+    The Python-loop equivalent is the same arithmetic with a NumberVal per
+    element, what the script would cost with arrays as lists of numbers:
+    eval_numeric_binary_expr for every operator and element, without any
+    evaluator overhead on top. Its results are compared with the engines'.
+"""
+
+ARRAY_BENCH_ELEMENTS = 1_000_000
+ARRAY_BENCH_EXPRESSION = "a * b + a / 3 - b % 7"
+
+
+def array_bench_inputs(elements: int) -> tuple[list[float], list[float]]:
+    # b is never zero, so it could be divided by as well.
+    a = [float(i) for i in range(elements)]
+    b = [float(i % 100 + 1) for i in range(elements)]
+    return a, b
+
+
+def python_loop(a: list, b: list) -> list:
+    # ARRAY_BENCH_EXPRESSION one element at a time, a and b hold NumberVals.
+    three, seven = MK_NUMBER(3.0), MK_NUMBER(7.0)
+    return [
+        eval_numeric_binary_expr(
+            eval_numeric_binary_expr(
+                eval_numeric_binary_expr(x, y, "*"),
+                eval_numeric_binary_expr(x, three, "/"),
+                "+",
+            ),
+            eval_numeric_binary_expr(y, seven, "%"),
+            "-",
+        )
+        for x, y in zip(a, b)
+    ]
+
+
+def array_benchmark(engine: str, elements: int, rounds: int = 5) -> tuple[float, list]:
+    # Best time of `rounds` runs in seconds, and the result as floats.
+    a, b = array_bench_inputs(elements)
+    program = Parser().produce_ast(ARRAY_BENCH_EXPRESSION)
+
+    def inputs():
+        env = create_env(engine)
+        env.declare_var("a", MK_ARRAY(a), True)
+        env.declare_var("b", MK_ARRAY(b), True)
+        return env
+
+    def run(env):
+        nonlocal result
+        result = execute(program, env, engine)
+
+    result = None
+    best = best_of(rounds, run, setup=inputs)
+    return best, result.elements.tolist()
+
+
+def python_loop_benchmark(elements: int, rounds: int = 3) -> tuple[float, list]:
+    a, b = array_bench_inputs(elements)
+    a = [MK_NUMBER(x) for x in a]
+    b = [MK_NUMBER(y) for y in b]
+
+    def run():
+        nonlocal result
+        result = python_loop(a, b)
+
+    result = None
+    best = best_of(rounds, run)
+    return best, [number.value for number in result]
+
+
+def array_bench(elements: int = ARRAY_BENCH_ELEMENTS):
+    backend = "numpy" if numpy_module() else "array('d')"
+    print(f"{ARRAY_BENCH_EXPRESSION} on {elements} elements, {backend} buffers")
+
+    loopTime, expected = python_loop_benchmark(elements)
+    print(
+        f"{'loop':<8} {loopTime * 1000:.1f} ms: "
+        f"{elements / loopTime / 1e6:.2f}M elements/s"
+    )
+
+    for engine in ENGINES:
+        seconds, result = array_benchmark(engine, elements)
+        print(
+            f"{engine:<8} {seconds * 1000:.1f} ms: "
+            f"{elements / seconds / 1e6:.2f}M elements/s, "
+            f"{loopTime / seconds:.0f}x the loop"
+            + ("" if result == expected else ", [bold red]results differ[/bold red]")
+        )
+
+
+if __name__ == "__main__":
+    array_bench()
@@ -0,0 +1,92 @@
+import asyncio
+import gc
+import sys
+import time
+
+from benchmarks.engine_bench import engine_bench_source
+from benchmarks.timing import best_of
+from frontend.parser import Parser
+from runtime.async_interpreter import DEFAULT_STEP_BUDGET, evaluate_async
+from runtime.engines import create_env, execute
+from util.printer import print
+
+"""
+Async benchmark:
+    `python -m benchmarks.async_bench` runs a script of ASYNC_BENCH_STATEMENTS
+    arithmetic declarations with the synchronous tree-walker and with
+    evaluate_async at each of ASYNC_BENCH_BUDGETS step budgets, and one that
+    never yields, the best of `rounds` each in a fresh environment.
+
+    It then runs the script with the default budget next to a task that
+    only yields back to the loop, and reports the longest the loop went
+    without getting to run it, what every other connection of the server
+    waits at most for one script.
+"""
+
+ASYNC_BENCH_STATEMENTS = 15_000
+ASYNC_BENCH_BUDGETS = (100, 1000, 10_000)
+
+
+def fresh_env():
+    env = create_env()
+    gc.collect()  # not the last round's garbage while timed
+    return env
+
+
+async def longest_stall(program, env, step_budget: int) -> float:
+    # The longest time in seconds the loop could not run another task while
+    # `program` was evaluated.
+    stall = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal stall
+        last = time.perf_counter()
+        while not done:
+            await asyncio.sleep(0)
+            now = time.perf_counter()
+            stall = max(stall, now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    await evaluate_async(program, env, step_budget)
+    done = True
+    await task
+    return stall
+
+
+def async_bench(rounds: int = 7):
+    program = Parser().produce_ast(engine_bench_source(ASYNC_BENCH_STATEMENTS))
+    print(f"{ASYNC_BENCH_STATEMENTS} arithmetic declarations, best of {rounds}")
+
+    sync = best_of(rounds, lambda env: execute(program, env), setup=fresh_env)
+    print(f"{'sync evaluate':<22} {sync * 1000:.1f} ms")
+
+    loop = asyncio.new_event_loop()
+    try:
+        budgets = [(f"budget {budget}", budget) for budget in ASYNC_BENCH_BUDGETS]
+        for name, budget in budgets + [("never yields", sys.maxsize)]:
+            seconds = best_of(
+                rounds,
+                lambda env: loop.run_until_complete(
+                    evaluate_async(program, env, budget)
+                ),
+                setup=fresh_env,
+            )
+            print(
+                f"{f'async, {name}':<22} {seconds * 1000:.1f} ms ({seconds / sync:.2f}x)"
+            )
+
+        stall = loop.run_until_complete(
+            longest_stall(program, fresh_env(), DEFAULT_STEP_BUDGET)
+        )
+        print(
+            f"longest event loop stall with budget {DEFAULT_STEP_BUDGET}: "
+            f"{stall * 1000:.2f} ms"
+        )
+    finally:
+        loop.close()
+
+
+if __name__ == "__main__":
+    async_bench()
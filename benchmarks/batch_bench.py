@@ -0,0 +1,77 @@
+import contextlib
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.member_bench import member_bench_source
+from benchmarks.timing import MAIN, best_of
+from runtime.batch import run_batch
+from util.printer import print
+
+"""
+Batch benchmark:
+    `python -m benchmarks.batch_bench` writes BATCH_BENCH_FILES small config
+    scripts to a temporary directory and times `--batch` over them with each
+    of BATCH_BENCH_WORKERS worker processes, the best of `rounds`. The JSON
+    lines go to /dev/null.
+
+    Against that, it times `main.py --file` in a new process for the first
+    BATCH_BENCH_SAMPLES files and extrapolates to all of them, what running
+    the files one by one from a shell would take.
+"""
+
+BATCH_BENCH_FILES = 2000
+BATCH_BENCH_SAMPLES = 10
+BATCH_BENCH_WORKERS = (1, 2, 4)
+
+
+def write_scripts(directory: str, files: int = BATCH_BENCH_FILES) -> list[str]:
+    # 22 statements each, a few objects and sums of their properties.
+    source, _ = member_bench_source(objects=10, statements=12)
+    paths = []
+    for i in range(files):
+        path = os.path.join(directory, f"config{i:05}.txt")
+        with open(path, "w") as file:
+            file.write(source)
+        paths.append(path)
+    return paths
+
+
+def batch_benchmark(directory: str, workers: int, rounds: int = 3) -> float:
+    # Best time of `rounds` batch runs over `directory` in seconds.
+    def batch():
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            if not run_batch(directory, workers=workers):
+                raise RuntimeError("a batch benchmark script failed")
+
+    return best_of(rounds, batch)
+
+
+def per_process(main: str, paths: list[str]) -> float:
+    # Seconds per `main.py --file` process, `main` is the path of main.py.
+    start = time.perf_counter()
+    for path in paths:
+        subprocess.run(
+            [sys.executable, main, "--file", path, "--no-cache"],
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+    return (time.perf_counter() - start) / len(paths)
+
+
+def batch_bench(rounds: int = 3):
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_scripts(directory)
+        print(f"{len(paths)} config scripts of 22 statements, on {os.cpu_count()} CPUs")
+
+        seconds = per_process(MAIN, paths[:BATCH_BENCH_SAMPLES]) * len(paths)
+        print(f"{'--file per script':<20} {seconds:.1f} s (extrapolated)")
+        for workers in BATCH_BENCH_WORKERS:
+            seconds = batch_benchmark(directory, workers, rounds)
+            print(f"{f'--workers {workers}':<20} {seconds:.2f} s")
+
+
+if __name__ == "__main__":
+    batch_bench()
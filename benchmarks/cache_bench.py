@@ -0,0 +1,80 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.member_bench import member_bench_source
+from benchmarks.timing import MAIN, best_of
+from frontend.ast_cache import cache_path
+from util.printer import print
+
+"""
+AST cache benchmark:
+    `python -m benchmarks.cache_bench` times `main.py --file` on a script of
+    CACHE_BENCH_STATEMENTS statements, or on its own `--file`, in a new
+    process each time, the way a user runs it:
+        - cold:      no cached AST, parse and write the cache
+        - warm:      load the cached AST (frontend/ast_cache)
+        - no-cache:  `--no-cache`, always parse
+    Every figure is the best of `rounds` wall-clock times, process startup
+    included.
+"""
+
+CACHE_BENCH_STATEMENTS = 15_000
+
+
+def cache_bench_source(statements: int = CACHE_BENCH_STATEMENTS) -> str:
+    # Declarations only, so the script runs without errors.
+    source, _ = member_bench_source(statements=statements)
+    return source
+
+
+def remove_cache(filename: str):
+    try:
+        os.remove(cache_path(filename))
+    except FileNotFoundError:
+        pass
+
+
+def cache_benchmark(main: str, filename: str, rounds: int = 5) -> dict:
+    def run_file(*flags):
+        subprocess.run(
+            [sys.executable, main, "--file", filename, *flags],
+            stdout=subprocess.DEVNULL,
+            check=True,
+        )
+
+    cold = best_of(rounds, lambda _: run_file(), setup=lambda: remove_cache(filename))
+    run_file()  # cached again
+    warm = best_of(rounds, run_file)
+    no_cache = best_of(rounds, lambda: run_file("--no-cache"))
+    return {
+        "cold_ms": cold * 1000,
+        "warm_ms": warm * 1000,
+        "no_cache_ms": no_cache * 1000,
+    }
+
+
+def cache_bench(filename: str | None = None, rounds: int = 5):
+    # main.py runs in a new process for every figure.
+    with tempfile.TemporaryDirectory() as directory:
+        if filename is None:
+            filename = os.path.join(directory, "cache_bench.txt")
+            with open(filename, "w") as file:
+                file.write(cache_bench_source())
+
+        size = os.path.getsize(filename)
+        print(f"main.py --file on {size / 1000:.0f} KB, best of {rounds}")
+        stats = cache_benchmark(MAIN, filename, rounds)
+        print(f"{'cold':<9} {stats['cold_ms']:.0f} ms (parse and write the cache)")
+        print(f"{'warm':<9} {stats['warm_ms']:.0f} ms (cache hit)")
+        print(f"{'no-cache':<9} {stats['no_cache_ms']:.0f} ms")
+
+
+if __name__ == "__main__":
+    flag_parser = argparse.ArgumentParser(description="AST cache benchmark.")
+    flag_parser.add_argument(
+        "--file", type=str, help="Time this script instead of a generated one"
+    )
+    cache_bench(flag_parser.parse_args().file)
@@ -0,0 +1,128 @@
+import argparse
+
+from benchmarks.timing import best_of
+from frontend.parser import Parser
+from runtime.engines import ENGINES, create_env, prepare
+from runtime.memo import CALL_MEMO
+from runtime.values import MK_NATIVE_FN, MK_NUMBER
+from util.printer import print
+
+"""
+Call benchmark:
+    `python -m benchmarks.call_bench` calls a trivial native, `nop`, which
+    returns its argument, from CALL_BENCH_SITES `r = nop(x)` statements on
+    every engine and reports calls per second.
+
+    Programs are straight-line code, so a call site is only reached again
+    when its program reruns in the same environment, like a script an
+    embedder keeps calling into. The program is compiled once and run
+    CALL_BENCH_RUNS times in one environment after a first, warming run, so
+    every call goes through a warm callee cache. The best of `rounds` counts.
+
+    `python -m benchmarks.call_bench memo` runs the same way, calling a pure
+    native that does some work with MEMO_BENCH_ARGUMENTS different arguments,
+    with CALL_MEMO on and with its capacity set to 0.
+"""
+
+CALL_BENCH_SITES = 1000
+CALL_BENCH_RUNS = 100
+
+# Distinct arguments the memo bench's call sites pass, in turn.
+MEMO_BENCH_ARGUMENTS = 50
+
+
+def native_nop(args, env):
+    return args[0]
+
+
+def native_work(args, env):
+    # A lookup worth memoizing: the sum of the divisors of n, by trial division.
+    n = int(args[0].value)
+    return MK_NUMBER(float(sum(d for d in range(1, n + 1) if n % d == 0)))
+
+
+def call_bench_source(sites: int = CALL_BENCH_SITES) -> str:
+    # Only assignments, rerunning it does not declare anything twice.
+    return "\n".join(["r = nop(x)"] * sites)
+
+
+def memo_bench_source(sites: int = CALL_BENCH_SITES) -> str:
+    return "\n".join(
+        f"r = work({100 + i % MEMO_BENCH_ARGUMENTS})" for i in range(sites)
+    )
+
+
+def call_benchmark(
+    engine: str, rounds: int = 5, source: str | None = None, fn=None
+) -> float:
+    # Best time of `rounds` x CALL_BENCH_RUNS runs in seconds. `fn` is the
+    # NativeFnVal declared as the source's callee, nop by default.
+    program = Parser().produce_ast(source or call_bench_source())
+    env = create_env(engine)
+    fn = fn or MK_NATIVE_FN(native_nop, "nop")
+    env.declare_var(fn.name, fn, True)
+    env.declare_var("x", MK_NUMBER(1.0), True)
+    env.declare_var("r", MK_NUMBER(0.0), False)
+    run = prepare(program, env, engine)
+    run()
+
+    def runs():
+        for _ in range(CALL_BENCH_RUNS):
+            run()
+
+    return best_of(rounds, runs)
+
+
+def call_bench():
+    calls = CALL_BENCH_SITES * CALL_BENCH_RUNS
+    print(
+        f"{CALL_BENCH_SITES} call sites run {CALL_BENCH_RUNS} times, "
+        f"{calls} calls of a native returning its argument"
+    )
+    for engine in ENGINES:
+        seconds = call_benchmark(engine)
+        print(
+            f"{engine:<8} {seconds * 1000:.1f} ms: "
+            f"{calls / seconds / 1e6:.2f}M calls/s, "
+            f"{seconds / calls * 1e9:.0f} ns per call"
+        )
+
+
+def memo_bench():
+    calls = CALL_BENCH_SITES * CALL_BENCH_RUNS
+    source = memo_bench_source()
+    work = MK_NATIVE_FN(native_work, "work", pure=True)
+    print(
+        f"{CALL_BENCH_SITES} call sites run {CALL_BENCH_RUNS} times, {calls} calls "
+        f"of a pure native with {MEMO_BENCH_ARGUMENTS} different arguments"
+    )
+    capacity = CALL_MEMO.capacity
+    for engine in ENGINES:
+        try:
+            CALL_MEMO.resize(0)
+            unmemoized = call_benchmark(engine, source=source, fn=work)
+            CALL_MEMO.resize(capacity)
+            before = CALL_MEMO.stats()
+            memoized = call_benchmark(engine, source=source, fn=work)
+        finally:
+            CALL_MEMO.resize(capacity)
+        stats = CALL_MEMO.stats()
+        hits = stats["hits"] - before["hits"]
+        lookups = hits + stats["misses"] - before["misses"]
+        print(
+            f"{engine:<8} {unmemoized / calls * 1e9:.0f} ns per call, "
+            f"memoized {memoized / calls * 1e9:.0f} ns "
+            f"({unmemoized / memoized:.1f}x), {hits / lookups:.1%} hits"
+        )
+    print(f"memo: {CALL_MEMO.stats()}")
+
+
+if __name__ == "__main__":
+    flag_parser = argparse.ArgumentParser(description="Native call benchmarks.")
+    flag_parser.add_argument(
+        "bench", nargs="?", choices=("call", "memo"), default="call"
+    )
+    if flag_parser.parse_args().bench == "memo":
+        memo_bench()
+    else:
+        call_bench()
@@ -0,0 +1,70 @@
+import gc
+
+from benchmarks.member_bench import bench_name
+from benchmarks.timing import best_of
+from frontend.parser import Parser
+from runtime.engines import ENGINES, create_env, prepare
+from util.printer import print
+
+"""
+Engine benchmark:
+    `python -m benchmarks.engine_bench` runs an arithmetic heavy script of
+    ENGINE_BENCH_STATEMENTS declarations on every engine and reports the
+    one-off cost of compiling it for the engine, prepare(), against the cost
+    of running it, both the best of `rounds`. The tree-walker has nothing
+    to compile, the compiled engines pay for compiling once a program runs.
+
+    Every run is in a fresh environment, the script declares its variables.
+    The AST is parsed again for every engine, the slots engine writes its
+    resolved slots onto it.
+"""
+
+ENGINE_BENCH_STATEMENTS = 4000
+
+
+def engine_bench_source(statements: int = ENGINE_BENCH_STATEMENTS) -> str:
+    lines = ["let x = 3;", "let y = 5;"]
+    for i in range(statements):
+        lines.append(
+            f"let {bench_name('v', i)} = (x + {i}) * (y - {i % 7}) / ({i % 5} + 1)"
+            f" + x % ({i % 3} + 2) - y * 2;"
+        )
+    return "\n".join(lines)
+
+
+def engine_benchmark(engine: str, rounds: int = 7) -> dict:
+    source = engine_bench_source()
+    program = Parser().produce_ast(source)
+
+    compile_seconds = best_of(
+        rounds,
+        lambda env: prepare(program, env, engine),
+        setup=lambda: create_env(engine),
+    )
+
+    def compiled():
+        run = prepare(program, create_env(engine), engine)
+        # The last round's compiled program is garbage now, the cycle
+        # collector must not go through it while the run is timed.
+        gc.collect()
+        return run
+
+    run_seconds = best_of(rounds, lambda run: run(), setup=compiled)
+    return {"compile_ms": compile_seconds * 1000, "run_ms": run_seconds * 1000}
+
+
+def engine_bench(rounds: int = 7):
+    print(f"{ENGINE_BENCH_STATEMENTS} arithmetic declarations, best of {rounds}")
+    tree = None
+    for engine in ENGINES:
+        stats = engine_benchmark(engine, rounds)
+        tree = tree or stats
+        print(
+            f"{engine:<8} run {stats['run_ms']:.1f} ms "
+            f"({tree['run_ms'] / stats['run_ms']:.2f}x the tree-walker), "
+            f"compile {stats['compile_ms']:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    engine_bench()
@@ -0,0 +1,98 @@
+import time
+import tracemalloc
+
+from benchmarks.member_bench import bench_name
+from benchmarks.timing import best_of
+from frontend.parser import Parser
+from runtime.engines import create_env, execute
+from runtime.environment import Environment
+from util.printer import print
+
+"""
+Fork benchmark:
+    `python -m benchmarks.fork_bench` builds a global environment with a prelude of
+    FORK_BENCH_BINDINGS declarations, then compares three ways of giving
+    each request its own copy of it:
+        - rerun:  run the prelude again in a fresh environment
+        - copy:   copy the environment's dicts, the cheapest full snapshot
+        - fork:   Environment.fork()
+    It reports time and memory per copy, and what reading prelude names
+    costs through a fork's shared layer compared to the original.
+"""
+
+FORK_BENCH_BINDINGS = 10_000
+FORK_BENCH_COPIES = 100
+FORK_BENCH_READS = 1000
+
+
+def prelude_source(bindings: int = FORK_BENCH_BINDINGS) -> str:
+    return "\n".join(
+        f"{'const' if i % 2 else 'let'} {bench_name('p', i)} = {i};"
+        for i in range(bindings)
+    )
+
+
+def copy_env(env: Environment) -> Environment:
+    # `env` must not have been forked, its bindings are all in its own dicts.
+    copy = Environment(quota=env.quota)
+    copy._variables = dict(env._variables)
+    copy._constants = set(env._constants)
+    return copy
+
+
+def per_copy(make, copies: int = FORK_BENCH_COPIES) -> tuple[float, float]:
+    # (seconds, bytes) per copy made by `make`, the copies are kept alive
+    # until measured.
+    made = []
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(copies):
+        made.append(make())
+    seconds = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds / copies, size / copies
+
+
+def read_time(program, make, rounds: int = 7) -> float:
+    # Best time of `rounds` runs, each in a new environment made by `make`.
+    return best_of(rounds, lambda env: execute(program, env), setup=make)
+
+
+def fork_bench(bindings: int = FORK_BENCH_BINDINGS):
+    prelude = Parser().produce_ast(prelude_source(bindings))
+
+    def rerun() -> Environment:
+        env = create_env()
+        execute(prelude, env)
+        return env
+
+    base = rerun()  # copied
+    shared = rerun()  # forked
+    print(f"prelude of {bindings} bindings")
+    for name, make in (
+        ("rerun", rerun),
+        ("copy", lambda: copy_env(base)),
+        ("fork", shared.fork),
+    ):
+        # Rerunning is slow enough that a few copies do.
+        seconds, size = per_copy(make, 10 if name == "rerun" else FORK_BENCH_COPIES)
+        print(f"{name:<6} {seconds * 1e6:>10.1f} us {size / 1024:>9.1f} KiB per copy")
+
+    # Every read goes to the prelude, through one shared layer in the fork.
+    reads = Parser().produce_ast(
+        "\n".join(
+            f"let {bench_name('r', i)} = {bench_name('p', i * 7 % bindings)};"
+            for i in range(FORK_BENCH_READS)
+        )
+    )
+    flat = read_time(reads, lambda: copy_env(base))
+    forked = read_time(reads, shared.fork)
+    print(
+        f"reading prelude names: {flat / FORK_BENCH_READS * 1e9:.0f} ns per "
+        f"declaration in a copy, {forked / FORK_BENCH_READS * 1e9:.0f} ns in a fork"
+    )
+
+
+if __name__ == "__main__":
+    fork_bench()
@@ -0,0 +1,74 @@
+from benchmarks.timing import best_of
+from frontend.parser import Parser
+from runtime.engines import ENGINES, create_env, execute
+from util.printer import print
+
+"""
+Member benchmark:
+    `python -m benchmarks.member_bench` runs an object heavy script, many
+    objects built from a few literals and sums of their properties, on every
+    engine and reports property reads per second.
+
+    The script is parsed once and run `rounds` times, each run in a fresh
+    environment, the best run counts. Programs are straight-line code, so a
+    MemberExpr is read once per run, its inline cache is warm from the second
+    run on, like for a script the server runs again from its AST cache.
+"""
+
+MEMBER_BENCH_OBJECTS = 200
+MEMBER_BENCH_STATEMENTS = 5000
+
+# Keys of the object literals, objects made from either order share shapes.
+MEMBER_BENCH_KEYS = ("x", "y", "z", "w")
+
+# Identifiers are letters only, variable numbers are spelt with these.
+DIGIT_LETTERS = str.maketrans("0123456789", "abcdefghij")
+
+
+def bench_name(prefix: str, number: int) -> str:
+    return prefix + str(number).translate(DIGIT_LETTERS)
+
+
+def member_bench_source(
+    objects: int = MEMBER_BENCH_OBJECTS, statements: int = MEMBER_BENCH_STATEMENTS
+) -> tuple[str, int]:
+    # Returns the script and how many property reads one run does.
+    lines = []
+    for i in range(objects):
+        keys = MEMBER_BENCH_KEYS if i % 2 == 0 else MEMBER_BENCH_KEYS[::-1]
+        fields = ", ".join(f"{key}: {i + n}" for n, key in enumerate(keys))
+        lines.append(f"const {bench_name('o', i)} = {{ {fields} }};")
+
+    reads = 0
+    for i in range(statements):
+        # A fixed, spread out pick of objects for every statement.
+        a, b, c, d = (bench_name("o", (i * 7 + n * 31) % objects) for n in range(4))
+        lines.append(f"let {bench_name('s', i)} = {a}.x + {b}.y * {c}.z - {d}.w;")
+        reads += 4
+    return "\n".join(lines), reads
+
+
+def member_benchmark(engine: str, rounds: int = 7) -> dict:
+    source, reads = member_bench_source()
+    program = Parser().produce_ast(source)
+
+    best = best_of(
+        rounds,
+        lambda env: execute(program, env, engine),
+        setup=lambda: create_env(engine),
+    )
+
+    return {"reads": reads, "ms": best * 1000, "reads_per_second": reads / best}
+
+
+def member_bench(rounds: int = 7):
+    for engine in ENGINES:
+        stats = member_benchmark(engine, rounds)
+        print(
+            f"{engine:<8} {stats['reads']} property reads in {stats['ms']:.1f} ms: "
+            f"{stats['reads_per_second'] / 1000:.0f}k reads/s"
+        )
+
+
+if __name__ == "__main__":
+    member_bench()
@@ -0,0 +1,244 @@
+import argparse
+import re
+import time
+import tracemalloc
+from collections import deque
+
+from benchmarks.timing import best_of
+from frontend.incremental import IncrementalParser
+from frontend.lexer import tokenize, tokenize_stream
+from frontend.parser import Parser
+from frontend.syntax_tree import Stmt
+from util.printer import print
+
+"""
+Parse benchmark:
+    `python -m benchmarks.parse_bench` lexes and parses a sample program,
+    `--file` benchmarks a script instead, and reports throughput in tokens per
+    second for the lexer alone, the parser alone (over already lexed tokens)
+    and both together, the way produce_ast streams tokens from the lexer.
+
+    Short sources are repeated until there are at least MIN_TOKENS tokens, so
+    the timings are not dominated by timer resolution. Every measurement is
+    the best of `rounds` runs, the machine's noise only ever adds time.
+
+    `python -m benchmarks.parse_bench reparse` times one-character edits (a
+    digit typed into, then deleted from a number) near the start, middle and
+    end of a source of at least REPARSE_LINES lines, reparsed by
+    frontend/incremental, against parsing the whole source once.
+
+    `python -m benchmarks.parse_bench lex` lexes the sample program, or
+    `--file`, repeated to each of LEX_BENCH_SIZES and reports the lexer's
+    throughput in MB/s, which stays about flat as the source grows now that
+    the lexer walks it with a cursor.
+
+    `python -m benchmarks.parse_bench memory` parses the sample program, or
+    `--file`, repeated to each of PARSE_MEMORY_SIZES under tracemalloc, and
+    reports the peak memory while parsing against what the resulting AST
+    retains. The parser streams tokens from the lexer, so the two are about
+    the same. The AST's nodes are counted to give the retained bytes per node,
+    their strings, floats and lists included.
+"""
+
+MIN_TOKENS = 100_000
+REPARSE_LINES = 50_000
+
+# Source sizes, in bytes, the lexer benchmark lexes.
+LEX_BENCH_SIZES = (1_000, 100_000, 1_000_000, 10_000_000)
+
+# Source sizes, in bytes, the parse memory benchmark parses.
+PARSE_MEMORY_SIZES = (10_000, 100_000, 1_000_000)
+
+# Where the benchmark edits, as fractions of the source's length.
+REPARSE_EDITS = {"start": 0.0, "middle": 0.5, "end": 0.999}
+
+PARSE_BENCH_SOURCE = """let foo = 40 / 2;
+const obj = { x: 100, y: 200, foo: foo, complex: { bar: true, }, };
+foo = obj.foo(bar(x, y)) + 5;
+foo = foo * 3 + 5 - (foo % 7);
+let z = a * b + c * d - e / f + g % h - (i + j) * k;
+"""
+
+
+def parse_benchmark(source: str, rounds: int = 7) -> dict:
+    lexed = tokenize(source)
+    if len(lexed) < MIN_TOKENS:
+        # Each copy adds all its tokens but the EOF.
+        copies = -(-MIN_TOKENS // max(len(lexed) - 1, 1))
+        source = "\n".join([source] * copies)
+        lexed = tokenize(source)
+    tokens = len(lexed)
+
+    lex_seconds = best_of(rounds, lambda: tokenize(source))
+    parse_seconds = best_of(rounds, lambda: Parser().produce_ast_from_tokens(lexed))
+    total_seconds = best_of(rounds, lambda: Parser().produce_ast(source))
+
+    return {
+        "tokens": tokens,
+        "lex_tokens_per_second": tokens / lex_seconds,
+        "parse_tokens_per_second": tokens / parse_seconds,
+        "total_tokens_per_second": tokens / total_seconds,
+        "total_ms": total_seconds * 1000,
+    }
+
+
+def parse_bench(filename: str | None = None, rounds: int = 7):
+    if filename is None:
+        source = PARSE_BENCH_SOURCE
+    else:
+        with open(filename, "r") as file:
+            source = file.read()
+
+    stats = parse_benchmark(source, rounds)
+    print(
+        f"{stats['tokens']} tokens in {stats['total_ms']:.1f} ms: "
+        f"{stats['total_tokens_per_second'] / 1000:.0f}k tokens/s "
+        f"(lexer {stats['lex_tokens_per_second'] / 1000:.0f}k tokens/s, "
+        f"parser {stats['parse_tokens_per_second'] / 1000:.0f}k tokens/s)"
+    )
+
+
+def repeat_to(source: str, size: int) -> str:
+    # Whole copies of `source`, at least `size` characters of them.
+    return "\n".join([source] * -(-size // (len(source) + 1)))
+
+
+def lex_benchmark(source: str, rounds: int = 3) -> dict:
+    # Tokens are dropped as they are made, a 10 MB source's would not fit
+    # in memory as Tokens.
+    seconds = best_of(rounds, lambda: deque(tokenize_stream(source), maxlen=0))
+    return {
+        "bytes": len(source),
+        "ms": seconds * 1000,
+        "mb_per_second": len(source) / seconds / 1e6,
+    }
+
+
+def lex_bench(filename: str | None = None, rounds: int = 3):
+    if filename is None:
+        source = PARSE_BENCH_SOURCE
+    else:
+        with open(filename, "r") as file:
+            source = file.read()
+
+    for size in LEX_BENCH_SIZES:
+        stats = lex_benchmark(repeat_to(source, size), rounds)
+        print(
+            f"{stats['bytes'] / 1000:>8.0f} KB in {stats['ms']:.1f} ms: "
+            f"{stats['mb_per_second']:.2f} MB/s"
+        )
+
+
+def parse_memory_benchmark(source: str) -> dict:
+    tracemalloc.start()
+    program = Parser().produce_ast(source)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "bytes": len(source),
+        "peak": peak,
+        "retained": retained,
+        "statements": len(program.body),
+        "nodes": count_nodes(program),
+    }
+
+
+def count_nodes(program) -> int:
+    # Every node reachable from `program`, through fields and lists of nodes.
+    count, stack = 0, [program]
+    while stack:
+        node = stack.pop()
+        count += 1
+        for cls in type(node).__mro__:
+            for name in getattr(cls, "__slots__", ()):
+                value = getattr(node, name, None)
+                if isinstance(value, Stmt):
+                    stack.append(value)
+                elif isinstance(value, list):
+                    stack.extend(item for item in value if isinstance(item, Stmt))
+    return count
+
+
+def parse_memory_bench(filename: str | None = None):
+    if filename is None:
+        source = PARSE_BENCH_SOURCE
+    else:
+        with open(filename, "r") as file:
+            source = file.read()
+
+    for size in PARSE_MEMORY_SIZES:
+        stats = parse_memory_benchmark(repeat_to(source, size))
+        print(
+            f"{stats['bytes'] / 1000:>6.0f} KB: peak {stats['peak'] / 1e6:.2f} MB, "
+            f"AST {stats['retained'] / 1e6:.2f} MB, {stats['statements']} statements, "
+            f"{stats['nodes']} nodes, {stats['retained'] / stats['nodes']:.1f} bytes/node"
+        )
+
+
+def reparse_benchmark(source: str, rounds: int = 7) -> dict:
+    if source.count("\n") < REPARSE_LINES:
+        copies = -(-REPARSE_LINES // max(source.count("\n"), 1))
+        source = "".join([source if source.endswith("\n") else source + "\n"] * copies)
+
+    incremental = IncrementalParser()
+    start = time.perf_counter()
+    incremental.update(source)
+    full_seconds = time.perf_counter() - start
+
+    stats = {
+        "lines": source.count("\n"),
+        "statements": len(incremental.program.body),
+        "full_ms": full_seconds * 1000,
+    }
+    digit = re.compile(r"[0-9]")
+    for name, fraction in REPARSE_EDITS.items():
+        found = digit.search(source, int(len(source) * fraction)) or digit.search(
+            source
+        )
+        if found is None:
+            continue  # nothing to edit
+        pos = found.end()  # typing into the number keeps the program valid
+
+        def type_and_delete():
+            incremental.edit(pos, pos, "1")
+            incremental.edit(pos, pos + 1, "")
+
+        stats[f"{name}_ms"] = best_of(rounds, type_and_delete) / 2 * 1000
+        stats[f"{name}_reparsed"] = incremental.reparsed
+    return stats
+
+
+def reparse_bench(filename: str | None = None, rounds: int = 7):
+    if filename is None:
+        source = PARSE_BENCH_SOURCE
+    else:
+        with open(filename, "r") as file:
+            source = file.read()
+
+    stats = reparse_benchmark(source, rounds)
+    print(
+        f"{stats['lines']} lines, {stats['statements']} statements: "
+        f"full parse {stats['full_ms']:.1f} ms"
+    )
+    for name in REPARSE_EDITS:
+        if f"{name}_ms" in stats:
+            print(
+                f"  one-character edit near the {name}: {stats[f'{name}_ms']:.3f} ms "
+                f"({stats[f'{name}_reparsed']} statements reparsed)"
+            )
+
+
+if __name__ == "__main__":
+    benches = {
+        "parse": parse_bench,
+        "lex": lex_bench,
+        "memory": parse_memory_bench,
+        "reparse": reparse_bench,
+    }
+    flag_parser = argparse.ArgumentParser(description="Lexer and parser benchmarks.")
+    flag_parser.add_argument("bench", nargs="?", choices=benches, default="parse")
+    flag_parser.add_argument(
+        "--file", type=str, help="Benchmark this script instead of the sample program"
+    )
+    args = flag_parser.parse_args()
+    benches[args.bench](args.file)
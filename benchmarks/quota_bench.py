@@ -0,0 +1,55 @@
+import gc
+
+from benchmarks.member_bench import member_bench_source
+from benchmarks.timing import best_of
+from frontend.parser import Parser
+from runtime.engines import create_env, execute
+from util.printer import print
+
+"""
+Quota benchmark:
+    `python -m benchmarks.quota_bench` runs an object heavy script of
+    QUOTA_BENCH_STATEMENTS statements on the tree engine, the one that
+    enforces quotas, without a Quota and with QUOTA_BENCH_LIMITS, which it
+    never reaches. The two alternate for `rounds` rounds in one process, so
+    the machine's noise hits both alike, and the best run of each counts.
+"""
+
+QUOTA_BENCH_STATEMENTS = 12_000
+
+# Every limit set, none of them reached.
+QUOTA_BENCH_LIMITS = {
+    "max_steps": 10**9,
+    "max_depth": 1000,
+    "max_properties": 1000,
+    "max_bytes": 10**9,
+}
+
+
+def quota_bench(rounds: int = 60):
+    source, _ = member_bench_source(statements=QUOTA_BENCH_STATEMENTS)
+    program = Parser().produce_ast(source)
+
+    def fresh_env(limits: dict | None):
+        env = create_env("tree", limits)
+        gc.collect()  # not the last round's garbage while timed
+        return env
+
+    def run(env):
+        execute(program, env)
+
+    plain = quota = float("inf")
+    for _ in range(rounds):
+        plain = min(plain, best_of(1, run, setup=lambda: fresh_env(None)))
+        quota = min(quota, best_of(1, run, setup=lambda: fresh_env(QUOTA_BENCH_LIMITS)))
+
+    print(
+        f"{QUOTA_BENCH_STATEMENTS} statements on the tree engine, "
+        f"interleaved best of {rounds}"
+    )
+    print(f"{'no quota':<9} {plain * 1000:.1f} ms")
+    print(f"{'quota':<9} {quota * 1000:.1f} ms ({quota / plain - 1:+.0%})")
+
+
+if __name__ == "__main__":
+    quota_bench()
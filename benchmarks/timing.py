@@ -0,0 +1,24 @@
+import os
+import time
+
+# main.py, started in a new process by the benchmarks that time whole runs.
+MAIN = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py"
+)
+
+
+def best_of(rounds: int, fn, setup=None) -> float:
+    # The shortest of `rounds` timed calls of fn(), in seconds, the machine's
+    # noise only ever adds time. With `setup`, each call is fn(setup()) and
+    # setup() is not timed, for state every round needs fresh.
+    best = float("inf")
+    for _ in range(rounds):
+        if setup is None:
+            start = time.perf_counter()
+            fn()
+        else:
+            state = setup()
+            start = time.perf_counter()
+            fn(state)
+        best = min(best, time.perf_counter() - start)
+    return best
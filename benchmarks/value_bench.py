@@ -0,0 +1,89 @@
+import gc
+import tracemalloc
+
+from benchmarks.member_bench import bench_name
+from benchmarks.timing import best_of
+from frontend.parser import Parser
+from runtime.engines import ENGINES, create_env, prepare
+from runtime.values import RuntimeVal
+from util.printer import print
+
+"""
+Value benchmark:
+    `python -m benchmarks.value_bench` runs VALUE_BENCH_ROUNDS rounds of small
+    integer arithmetic, arithmetic on null and an object literal on every
+    engine and reports how many RuntimeVals one run creates, its traced memory
+    peak and its time, the best of `rounds`.
+
+    Small numbers, null and booleans are interned (runtime/values), so only
+    the objects should be new values. The instances are counted in a run of
+    their own, through a counting RuntimeVal.__init__ that would slow the
+    timed runs down.
+"""
+
+VALUE_BENCH_ROUNDS = 3000
+
+
+def value_bench_source(rounds: int = VALUE_BENCH_ROUNDS) -> str:
+    lines = []
+    for i in range(rounds):
+        lines.append(f"let {bench_name('a', i)} = {i % 100} + 2 * 3 - 1;")
+        lines.append(f"let {bench_name('n', i)} = null * 2 + null;")
+        lines.append(f"let {bench_name('o', i)} = {{ x: {i % 10}, y: null }};")
+    return "\n".join(lines)
+
+
+def count_values(run) -> int:
+    # RuntimeVals created while calling run(), every subclass goes through
+    # RuntimeVal.__init__.
+    created = 0
+    init = RuntimeVal.__init__
+
+    def counting_init(self, type):
+        nonlocal created
+        created += 1
+        init(self, type)
+
+    RuntimeVal.__init__ = counting_init
+    try:
+        run()
+    finally:
+        RuntimeVal.__init__ = init
+    return created
+
+
+def value_benchmark(engine: str, rounds: int = 7) -> dict:
+    program = Parser().produce_ast(value_bench_source())
+
+    def compiled():
+        run = prepare(program, create_env(engine), engine)
+        gc.collect()  # not the last round's garbage while timed
+        return run
+
+    created = count_values(compiled())
+
+    run = compiled()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    seconds = best_of(rounds, lambda run: run(), setup=compiled)
+    return {"values": created, "peak": peak, "ms": seconds * 1000}
+
+
+def value_bench(rounds: int = 7):
+    print(
+        f"{VALUE_BENCH_ROUNDS} rounds of small integer, null and object literal "
+        f"arithmetic, {VALUE_BENCH_ROUNDS} objects"
+    )
+    for engine in ENGINES:
+        stats = value_benchmark(engine, rounds)
+        print(
+            f"{engine:<8} {stats['values']} RuntimeVals created, "
+            f"traced peak {stats['peak'] / 1e6:.2f} MB, {stats['ms']:.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    value_bench()
@@ -0,0 +1,193 @@
+import gc
+import hashlib
+import marshal
+import os
+import sys
+
+from frontend.parser import Parser
+from frontend.syntax_tree import *
+from util.version import VERSION
+
+"""
+Parsed-AST cache:
+    Like Python's .pyc files, `main.py --file foo.txt` stores the parsed
+    Program in __pycache__/foo.txt.astc next to the script. The file starts
+    with a header naming the interpreter, cache format and Python versions,
+    then the sha256 of the source, then the AST encoded as nested tuples and
+    dumped with marshal. A header or hash mismatch just means a reparse.
+
+    Encoding: numbers and identifiers are stored bare (float / str), every
+    other node is a tuple starting with its tag below. Source positions are
+    not stored, a cached program parsed without errors and positions are
+    only used to report those.
+"""
+
+# Bump whenever the encoding or the AST node fields change.
+CACHE_FORMAT = 2
+MAGIC = (
+    f"scriptlang {VERSION} ast-{CACHE_FORMAT} "
+    f"py{sys.version_info[0]}.{sys.version_info[1]}\n"
+).encode()
+
+TAG_PROGRAM = 0
+TAG_VAR_DECLARATION = 1
+TAG_ASSIGNMENT = 2
+TAG_BINARY = 3
+TAG_MEMBER = 4
+TAG_CALL = 5
+TAG_OBJECT = 6
+TAG_ARRAY = 7
+
+
+def encode_node(astNode: Stmt):
+    match astNode.kind:
+        case "NumericLiteral":
+            return astNode.value
+        case "Identifier":
+            return astNode.symbol
+        case "BinaryExpr":
+            return (
+                TAG_BINARY,
+                encode_node(astNode.left),
+                encode_node(astNode.right),
+                astNode.operator,
+            )
+        case "AssignmentExpr":
+            return (
+                TAG_ASSIGNMENT,
+                encode_node(astNode.assigne),
+                encode_node(astNode.value),
+            )
+        case "VarDeclaration":
+            return (
+                TAG_VAR_DECLARATION,
+                astNode.constant,
+                astNode.identifier,
+                None if astNode.value is None else encode_node(astNode.value),
+            )
+        case "ObjectLiteral":
+            return (
+                TAG_OBJECT,
+                tuple(
+                    (prop.key, None if prop.value is None else encode_node(prop.value))
+                    for prop in astNode.properties
+                ),
+            )
+        case "ArrayLiteral":
+            return (
+                TAG_ARRAY,
+                tuple(encode_node(element) for element in astNode.elements),
+            )
+        case "MemberExpr":
+            return (
+                TAG_MEMBER,
+                encode_node(astNode.obj),
+                encode_node(astNode.prop),
+                astNode.computed,
+            )
+        case "CallExpr":
+            return (
+                TAG_CALL,
+                tuple(encode_node(arg) for arg in astNode.args),
+                encode_node(astNode.caller),
+            )
+        case "Program":
+            return (TAG_PROGRAM, tuple(encode_node(stmt) for stmt in astNode.body))
+        case _:
+            raise ValueError(f"Cannot cache AST node {astNode.kind}.")
+
+
+def decode_node(data) -> Stmt:
+    data_type = type(data)
+    if data_type is float:
+        return NumericLiteral(data)
+    if data_type is str:
+        return Identifier(data)
+
+    tag = data[0]
+    if tag == TAG_BINARY:
+        return BinaryExpr(decode_node(data[1]), decode_node(data[2]), data[3])
+    if tag == TAG_ASSIGNMENT:
+        return AssignmentExpr(decode_node(data[1]), decode_node(data[2]))
+    if tag == TAG_VAR_DECLARATION:
+        value = None if data[3] is None else decode_node(data[3])
+        return VarDeclaration(data[1], data[2], value)
+    if tag == TAG_OBJECT:
+        return ObjectLiteral(
+            [
+                PropertyLiteral(key, None if value is None else decode_node(value))
+                for key, value in data[1]
+            ]
+        )
+    if tag == TAG_ARRAY:
+        return ArrayLiteral([decode_node(element) for element in data[1]])
+    if tag == TAG_MEMBER:
+        return MemberExpr(decode_node(data[1]), decode_node(data[2]), data[3])
+    if tag == TAG_CALL:
+        return CallExpr([decode_node(arg) for arg in data[1]], decode_node(data[2]))
+    if tag == TAG_PROGRAM:
+        return Program([decode_node(stmt) for stmt in data[1]])
+
+    raise ValueError(f"Unknown AST cache tag {tag}.")
+
+
+def cache_path(filename: str) -> str:
+    directory, name = os.path.split(os.path.abspath(filename))
+    return os.path.join(directory, "__pycache__", f"{name}.astc")
+
+
+def source_hash(sourceCode: str) -> bytes:
+    return hashlib.sha256(sourceCode.encode()).digest()
+
+
+def load_cached_ast(filename: str, sourceCode: str) -> Program | None:
+    try:
+        with open(cache_path(filename), "rb") as file:
+            data = file.read()
+    except OSError:
+        return None
+
+    header = MAGIC + source_hash(sourceCode)
+    if not data.startswith(header):
+        return None  # stale or written by another version
+
+    # Decoding only allocates nodes, don't let the cycle collector rescan them.
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return decode_node(marshal.loads(data[len(header) :]))
+    except (ValueError, EOFError, TypeError, IndexError):
+        return None
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def store_cached_ast(filename: str, sourceCode: str, program: Program):
+    try:
+        payload = marshal.dumps(encode_node(program))
+    except (ValueError, RecursionError):
+        return  # too deeply nested to cache, it just gets parsed every time
+
+    path = cache_path(filename)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(temp_path, "wb") as file:
+            file.write(MAGIC + source_hash(sourceCode) + payload)
+        os.replace(temp_path, path)  # readers never see a half written file
+    except OSError:
+        # A read-only directory just means no caching, like with .pyc files.
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def produce_cached_ast(parser: Parser, filename: str, sourceCode: str) -> Program:
+    program = load_cached_ast(filename, sourceCode)
+    if program is None:
+        program = parser.produce_ast(sourceCode)
+        store_cached_ast(filename, sourceCode, program)
+
+    return program
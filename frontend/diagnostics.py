@@ -0,0 +1,52 @@
+from frontend.source_map import LineTable
+
+"""
+Syntax diagnostics:
+    The lexer and parser describe every syntax error as a Diagnostic (a
+    message and the offsets it points at) instead of printing it and
+    exiting. `Parser.produce_ast_with_diagnostics` recovers after each one
+    and returns them all with the partial Program, `Parser.produce_ast`
+    raises a ParseError carrying the same list.
+
+    Nothing is rendered until asked for, the line table is built on the
+    first render (see frontend/source_map).
+"""
+
+
+class Diagnostic:
+    __slots__ = ("message", "start", "end")
+
+    def __init__(self, message: str, start: int, end: int):
+        self.message = message
+        self.start = start
+        self.end = end
+
+    def render(self, lines: LineTable | None) -> str:
+        if lines is None:
+            return self.message
+        return lines.render(self.message, self.start, self.end)
+
+    def to_dict(self, lines: LineTable) -> dict:
+        line, column = lines.line_column(self.start)
+        return {"message": self.message, "line": line, "column": column}
+
+    def __str__(self):
+        return self.message
+
+
+class ParseError(Exception):
+    def __init__(
+        self,
+        diagnostics: list[Diagnostic],
+        program=None,
+        lines: LineTable | None = None,
+    ):
+        super().__init__(diagnostics[0].message if diagnostics else "")
+        self.diagnostics = diagnostics
+        self.program = program  # what could be parsed, None if nothing was tried
+        self.lines = lines
+
+    def __str__(self):
+        return "\n".join(
+            diagnostic.render(self.lines) for diagnostic in self.diagnostics
+        )
@@ -0,0 +1,212 @@
+from bisect import bisect_left
+from operator import neg
+
+from frontend.diagnostics import Diagnostic, ParseError
+from frontend.lexer import tokenize_stream
+from frontend.parser import Parser
+from frontend.source_map import LineTable
+from frontend.syntax_tree import Program, Stmt
+
+"""
+Incremental reparsing:
+    An IncrementalParser keeps the top level statements of the last source it
+    parsed, each with the offset it starts at. After an edit only the
+    statements around the edited region are lexed and parsed again:
+        - Parsing restarts one statement before the one holding the
+          character before the edit. Where a statement ends depends on the
+          token after it, the first token of the next statement, which the
+          edit may have changed.
+        - The parser only ever looks one token ahead and starts every top
+          level statement in the same state, so once a new statement starts
+          at or after the end of the edit, where an old one started (moved by
+          the edit's length change), the rest of the old statements are
+          reused as they are.
+    Statements with syntax errors are kept too, with their diagnostics.
+
+    A reused statement's nodes keep the offsets of the source they were
+    parsed from, `statement_shift(index)` says how far it has moved since.
+    Shifting every node after the edit would cost more than reparsing.
+
+    The nodes are shared between updates. Passes that rewrite the AST in
+    place, like runtime/optimizer, must not be run on `program`.
+"""
+
+# Block size for comparing sources, slices this long are compared in C.
+COMPARE_BLOCK = 4096
+
+
+def common_prefix(a: str, b: str) -> int:
+    length = min(len(a), len(b))
+    pos = 0
+    while pos < length and a[pos : pos + COMPARE_BLOCK] == b[pos : pos + COMPARE_BLOCK]:
+        pos += COMPARE_BLOCK
+    end = min(pos + COMPARE_BLOCK, length)
+    while pos < end and a[pos] == b[pos]:
+        pos += 1
+    return min(pos, length)
+
+
+def common_suffix(a: str, b: str, limit: int) -> int:
+    # At most `limit` characters, so the suffix never overlaps the prefix.
+    aEnd, bEnd = len(a), len(b)
+    size = 0
+    while (
+        size + COMPARE_BLOCK <= limit
+        and a[aEnd - size - COMPARE_BLOCK : aEnd - size]
+        == b[bEnd - size - COMPARE_BLOCK : bEnd - size]
+    ):
+        size += COMPARE_BLOCK
+    while size < limit and a[aEnd - size - 1] == b[bEnd - size - 1]:
+        size += 1
+    return size
+
+
+class IncrementalParser:
+    def __init__(self):
+        self.parser = Parser()
+        self.source = ""
+        self.program = Program([])
+        self.program.start = self.program.end = 0
+        self.reparsed = 0  # statements parsed by the last update
+
+        # One entry per top level statement, in source order. Where it starts
+        # is kept like in a gap buffer: statements before `_gap` store their
+        # offset, the rest how far from the end of the source they start.
+        # An edit moves neither, only the entries the gap moves past are
+        # converted, so typing costs the same anywhere in a long source.
+        self._starts: list[int] = []
+        self._gap = 0
+        self._origins: list[int] = []  # where it started when parsed
+        self._nodes: list[Stmt | None] = []  # None when it had syntax errors
+        self._broken = 0  # how many are None
+        self._errors: list[list[Diagnostic] | None] = []  # at parse time offsets
+        self._leading: list[Diagnostic] = []  # errors before the first statement
+        self._lines: LineTable | None = None
+
+    def update(self, sourceCode: str) -> Program:
+        # Reparse after the source changed to `sourceCode`, wherever it changed.
+        prefix = common_prefix(self.source, sourceCode)
+        limit = min(len(self.source), len(sourceCode)) - prefix
+        suffix = common_suffix(self.source, sourceCode, limit)
+        return self.reparse(
+            sourceCode, prefix, len(self.source) - suffix, len(sourceCode) - suffix
+        )
+
+    def produce_ast(self, sourceCode: str) -> Program:
+        # Like Parser.produce_ast, raises a ParseError listing every syntax error.
+        program = self.update(sourceCode)
+        diagnostics = self.diagnostics()
+        if diagnostics:
+            raise ParseError(diagnostics, program, self.lines())
+        return program
+
+    def edit(self, start: int, end: int, text: str) -> Program:
+        # Replace source[start:end] with `text`, what an editor reports.
+        sourceCode = self.source[:start] + text + self.source[end:]
+        return self.reparse(sourceCode, start, end, start + len(text))
+
+    def reparse(self, sourceCode: str, start: int, oldEnd: int, newEnd: int) -> Program:
+        # source[start:oldEnd] was replaced by sourceCode[start:newEnd].
+        starts = self._starts
+        count = len(starts)
+        delta = newEnd - oldEnd
+
+        first = max(self.statements_before(start) - 2, 0)
+        restart = self.statement_start(first) if first > 0 else 0
+        # Old statements that may be reused start after the edited region.
+        reuse = self.statements_before(oldEnd)
+
+        parser = self.parser
+        diagnostics = parser._diagnostics = []
+        parser.begin(tokenize_stream(sourceCode, diagnostics, restart), sourceCode)
+        if restart == 0:
+            # Skipped characters before the first token, or in a source
+            # with no statements at all.
+            self._leading = list(diagnostics)
+
+        newStarts: list[int] = []
+        newNodes: list[Stmt | None] = []
+        newErrors: list[list[Diagnostic] | None] = []
+        mark = len(diagnostics)
+        while parser.not_eof():
+            offset = parser.at().start
+            while reuse < count and self.statement_start(reuse) + delta < offset:
+                reuse += 1
+            if reuse < count and self.statement_start(reuse) + delta == offset:
+                break  # back in step with the old statements
+
+            newNodes.append(parser.parse_top_level())
+            newStarts.append(offset)
+            newErrors.append(diagnostics[mark:] or None)
+            mark = len(diagnostics)
+        else:
+            reuse = count
+
+        # Statements before the edit store offsets, the reused ones after it
+        # distances from the end, the new ones go in between, before the gap.
+        length = len(self.source)
+        for index in range(self._gap, first):
+            starts[index] = length - starts[index]
+        for index in range(reuse, self._gap):
+            starts[index] = length - starts[index]
+        starts[first:reuse] = newStarts
+        self._gap = first + len(newStarts)
+        self._origins[first:reuse] = newStarts
+        self._broken += newNodes.count(None) - self._nodes[first:reuse].count(None)
+        self._nodes[first:reuse] = newNodes
+        self._errors[first:reuse] = newErrors
+
+        self.source = sourceCode
+        self._lines = None
+        self.reparsed = len(newNodes)
+
+        if self._broken:
+            program = Program([node for node in self._nodes if node is not None])
+        else:
+            program = Program(self._nodes[:])
+        program.start = 0
+        program.end = len(sourceCode)
+        self.program = program
+        return program
+
+    def statement_start(self, index: int) -> int:
+        # Offset of the index-th top level statement's first token.
+        if index < self._gap:
+            return self._starts[index]
+        return len(self.source) - self._starts[index]
+
+    def statements_before(self, offset: int) -> int:
+        # How many top level statements start before `offset`.
+        starts, gap = self._starts, self._gap
+        index = bisect_left(starts, offset, 0, gap)
+        if index < gap:
+            return index
+        # Past the gap the distances from the end shrink as the offsets grow.
+        return bisect_left(starts, offset - len(self.source), gap, key=neg)
+
+    def statement_shift(self, index: int) -> int:
+        # How far the index-th top level statement moved since it was parsed.
+        return self.statement_start(index) - self._origins[index]
+
+    def diagnostics(self) -> list[Diagnostic]:
+        # Every syntax error in the current source, at its current offsets.
+        found = list(self._leading)
+        for index, errors in enumerate(self._errors):
+            if errors is None:
+                continue
+            shift = self.statement_shift(index)
+            for diagnostic in errors:
+                found.append(
+                    Diagnostic(
+                        diagnostic.message,
+                        diagnostic.start + shift,
+                        diagnostic.end + shift,
+                    )
+                )
+        found.sort(key=lambda diagnostic: diagnostic.start)
+        return found
+
+    def lines(self) -> LineTable:
+        if self._lines is None:
+            self._lines = LineTable(self.source)
+        return self._lines
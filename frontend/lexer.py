@@ -1,4 +1,7 @@
 from enum import Enum, auto
+from typing import Iterator
+from frontend.diagnostics import Diagnostic, ParseError
+from frontend.source_map import LineTable
 from util.printer import value_print
 
 
@@ -28,6 +31,11 @@ class TokenType(Enum):
     CLOSEBRACKET = auto()  # ]
     EOF = auto()  # Signifies the end of file
 
+    # Members are singletons compared by identity, hash them the same way.
+    # Enum's own __hash__ is Python code and the parser's dispatch tables
+    # look a token type up for every token.
+    __hash__ = object.__hash__
+
 
 # Language Keywords
 KEYWORDS = {
@@ -37,73 +45,96 @@ KEYWORDS = {
 
 
 class Token:
-    def __init__(self, value, type: TokenType):
+    def __init__(self, value, type: TokenType, start: int = 0):
         self.value = value
         self.type = type
+        self.start = start  # offset into the source, see frontend/source_map
+
+    @property
+    def end(self) -> int:
+        # Every token but EOF is exactly the source text it was lexed from,
+        # so the end offset isn't stored, a fourth argument costs ~30%.
+        if self.type is TokenType.EOF:
+            return self.start
+        return self.start + len(self.value)
 
     def __str__(self):
         return value_print(self.__class__.__name__, self.value, self.type)
 
 
-def tokenize(sourceCode: str) -> list[Token]:
-    tokens = []
-    src = list(sourceCode)
-
-    while len(src) > 0:
-        if src[0] == "(":
-            tokens.append(Token(src.pop(0), TokenType.OPENPAREN))
-        elif src[0] == ")":
-            tokens.append(Token(src.pop(0), TokenType.CLOSEPAREN))
-        elif src[0] == "{":
-            tokens.append(Token(src.pop(0), TokenType.OPENBRACE))
-        elif src[0] == "}":
-            tokens.append(Token(src.pop(0), TokenType.CLOSEBRACE))
-        elif src[0] == "[":
-            tokens.append(Token(src.pop(0), TokenType.OPENBRACKET))
-        elif src[0] == "]":
-            tokens.append(Token(src.pop(0), TokenType.CLOSEBRACKET))
-        elif (
-            src[0] == "+"
-            or src[0] == "-"
-            or src[0] == "*"
-            or src[0] == "/"
-            or src[0] == "%"
-        ):
-            tokens.append(Token(src.pop(0), TokenType.BINARYOPERATOR))
-        elif src[0] == "=":
-            tokens.append(Token(src.pop(0), TokenType.EQUALS))
-        elif src[0] == ";":
-            tokens.append(Token(src.pop(0), TokenType.SEMICOLON))
-        elif src[0] == ":":
-            tokens.append(Token(src.pop(0), TokenType.COLON))
-        elif src[0] == ",":
-            tokens.append(Token(src.pop(0), TokenType.COMMA))
-        elif src[0] == ".":
-            tokens.append(Token(src.pop(0), TokenType.DOT))
-        else:
-            # Multi-Character Tokens
-            if src[0].isnumeric():
-                num = ""
-                while len(src) > 0 and src[0].isnumeric():
-                    num += src.pop(0)
-
-                tokens.append(Token(num, TokenType.NUMBER))
-            elif src[0].isalpha():
-                ident = ""
-                while len(src) > 0 and src[0].isalpha():
-                    ident += src.pop(0)
-
-                # Check for reserved keywords
-                reserved = KEYWORDS.get(ident, None)
-                if reserved:  # ? Youtube -> typeof reserved == "number"
-                    tokens.append(Token(ident, reserved))
-                else:
-                    tokens.append(Token(ident, TokenType.IDENTIFIER))
-            elif src[0].isspace():
-                src.pop(0)
+# Single-Character Tokens
+SINGLE_CHAR_TOKENS = {
+    "(": TokenType.OPENPAREN,
+    ")": TokenType.CLOSEPAREN,
+    "{": TokenType.OPENBRACE,
+    "}": TokenType.CLOSEBRACE,
+    "[": TokenType.OPENBRACKET,
+    "]": TokenType.CLOSEBRACKET,
+    "+": TokenType.BINARYOPERATOR,
+    "-": TokenType.BINARYOPERATOR,
+    "*": TokenType.BINARYOPERATOR,
+    "/": TokenType.BINARYOPERATOR,
+    "%": TokenType.BINARYOPERATOR,
+    "=": TokenType.EQUALS,
+    ";": TokenType.SEMICOLON,
+    ":": TokenType.COLON,
+    ",": TokenType.COMMA,
+    ".": TokenType.DOT,
+}
+
+
+def tokenize_stream(
+    sourceCode: str, diagnostics: list[Diagnostic] | None = None, pos: int = 0
+) -> Iterator[Token]:
+    # Unrecognised characters are skipped and added to `diagnostics`, or
+    # raise a ParseError when no list is given. Lexing starts at offset `pos`,
+    # which must be the start of a token (or whitespace) for the tokens to
+    # be the ones lexing the whole source gives.
+    src = sourceCode
+    length = len(src)
+    # `pos` is the cursor into src, nothing is ever removed from the source string
+
+    while pos < length:
+        char = src[pos]
+
+        single = SINGLE_CHAR_TOKENS.get(char)
+        if single is not None:
+            yield Token(char, single, pos)
+            pos += 1
+        # Multi-Character Tokens
+        elif char.isnumeric():
+            start = pos
+            pos += 1
+            while pos < length and src[pos].isnumeric():
+                pos += 1
+
+            yield Token(src[start:pos], TokenType.NUMBER, start)
+        elif char.isalpha():
+            start = pos
+            pos += 1
+            while pos < length and src[pos].isalpha():
+                pos += 1
+            ident = src[start:pos]
+
+            # Check for reserved keywords
+            reserved = KEYWORDS.get(ident, None)
+            if reserved:  # ? Youtube -> typeof reserved == "number"
+                yield Token(ident, reserved, start)
             else:
-                print("Unrecognised Character found in src: ", src[0])
-                exit(1)
+                yield Token(ident, TokenType.IDENTIFIER, start)
+        elif char.isspace():
+            pos += 1
+        else:
+            diagnostic = Diagnostic(
+                f"Unrecognised Character found in src: {char}", pos, pos + 1
+            )
+            if diagnostics is None:
+                raise ParseError([diagnostic], lines=LineTable(src))
+            diagnostics.append(diagnostic)
+            pos += 1
+
+    yield Token("EOF", TokenType.EOF, length)
 
-    tokens.append(Token("EOF", TokenType.EOF))
-    return tokens
+
+def tokenize(sourceCode: str) -> list[Token]:
+    return list(tokenize_stream(sourceCode))
@@ -1,44 +1,198 @@
-import sys
+from typing import Iterable, Iterator
 
 from frontend.syntax_tree import *
-from frontend.lexer import tokenize, Token, TokenType
+from frontend.lexer import tokenize_stream, Token, TokenType
+from frontend.diagnostics import Diagnostic, ParseError
+from frontend.source_map import LineTable, span_of
+
+# Binding power of the binary operators, higher binds tighter. The levels
+# are spaced out so the logical (10) and comparison (20) operators from the
+# precedence list below can slot in between without renumbering.
+BINDING_POWER = {"+": 30, "-": 30, "*": 40, "/": 40, "%": 40}
+
+# What a token starts where an operand is expected.
+PREFIX_IDENTIFIER = 0
+PREFIX_NUMBER = 1
+PREFIX_PAREN = 2  # ( expr )
+PREFIX_OBJECT = 3  # { key: expr }, only where an expression starts
+PREFIX_ARRAY = 4  # [ expr, expr ]
+
+PREFIX_ACTIONS = {
+    TokenType.IDENTIFIER: PREFIX_IDENTIFIER,
+    TokenType.NUMBER: PREFIX_NUMBER,
+    TokenType.OPENPAREN: PREFIX_PAREN,
+    TokenType.OPENBRACE: PREFIX_OBJECT,
+    TokenType.OPENBRACKET: PREFIX_ARRAY,
+}
+
+# What a token does after an operand.
+INFIX_BINARY = 0  # a + b, by BINDING_POWER
+INFIX_DOT = 1  # obj.key
+INFIX_COMPUTED = 2  # obj[ expr ]
+INFIX_CALL = 3  # fn( args )
+INFIX_ASSIGNMENT = 4  # x = expr
+
+# Open constructs on the parse_expr frame stack.
+FRAME_EXPR = 0  # the whole expression
+FRAME_PAREN = 1  # ( expr )
+FRAME_ASSIGNMENT = 2  # right hand side of =
+FRAME_ARGS = 3  # call arguments
+FRAME_COMPUTED = 4  # obj[ expr ]
+FRAME_DOT_PAREN = 5  # obj.( identifier )
+FRAME_PROPERTY = 6  # { key: expr }
+FRAME_ELEMENT = 7  # [ expr, expr ]
+
+# What may follow the operand just parsed, each allows less than the last.
+POSTFIX_MEMBER = 0  # . [ ( binary operators =
+POSTFIX_CALL = 1  # ( binary operators =
+POSTFIX_OBJECT = 2  # =
+POSTFIX_DONE = 3  # nothing, an assignment ends its expression
+
+# Infix actions allowed in each POSTFIX_* state, indexed by it. A token
+# missing from the table ends the innermost open construct.
+INFIX_ACTIONS = (
+    {
+        TokenType.BINARYOPERATOR: INFIX_BINARY,
+        TokenType.DOT: INFIX_DOT,
+        TokenType.OPENBRACKET: INFIX_COMPUTED,
+        TokenType.OPENPAREN: INFIX_CALL,
+        TokenType.EQUALS: INFIX_ASSIGNMENT,
+    },
+    {
+        TokenType.BINARYOPERATOR: INFIX_BINARY,
+        TokenType.OPENPAREN: INFIX_CALL,
+        TokenType.EQUALS: INFIX_ASSIGNMENT,
+    },
+    {TokenType.EQUALS: INFIX_ASSIGNMENT},
+    {},
+)
+
+# Nodes only store the offsets their own tokens give, anything that follows
+# from their children is left to source_map.span_of (see there). Token.end is
+# a property, offsets are worked out inline: `start + 1` for punctuation.
 
 
 class Parser:
     def __init__(self):
-        self._tokens: list[Token] = []
+        # Tokens are pulled lazily from the lexer, only the current one is held.
+        self._tokens: Iterator[Token] = iter(())
+        self._current: Token = Token("EOF", TokenType.EOF)
+        self._lines: LineTable | None = None  # for rendering errors
+        self._diagnostics: list[Diagnostic] = []
+        self._open_braces = 0  # object literals open at the current token
 
     def not_eof(self) -> bool:
-        return self._tokens[0].type != TokenType.EOF
+        return self._current.type != TokenType.EOF
 
     def at(self) -> Token:
-        return self._tokens[0]
+        return self._current
 
     def eat(self) -> Token:
-        prev = self._tokens.pop(0)
+        prev = self._current
+        # Past EOF the stream is exhausted, keep returning the EOF token.
+        self._current = next(self._tokens, prev)
         return prev
 
     def expect(self, type: TokenType, err):
-        prev = self._tokens.pop(0)
-        if prev is None or prev.type != type:
-            print(
+        prev = self._current
+        # A wrong token is left in place, error recovery resyncs from it.
+        if prev.type != type:
+            self.error(
                 f"Parser Error:\n  {err}\n  {prev} -> Expecting: {type}",
-                file=sys.stderr,
+                prev.start,
+                prev.end,
             )
-            exit(1)
 
-        return prev
+        return self.eat()
 
     def produce_ast(self, sourceCode: str) -> Program:
-        self._tokens = tokenize(sourceCode)
+        # Raises a ParseError listing every syntax error in the source.
+        return self.produce_ast_from_tokens(None, sourceCode)
+
+    def produce_ast_with_diagnostics(
+        self, sourceCode: str
+    ) -> tuple[Program, list[Diagnostic]]:
+        # Never raises for syntax errors, returns what could be parsed (the
+        # statements without errors) and the errors, in source order.
+        self._diagnostics = []
+        program = self.parse_program(
+            tokenize_stream(sourceCode, self._diagnostics), sourceCode
+        )
+        self._diagnostics.sort(key=lambda diagnostic: diagnostic.start)
+        return program, self._diagnostics
+
+    def produce_ast_from_tokens(
+        self, tokens: Iterable[Token] | None, sourceCode: str | None = None
+    ) -> Program:
+        # `tokens` must end with the EOF token, like the lexer's output, None
+        # lexes `sourceCode`. The source is only used to show where errors are.
+        if tokens is None:
+            program, diagnostics = self.produce_ast_with_diagnostics(sourceCode)
+        else:
+            self._diagnostics = diagnostics = []
+            program = self.parse_program(tokens, sourceCode)
+
+        if diagnostics:
+            raise ParseError(diagnostics, program, self._lines)
+        return program
+
+    def begin(self, tokens: Iterable[Token], sourceCode: str | None):
+        # Start reading `tokens`, at a statement boundary.
+        self._tokens = iter(tokens)
+        self._current = next(self._tokens)
+        self._lines = None if sourceCode is None else LineTable(sourceCode)
+        self._open_braces = 0
+
+    def parse_program(self, tokens: Iterable[Token], sourceCode: str | None) -> Program:
+        self.begin(tokens, sourceCode)
         program = Program([])
+        program.start = 0
 
-        # Parse until EOF.
+        # Parse until EOF. A statement with an error is dropped and parsing
+        # carries on after it, so one pass finds every error.
         while self.not_eof():
-            program.body.append(self.parse_stmt())
+            statement = self.parse_top_level()
+            if statement is not None:
+                program.body.append(statement)
 
+        program.end = self._current.start  # the EOF token
         return program
 
+    def parse_top_level(self) -> Stmt | None:
+        # One top level statement, or None when it had errors. Those are added
+        # to the diagnostics and the parser resyncs past the statement.
+        try:
+            return self.parse_stmt()
+        except ParseError as e:
+            self._diagnostics.extend(e.diagnostics)
+            self.synchronize()
+            return None
+
+    def synchronize(self):
+        # Panic mode: skip the rest of the broken statement. That is up to and
+        # including the `}` closing the object literals still open, or else
+        # the next `;`, stopping early at a let / const starting a statement.
+        while True:
+            type = self._current.type
+            if type == TokenType.EOF:
+                break
+            if self._open_braces == 0 and type in (TokenType.LET, TokenType.CONST):
+                break
+
+            self.eat()
+            if type == TokenType.OPENBRACE:
+                self._open_braces += 1
+            elif type == TokenType.CLOSEBRACE:
+                if self._open_braces <= 1:
+                    if self._open_braces == 1 and self.at().type == TokenType.SEMICOLON:
+                        self.eat()
+                    break
+                self._open_braces -= 1
+            elif type == TokenType.SEMICOLON and self._open_braces == 0:
+                break
+
+        self._open_braces = 0
+
     """ Parsing """
 
     def parse_stmt(self) -> Stmt:
@@ -55,20 +209,29 @@ class Parser:
     def parse_var_declaration(
         self,
     ) -> Stmt:
-        is_constant = self.eat().type == TokenType.CONST
+        keyword = self.eat()
+        is_constant = keyword.type == TokenType.CONST
         identifier = self.expect(
             TokenType.IDENTIFIER,
             "Expected identifier name following <let | const> keyword.",
         ).value
 
         if self.at().type == TokenType.SEMICOLON:
-            self.eat()  # expect semicolon.
+            semicolon = self.eat()  # expect semicolon.
             if is_constant:
-                raise ValueError(
-                    "Must assign value to constant expression. No value provided."
+                # Reported but not raised, the statement itself is complete.
+                self._diagnostics.append(
+                    Diagnostic(
+                        "Must assign value to constant expression. No value provided.",
+                        keyword.start,
+                        semicolon.start + 1,
+                    )
                 )
 
-            return VarDeclaration(False, identifier)
+            declaration = VarDeclaration(False, identifier)
+            declaration.start = keyword.start
+            declaration.end = semicolon.start + 1
+            return declaration
 
         self.expect(
             TokenType.EQUALS,
@@ -77,10 +240,12 @@ class Parser:
 
         declaration = VarDeclaration(is_constant, identifier, self.parse_expr())
 
-        self.expect(
+        declaration.start = keyword.start
+        semicolon = self.expect(
             TokenType.SEMICOLON,
             "Variable declaration statement must end with a semicolon.",
         )
+        declaration.end = semicolon.start + 1
 
         return declaration
 
@@ -94,183 +259,313 @@ class Parser:
         UnaryExpr (-x, !x, ~x)
         MemberExpr (object.property, array[index])
         FunctionCall (function(arg1, arg2), obj.method())
-        PrimaryExpr (123, x, (x + y))
+        PrimaryExpr (123, x, (x + y), [x, y])
+
+    Expressions are parsed by a table-driven precedence (Pratt) parser that
+    looks every token up once: in PREFIX_ACTIONS where an operand is
+    expected, otherwise in the INFIX_ACTIONS table for what may follow the
+    last operand. Binary operators are ordered by BINDING_POWER, so a new
+    level is a token type in the infix tables plus its operators' binding
+    powers. A unary level is a prefix action pushing the operator with its
+    own binding power.
+
+    There is no Python recursion, so generated input can nest 100k+ levels
+    deep. Instead the parser keeps explicit stacks:
+        operands   finished sub-expressions
+        operators  binary operators waiting for their right hand side
+        frames     open constructs, one per ( [ { = or call, each remembering
+                   where its operators start and what closes it
+    The grammar is the same as the old parse_* cascade:
+        - `{` starts an object literal only where an assignment expression
+          starts, and only `=` may follow its closing brace.
+        - `.` `[` `(` bind to the operand before them, after a call only
+          another call may follow. Where an operand is expected `[` starts
+          an array literal instead.
+        - `x = y` takes everything before it as the assignee, the right hand
+          side is another assignment expression and a trailing `;` is eaten.
     """
 
     def parse_expr(self) -> Expr:
-        return self.parse_assignment_expr()  # Lowest order of prescidence
+        tokens = self._tokens
+        prefix_actions = PREFIX_ACTIONS
+        infix_actions = INFIX_ACTIONS
+        binding_power = BINDING_POWER
+        operands: list[Expr] = []
+        operators: list[str] = []
+        # [kind, operator stack height at open, data], `frame` is the innermost.
+        frame: list = [FRAME_EXPR, 0, None]
+        frames: list[list] = [frame]
+        expecting_operand = True
+        expr_start = True  # an object literal may start here
+        postfix = POSTFIX_MEMBER  # what may follow the last operand
+
+        while True:
+            tk = self._current
+
+            if expecting_operand:
+                action = prefix_actions.get(tk.type)
+                if action == PREFIX_IDENTIFIER:
+                    self._current = next(tokens, tk)  # inlined self.eat()
+                    node = Identifier(tk.value)
+                    node.start = tk.start
+                    operands.append(node)
+                elif action == PREFIX_NUMBER:
+                    self._current = next(tokens, tk)
+                    node = NumericLiteral(float(tk.value))
+                    node.start = start = tk.start
+                    node.end = start + len(tk.value)
+                    operands.append(node)
+                elif action == PREFIX_PAREN:
+                    self._current = next(tokens, tk)  # eat opening paren
+                    frame = [FRAME_PAREN, len(operators), tk.start]
+                    frames.append(frame)
+                    expr_start = True
+                    continue
+                elif action == PREFIX_ARRAY:
+                    self._current = next(tokens, tk)  # eat opening bracket
+                    node = ArrayLiteral([])
+                    node.start = tk.start
+                    if self._current.type != TokenType.CLOSEBRACKET:
+                        frame = [FRAME_ELEMENT, len(operators), node]
+                        frames.append(frame)
+                        expr_start = True
+                        continue
+                    node.end = self.eat().start + 1
+                    operands.append(node)
+                elif action == PREFIX_OBJECT and expr_start:
+                    self._current = next(tokens, tk)  # advances past the open brace.
+                    node = ObjectLiteral([])
+                    node.start = tk.start
+                    self._open_braces += 1
+                    if self.parse_object_keys(node):
+                        frame = [FRAME_PROPERTY, len(operators), node]
+                        frames.append(frame)
+                        continue
+                    operands.append(node)
+                    expecting_operand = False
+                    postfix = POSTFIX_OBJECT
+                    continue
+                else:
+                    self.unexpected_token()
+
+                expecting_operand = False
+                postfix = POSTFIX_MEMBER
+                continue
 
-    # let x = 10; x = 20;
-    def parse_assignment_expr(self) -> Expr:
-        left = self.parse_object_expr()
+            # An operand was just parsed, see if the expression continues.
+            action = infix_actions[postfix].get(tk.type)
+
+            if action == INFIX_BINARY:
+                # 10-5*10 -> (10 - (5 * 10)) | Order of operation - BIDMAS/BODMAS
+                power = binding_power[tk.value]
+                floor = frame[1]
+                while len(operators) > floor and binding_power[operators[-1]] >= power:
+                    right = operands.pop()
+                    operands[-1] = BinaryExpr(operands[-1], right, operators.pop())
+                operators.append(tk.value)
+                self._current = next(tokens, tk)
+                expecting_operand = True
+                expr_start = False
+                continue
 
-        if self.at().type == TokenType.EQUALS:
-            self.eat()  # advance past equals
-            value = (
-                self.parse_assignment_expr()
-            )  # | x = foo = bar <- assignment chaining
-            if self.at().type == TokenType.SEMICOLON:
-                self.eat()  # eats semi colon if there is one
-            return AssignmentExpr(left, value)
+            if action == INFIX_DOT:
+                self.eat()
+                # non-computed values aka obj.expr, the property is a primary
+                match self.at().type:
+                    case TokenType.IDENTIFIER:
+                        key = self.eat()
+                        prop = Identifier(key.value)
+                        prop.start = key.start
+                        operands[-1] = MemberExpr(operands[-1], prop, False)
+                    case TokenType.NUMBER:
+                        key = self.eat()
+                        self.error(
+                            f"Cannot use dot operator without right hand side being an identifier",
+                            key.start,
+                            key.end,
+                        )
+                    case TokenType.OPENPAREN:
+                        self.eat()
+                        frame = [FRAME_DOT_PAREN, len(operators), operands.pop()]
+                        frames.append(frame)
+                        expecting_operand = True
+                        expr_start = True
+                    case _:
+                        self.unexpected_token()
+                continue
 
-        return left
+            if action == INFIX_COMPUTED:
+                self.eat()  # allows obj[computed_value]
+                frame = [FRAME_COMPUTED, len(operators), operands.pop()]
+                frames.append(frame)
+                expecting_operand = True
+                expr_start = True
+                continue
 
-    # { Prop[] }
-    def parse_object_expr(self) -> Expr:
-        if self.at().type != TokenType.OPENBRACE:
-            return self.parse_additive_expr()
+            if action == INFIX_CALL:
+                # add(10, foo()) <- these are arguments, args are just expressions.
+                self.eat()
+                caller = operands.pop()
+                if self.at().type == TokenType.CLOSEPAREN:
+                    node = CallExpr([], caller)
+                    node.end = self.eat().start + 1
+                    operands.append(node)
+                    postfix = POSTFIX_CALL
+                else:
+                    frame = [FRAME_ARGS, len(operators), (caller, [])]
+                    frames.append(frame)
+                    expecting_operand = True
+                    expr_start = True
+                continue
 
-        self.eat()  # advances past the open brace.
-        properties = []
+            if action == INFIX_ASSIGNMENT:
+                # let x = 10; x = 20; | x = foo = bar <- assignment chaining
+                self.eat()  # advance past equals
+                while len(operators) > frame[1]:
+                    right = operands.pop()
+                    operands[-1] = BinaryExpr(operands[-1], right, operators.pop())
+                frame = [FRAME_ASSIGNMENT, len(operators), operands.pop()]
+                frames.append(frame)
+                expecting_operand = True
+                expr_start = True
+                continue
 
+            # Nothing continues the innermost construct, finish it.
+            while len(operators) > frame[1]:
+                right = operands.pop()
+                operands[-1] = BinaryExpr(operands[-1], right, operators.pop())
+            closed = frames.pop()
+            kind, data = closed[0], closed[2]
+
+            if kind == FRAME_EXPR:
+                return operands.pop()
+
+            frame = frames[-1]
+            value = operands.pop()
+            postfix = POSTFIX_MEMBER
+            if kind == FRAME_PAREN:
+                close = self.expect(
+                    TokenType.CLOSEPAREN,
+                    "Unexpected token found inside parenthesised expression. Expected closing parenthesis.",
+                )  # eat closing paren
+                # The expression's span takes in its parens.
+                value.start = data
+                value.end = close.start + 1
+                operands.append(value)
+            elif kind == FRAME_ASSIGNMENT:
+                if self.at().type == TokenType.SEMICOLON:
+                    self.eat()  # eats semi colon if there is one
+                operands.append(AssignmentExpr(data, value))
+                postfix = POSTFIX_DONE
+            elif kind == FRAME_ARGS:
+                caller, args = data
+                args.append(value)
+                if self.at().type == TokenType.COMMA:
+                    self.eat()
+                    frame = closed  # next argument
+                    frames.append(frame)
+                    expecting_operand = True
+                    expr_start = True
+                    continue
+                close = self.expect(
+                    TokenType.CLOSEPAREN,
+                    "Missing closing parenthesis inside arguments list",
+                )
+                node = CallExpr(args, caller)
+                node.end = close.start + 1
+                operands.append(node)
+                postfix = POSTFIX_CALL
+            elif kind == FRAME_COMPUTED:
+                close = self.expect(
+                    TokenType.CLOSEBRACKET, "Missing closing bracket in computed value."
+                )
+                node = MemberExpr(data, value, True)
+                node.end = close.start + 1
+                operands.append(node)
+            elif kind == FRAME_DOT_PAREN:
+                close = self.expect(
+                    TokenType.CLOSEPAREN,
+                    "Unexpected token found inside parenthesised expression. Expected closing parenthesis.",
+                )
+                if value.kind != "Identifier":
+                    self.error(
+                        f"Cannot use dot operator without right hand side being an identifier",
+                        *span_of(value),
+                    )
+                node = MemberExpr(data, value, False)
+                node.end = close.start + 1
+                operands.append(node)
+            elif kind == FRAME_ELEMENT:
+                data.elements.append(value)
+                if self.at().type == TokenType.COMMA:
+                    self.eat()
+                    # Allows a trailing comma -> [1, 2,]
+                    if self.at().type != TokenType.CLOSEBRACKET:
+                        frame = closed  # next element
+                        frames.append(frame)
+                        expecting_operand = True
+                        expr_start = True
+                        continue
+                close = self.expect(
+                    TokenType.CLOSEBRACKET, "Missing closing bracket in array literal."
+                )
+                data.end = close.start + 1
+                operands.append(data)
+            elif kind == FRAME_PROPERTY:
+                data.properties[-1].value = value
+                if self.at().type != TokenType.CLOSEBRACE:
+                    self.expect(
+                        TokenType.COMMA,
+                        "Expected comma or closing brace following propery.",
+                    )
+                if self.parse_object_keys(data):
+                    frame = closed  # next property value
+                    frames.append(frame)
+                    expecting_operand = True
+                    expr_start = True
+                    continue
+                operands.append(data)
+                postfix = POSTFIX_OBJECT
+
+    # { key: val, key2: val2 } <,> optional
+    def parse_object_keys(self, obj: ObjectLiteral) -> bool:
+        # Adds properties up to the next one with a value. Returns True with
+        # that property last in `obj.properties` and its value still to be
+        # parsed, or False once the closing brace has been eaten.
+        properties = obj.properties
         while self.not_eof() and self.at().type != TokenType.CLOSEBRACE:
-            # { key: val, key2: val2 } <,> optional
-
-            key = self.expect(
-                TokenType.IDENTIFIER, "Object literal key expected."
-            ).value
+            key = self.expect(TokenType.IDENTIFIER, "Object literal key expected.")
+            prop = PropertyLiteral(key.value, None)
+            prop.start = key.start
+            properties.append(prop)
 
             # Allows shorthand key: pair -> { key, }
             if self.at().type == TokenType.COMMA:
                 self.eat()  # advance past the comma
-                properties.append(PropertyLiteral(key, None))
+                prop.end = key.start + len(key.value)
                 continue
             # Allows shorthand key: pair -> { key }
             elif self.at().type == TokenType.CLOSEBRACE:
-                properties.append(PropertyLiteral(key, None))
+                prop.end = key.start + len(key.value)
                 continue
 
             # { key: val }
             self.expect(
                 TokenType.COLON, "Missing colon following identifier in ObjectExpr."
             )
-            value = self.parse_expr()  # let any kind of value be on the RHS.
-
-            properties.append(PropertyLiteral(key, value))
-            if self.at().type != TokenType.CLOSEBRACE:
-                self.expect(
-                    TokenType.COMMA,
-                    "Expected comma or closing brace following propery.",
-                )
-
-        self.expect(TokenType.CLOSEBRACE, "Object literal missing closing brace.")
-        return ObjectLiteral(properties)
-
-    # 10 + 5 - 5 -> ((10 + 5) - 5)
-    def parse_additive_expr(self) -> Expr:
-        left = self.parse_multiplicitave_expr()
+            return True
 
-        while self.at().value == "+" or self.at().value == "-":
-            operator = self.eat().value
-            right = self.parse_multiplicitave_expr()
-            left = BinaryExpr(left, right, operator)
-
-        return left
-
-    # 10-5*10 -> (10 - (5 * 10)) | Order of operation - BIDMAS/BODMAS
-    def parse_multiplicitave_expr(self) -> Expr:
-        left = self.parse_call_member_expr()
-
-        while (
-            self.at().value == "/" or self.at().value == "*" or self.at().value == "%"
-        ):
-            operator = self.eat().value
-            right = self.parse_call_member_expr()
-            left = BinaryExpr(left, right, operator)
-
-        return left
-
-    # foo.x()
-    def parse_call_member_expr(self) -> Expr:
-        member = self.parse_member_expr()
-
-        if self.at().type == TokenType.OPENPAREN:
-            return self.parse_call_expr(member)
-
-        return member
-
-    def parse_call_expr(self, caller: Expr) -> Expr:
-        call_expr = CallExpr(self.parse_args(), caller)
-
-        # foo.x()() - if foo.x() returns a func
-        if self.at().type == TokenType.OPENPAREN:
-            call_expr = self.parse_call_expr(call_expr)
-
-        return call_expr
-
-    # fn add(x, y) <- x,y are parameters, theyre variables.
-    # add(10, foo()) <- these are arguments, we are calling add() - args are just expressions.
-    def parse_args(self) -> list[Expr]:
-        self.expect(TokenType.OPENPAREN, "Expected open parenthesis")
-        args = (
-            []
-            if self.at().type == TokenType.CLOSEPAREN
-            else self.parse_arguments_list()
-        )
-
-        self.expect(
-            TokenType.CLOSEPAREN, "Missing closing parenthesis inside arguments list"
+        close = self.expect(
+            TokenType.CLOSEBRACE, "Object literal missing closing brace."
         )
-        return args
-
-    # foo(x = 5, v = "Bar")
-    def parse_arguments_list(self) -> list[Expr]:
-        args = [self.parse_assignment_expr()]
-
-        while self.at().type == TokenType.COMMA and self.eat():  # ? self.eat() is None?
-            args.append(self.parse_assignment_expr())
+        obj.end = close.start + 1
+        self._open_braces -= 1
+        return False
 
-        return args
+    def unexpected_token(self):
+        tk = self.at()
+        self.error(f"Unexpected token found during parsing! {tk}", tk.start, tk.end)
 
-    def parse_member_expr(self) -> Expr:
-        obj = self.parse_primary_expr()
-
-        while (
-            self.at().type == TokenType.DOT or self.at().type == TokenType.OPENBRACKET
-        ):
-            operator = self.eat()
-            prop: Expr
-            computed: bool
-
-            # non-computed values aka obj.expr
-            if operator.type == TokenType.DOT:
-                computed = False
-                prop = self.parse_primary_expr()  # get identifier
-
-                if prop.kind != "Identifier":
-                    raise ValueError(
-                        f"Cannot use dot operator without right hand side being an identifier"
-                    )
-            else:  # allows obj[computed_value]
-                computed = True
-                prop = self.parse_expr()
-                self.expect(
-                    TokenType.CLOSEBRACKET, "Missing closing bracket in computed value."
-                )
-
-            obj = MemberExpr(obj, prop, computed)
-
-        return obj
-
-    def parse_primary_expr(self) -> Expr:
-        tk = self.at().type
-
-        match tk:
-            case TokenType.IDENTIFIER:
-                return Identifier(self.eat().value)
-            case TokenType.NUMBER:
-                return NumericLiteral(float(self.eat().value))
-            case TokenType.OPENPAREN:
-                self.eat()  # eat opening paren
-                value = self.parse_expr()
-                self.expect(
-                    TokenType.CLOSEPAREN,
-                    "Unexpected token found inside parenthesised expression. Expected closing parenthesis.",
-                )  # eat closing paren
-                return value
-            case _:
-                print(
-                    f"Unexpected token found during parsing! {self.at()}",
-                    file=sys.stderr,
-                )
-                exit(1)
+    def error(self, message: str, start: int, end: int):
+        # Abandons the statement, parse_program records the error and resyncs.
+        raise ParseError([Diagnostic(message, start, end)])
@@ -0,0 +1,113 @@
+from bisect import bisect_right
+
+"""
+Source positions:
+    Tokens carry `start`, a plain character offset into the source, and AST
+    nodes built by the parser carry `start` / `end` (end exclusive). Nothing
+    about lines is worked out while lexing or parsing. A LineTable turns
+    offsets into line and column numbers, and only builds its table of line
+    starts the first time an error is rendered.
+
+    To keep parsing fast a node only stores the offsets its own tokens give,
+    `span_of` works out the rest from its children when asked:
+        BinaryExpr, AssignmentExpr   first child's start, last child's end
+        CallExpr, MemberExpr         start of the caller / object, and the
+                                     end of the key for obj.key
+        PropertyLiteral              end of its value
+        Identifier                   start + length of the name
+    A parenthesised expression stores both, so its span takes in the parens.
+
+    Nodes the parser did not build (optimizer output, cached ASTs) have no
+    position, `span_of` returns None for them. Statements reused by
+    frontend/incremental keep the offsets they were parsed at.
+"""
+
+
+def span_start(astNode) -> int | None:
+    # Down the left edge of the tree until a node that knows its start.
+    while True:
+        start = getattr(astNode, "start", None)
+        if start is not None:
+            return start
+        match astNode.kind:
+            case "BinaryExpr":
+                astNode = astNode.left
+            case "AssignmentExpr":
+                astNode = astNode.assigne
+            case "CallExpr":
+                astNode = astNode.caller
+            case "MemberExpr":
+                astNode = astNode.obj
+            case _:
+                return None
+
+
+def span_end(astNode) -> int | None:
+    # Down the right edge of the tree until a node that knows its end.
+    while True:
+        end = getattr(astNode, "end", None)
+        if end is not None:
+            return end
+        match astNode.kind:
+            case "BinaryExpr":
+                astNode = astNode.right
+            case "MemberExpr":
+                astNode = astNode.prop  # obj.key, the other forms store theirs
+            case "AssignmentExpr" | "PropertyLiteral" if astNode.value is not None:
+                astNode = astNode.value
+            case "Identifier" if getattr(astNode, "start", None) is not None:
+                return astNode.start + len(astNode.symbol)
+            case _:
+                return None
+
+
+def span_of(astNode) -> tuple[int, int] | None:
+    start, end = span_start(astNode), span_end(astNode)
+    if start is None or end is None:
+        return None
+    return start, end
+
+
+class LineTable:
+    def __init__(self, source: str):
+        self.source = source
+        self._line_starts: list[int] | None = None
+
+    def line_starts(self) -> list[int]:
+        if self._line_starts is None:
+            starts = [0]
+            index = self.source.find("\n")
+            while index != -1:
+                starts.append(index + 1)
+                index = self.source.find("\n", index + 1)
+            self._line_starts = starts
+        return self._line_starts
+
+    def line_column(self, offset: int) -> tuple[int, int]:
+        # 1-based line and column of a character offset.
+        starts = self.line_starts()
+        line = bisect_right(starts, offset)
+        return line, offset - starts[line - 1] + 1
+
+    def line_text(self, line: int) -> str:
+        starts = self.line_starts()
+        start = starts[line - 1]
+        end = starts[line] - 1 if line < len(starts) else len(self.source)
+        return self.source[start:end]
+
+    def render(self, message: str, start: int, end: int) -> str:
+        # message
+        #   --> line 3, column 9
+        #    3 | foo = obj.foo(bar(x, y) + 5;
+        #      |         ^^^
+        line, column = self.line_column(start)
+        text = self.line_text(line).rstrip("\r")
+        # Underline at least one character, and at most to the end of the line.
+        width = max(1, min(end - start, len(text) - column + 1))
+        gutter = " " * len(str(line))
+        return (
+            f"{message}\n"
+            f"  --> line {line}, column {column}\n"
+            f"  {line} | {text}\n"
+            f"  {gutter} | {' ' * (column - 1)}{'^' * width}"
+        )
@@ -1,3 +1,4 @@
+import operator
 from typing import Literal
 
 NodeType = Literal[
@@ -12,13 +13,29 @@ NodeType = Literal[
     # Literals
     "PropertyLiteral",
     "ObjectLiteral",
+    "ArrayLiteral",
     "NumericLiteral",
     #
     "Identifier",
 ]
 
 
+# Binary operator -> the Python function computing it on two floats.
+OPERATOR_FUNCTIONS = {
+    "+": operator.add,
+    "-": operator.sub,
+    "*": operator.mul,
+    "/": operator.truediv,
+    "%": operator.mod,
+}
+
+
 class Stmt:
+    # Nodes carry no __dict__, large generated programs are mostly AST.
+    # `start` / `end` are source offsets set by the parser only, nodes built
+    # anywhere else leave them unset (see frontend/source_map.span_of).
+    __slots__ = ("kind", "start", "end")
+
     def __init__(self, kind: NodeType):
         self.kind = kind
 
@@ -28,6 +45,8 @@ class Stmt:
 
 
 class Expr(Stmt):
+    __slots__ = ()
+
     def __str__(self, level=0):
         indent = "  " * level
         return f"{indent}{self.kind}"
@@ -37,6 +56,8 @@ class Expr(Stmt):
 
 
 class Program(Stmt):
+    __slots__ = ("body",)
+
     def __init__(self, body: list[Stmt]):
         super().__init__("Program")
         self.body = body
@@ -48,11 +69,14 @@ class Program(Stmt):
 
 
 class VarDeclaration(Stmt):
+    __slots__ = ("constant", "identifier", "value", "slot")
+
     def __init__(self, constant: bool, identifier: str, value: Expr = None):
         super().__init__("VarDeclaration")
         self.constant = constant
         self.identifier = identifier
         self.value = value
+        self.slot: int | None = None  # Filled in by runtime/resolver
 
     def __str__(self, level=0):
         indent = "  " * level
@@ -74,6 +98,8 @@ class VarDeclaration(Stmt):
 
 
 class AssignmentExpr(Expr):
+    __slots__ = ("assigne", "value")
+
     def __init__(self, assigne: Expr, value: Expr):
         super().__init__("AssignmentExpr")
         self.assigne = assigne
@@ -91,11 +117,15 @@ class AssignmentExpr(Expr):
 
 
 class BinaryExpr(Expr):
+    __slots__ = ("left", "right", "operator", "apply")
+
     def __init__(self, left: Expr, right: Expr, operator: str):
         super().__init__("BinaryExpr")
         self.left = left
         self.right = right
         self.operator = operator
+        # Looked up once here, evaluators call it on two floats directly.
+        self.apply = OPERATOR_FUNCTIONS.get(operator)
 
     def __str__(self, level=0):
         indent = "  " * level
@@ -110,11 +140,17 @@ class BinaryExpr(Expr):
 
 
 class MemberExpr(Expr):
+    __slots__ = ("obj", "prop", "computed", "cached_shape", "cached_index")
+
     def __init__(self, obj: Expr, prop: Expr, computed: bool):
         super().__init__(self.__class__.__name__)
         self.obj = obj  # ?
         self.prop = prop
         self.computed = computed
+        # Inline cache, filled in by the evaluator -> the shape of the last
+        # object read here and the index of the key's value in that shape
+        self.cached_shape = None
+        self.cached_index: int | None = None
 
     def __str__(self, level=0):
         indent = "  " * level
@@ -129,10 +165,16 @@ class MemberExpr(Expr):
 
 
 class CallExpr(Expr):
+    __slots__ = ("args", "caller", "cached_env", "cached_callee")
+
     def __init__(self, args: list[Expr], caller: Expr):
         super().__init__(self.__class__.__name__)
         self.args = args
         self.caller = caller
+        # Callee cache for fn(...), filled in by the evaluator -> the serial
+        # of the environment the name was looked up in and what it was bound to
+        self.cached_env: int | None = None
+        self.cached_callee = None
 
     def __str__(self, level=0):
         indent = "  " * level
@@ -150,10 +192,15 @@ class CallExpr(Expr):
 
 
 class PropertyLiteral(Expr):
+    __slots__ = ("key", "value", "depth", "slot")
+
     def __init__(self, key: str, value: Expr = None):
         super().__init__(self.__class__.__name__)
         self.key = key
         self.value = value
+        # Shorthand { key } only, filled in by runtime/resolver
+        self.depth: int | None = None
+        self.slot: int | None = None
 
     def __str__(self, level=0):
         indent = "  " * level
@@ -170,9 +217,14 @@ class PropertyLiteral(Expr):
 
 
 class ObjectLiteral(Expr):
+    __slots__ = ("properties", "shape", "layout")
+
     def __init__(self, properties: list[PropertyLiteral]):
         super().__init__(self.__class__.__name__)
         self.properties = properties
+        # Filled in by the evaluator -> runtime/values.literal_shape of the keys
+        self.shape = None
+        self.layout: tuple[int, ...] | None = None
 
     def __str__(self, level=0):
         indent = "  " * level
@@ -180,7 +232,28 @@ class ObjectLiteral(Expr):
         return f"{indent}{self.__class__.__name__}:\n{prop_str}"
 
 
+class ArrayLiteral(Expr):
+    __slots__ = ("elements",)
+
+    def __init__(self, elements: list[Expr]):
+        super().__init__(self.__class__.__name__)
+        self.elements = elements
+
+    def __str__(self, level=0):
+        indent = "  " * level
+        elements_str = (
+            "\n".join(element.__str__(level + 2) for element in self.elements)
+            if len(self.elements) > 0
+            else f"{indent}    <empty>"
+        )
+        return (
+            f"{indent}{self.__class__.__name__}:\n{indent}  Elements:\n{elements_str}"
+        )
+
+
 class NumericLiteral(Expr):
+    __slots__ = ("value",)
+
     def __init__(self, value: float):
         super().__init__(self.__class__.__name__)
         self.value = value
@@ -191,9 +264,14 @@ class NumericLiteral(Expr):
 
 
 class Identifier(Expr):
+    __slots__ = ("symbol", "depth", "slot")
+
     def __init__(self, symbol: str):
         super().__init__(self.__class__.__name__)
         self.symbol = symbol
+        # Filled in by runtime/resolver -> (scopes up, index into that scope)
+        self.depth: int | None = None
+        self.slot: int | None = None
 
     def __str__(self, level=0):
         indent = "  " * level
@@ -1,35 +1,92 @@
 import argparse
-from rich import print
-from frontend.parser import Parser
-from runtime.interpreter import evaluate
-from runtime.environment import Environment, create_global_env
-from runtime.values import *
+import subprocess
+import sys
 
+from runtime.engines import ENGINES, QUOTA_ENGINES, create_env, execute
+from util.printer import print
+from util.version import VERSION
+
+
+def run(
+    filename: str,
+    engine: str = "tree",
+    optimize: bool = False,
+    use_cache: bool = True,
+    limits: dict | None = None,
+):
+    from frontend.diagnostics import ParseError
+    from frontend.parser import Parser
 
-def run(filename: str):
     parser = Parser()
-    env = create_global_env()
+    env = create_env(engine, limits)
 
-    print("[bold]Repl [cyan]v0.0.1[/cyan][/bold]")
+    print(f"[bold]Repl [cyan]v{VERSION}[/cyan][/bold]")
 
     try:
         with open(filename, "r") as file:
             content = file.read()
             # if "exit" in content:
             #     exit(1)
-            program = parser.produce_ast(content)
-            result = evaluate(program, env)
+            if use_cache:
+                from frontend.ast_cache import produce_cached_ast
+
+                program = produce_cached_ast(parser, filename, content)
+            else:
+                program = parser.produce_ast(content)
+            if optimize:
+                from runtime.optimizer import Optimizer
+
+                optimizer = Optimizer()
+                program = optimizer.optimize(program)
+                print(
+                    f"[dim]optimizer: eliminated {optimizer.eliminated} nodes "
+                    f"({optimizer.folded} folded, {optimizer.propagated} constants propagated)[/dim]"
+                )
+            result = execute(program, env, engine)
             print(result)
     except FileNotFoundError:
         print(f"[bold red]error:[/bold red] File '{filename}' does not exist.")
         exit(1)
+    except ParseError as e:
+        sys.stderr.write(f"{e}\n")  # plain, source lines are not markup
+        exit(1)
 
 
-def repl():
-    parser = Parser()
-    env = create_global_env()
+def check(filename: str):
+    # Parse only, reporting every syntax error instead of stopping at the first.
+    from frontend.parser import Parser
+    from frontend.source_map import LineTable
+
+    try:
+        with open(filename, "r") as file:
+            content = file.read()
+    except FileNotFoundError:
+        print(f"[bold red]error:[/bold red] File '{filename}' does not exist.")
+        exit(1)
+
+    _, diagnostics = Parser().produce_ast_with_diagnostics(content)
+    if diagnostics:
+        lines = LineTable(content)
+        for diagnostic in diagnostics:
+            sys.stderr.write(diagnostic.render(lines) + "\n")
+        print(f"{len(diagnostics)} syntax error(s) in '{filename}'", file=sys.stderr)
+        exit(1)
+    print(f"'{filename}' has no syntax errors")
 
-    print("[bold]Repl [cyan]v0.0.1[/cyan][/bold]")
+
+def repl(engine: str = "tree", optimize: bool = False, limits: dict | None = None):
+    from frontend.diagnostics import ParseError
+    from frontend.incremental import IncrementalParser
+    from frontend.parser import Parser
+    from runtime.optimizer import Optimizer
+
+    # Each line is diffed against the last one and only the statements that
+    # changed are parsed again. The optimizer rewrites nodes in place, so it
+    # gets fresh ones instead of the reused ones.
+    parser = Parser() if optimize else IncrementalParser()
+    env = create_env(engine, limits)  # one quota for the whole session
+
+    print(f"[bold]Repl [cyan]v{VERSION}[/cyan][/bold]")
 
     while True:
         inp = input("> ")
@@ -38,19 +95,174 @@ def repl():
         if inp == "" or "exit" in inp:
             exit(1)
 
-        program = parser.produce_ast(inp)
+        try:
+            program = parser.produce_ast(inp)
+        except ParseError as e:
+            sys.stderr.write(f"{e}\n")  # plain, source lines are not markup
+            continue
+        if optimize:
+            program = Optimizer().optimize(program)
         # print(program) # AST Tree
 
-        result = evaluate(program, env)
+        result = execute(program, env, engine)
         print(result)
 
 
+# Top level packages that make up the interpreter itself.
+INTERPRETER_PACKAGES = ("frontend", "runtime", "util")
+
+
+def startup_profile(argv: list[str]):
+    # Rerun ourselves under `-X importtime` and summarise its report.
+    child = subprocess.run(
+        [sys.executable, "-X", "importtime", __file__, *argv],
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+    rows = []  # (self us, cumulative us, module, nesting depth)
+    for line in child.stderr.splitlines():
+        if not line.startswith("import time:"):
+            sys.stderr.write(line + "\n")  # the script's own stderr output
+            continue
+        if "[us]" in line:
+            continue  # column header
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        module = name.strip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(self_us), int(cumulative_us), module, depth))
+
+    total = sum(cumulative for _, cumulative, _, depth in rows if depth == 0)
+    ours = [row for row in rows if row[2].split(".")[0] in INTERPRETER_PACKAGES]
+    rich_total = sum(row[0] for row in rows if row[2].split(".")[0] == "rich")
+
+    print("[bold]Startup profile[/bold] (-X importtime, microseconds)", file=sys.stderr)
+    print(f"{'self':>9} | {'cumulative':>10} | module", file=sys.stderr)
+    for self_us, cumulative_us, module, depth in ours:
+        print(
+            f"{self_us:>9} | {cumulative_us:>10} | {'  ' * depth}{module}",
+            file=sys.stderr,
+        )
+    print(
+        f"all imports {total / 1000:.1f} ms, "
+        f"interpreter modules {sum(row[0] for row in ours) / 1000:.1f} ms (self), "
+        f"rich {rich_total / 1000:.1f} ms",
+        file=sys.stderr,
+    )
+    exit(child.returncode)
+
+
 if __name__ == "__main__":
     flag_parser = argparse.ArgumentParser(description="Interpreter argument flags.")
     flag_parser.add_argument("--file", type=str, help="Specify filename")
+    flag_parser.add_argument(
+        "--engine",
+        type=str,
+        choices=ENGINES,
+        default="tree",
+        help="Execution engine: tree-walking evaluator, compiled closures, compiled closures over resolved variable slots or bytecode VM",
+    )
+    flag_parser.add_argument(
+        "--optimize",
+        action="store_true",
+        help="Fold constants and simplify expressions before running",
+    )
+    flag_parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always reparse --file instead of using its cached AST in __pycache__",
+    )
+    flag_parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="Print how long importing each of the interpreter's own modules took",
+    )
+    flag_parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Only parse --file or --batch files, reporting every syntax error",
+    )
+    flag_parser.add_argument("--version", action="store_true", help="Print version")
+    flag_parser.add_argument(
+        "--batch",
+        type=str,
+        help="Run every file in a directory or matching a glob, printing JSON lines",
+    )
+    flag_parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for --batch and --serve (default: one per CPU)",
+    )
+    flag_parser.add_argument(
+        "--serve",
+        type=str,
+        help="Serve JSON-RPC evaluate requests on a Unix socket path, or - for stdin/stdout",
+    )
+    flag_parser.add_argument(
+        "--load-test",
+        type=str,
+        help="Load test a --serve Unix socket and report latency and throughput",
+    )
+    flag_parser.add_argument(
+        "--requests", type=int, default=1000, help="Requests sent by --load-test"
+    )
+    flag_parser.add_argument(
+        "--connections",
+        type=int,
+        default=4,
+        help="Concurrent connections used by --load-test",
+    )
+    flag_parser.add_argument(
+        "--max-steps", type=int, help="Stop a script after evaluating this many nodes"
+    )
+    flag_parser.add_argument(
+        "--max-depth", type=int, help="Maximum nesting depth while evaluating"
+    )
+    flag_parser.add_argument(
+        "--max-properties", type=int, help="Maximum properties in one object literal"
+    )
+    flag_parser.add_argument(
+        "--max-bytes",
+        type=int,
+        help="Approximate maximum bytes a script may allocate for objects",
+    )
     args = flag_parser.parse_args()
-    if args.file:
+
+    limits = {
+        name: getattr(args, name)
+        for name in ("max_steps", "max_depth", "max_properties", "max_bytes")
+        if getattr(args, name) is not None
+    } or None
+    if limits is not None and args.engine not in QUOTA_ENGINES:
+        flag_parser.error(
+            f"--max-* limits are only enforced by the {', '.join(QUOTA_ENGINES)} engine"
+        )
+    if args.load_test and (args.requests < 1 or args.connections < 1):
+        flag_parser.error("--requests and --connections must be at least 1")
+    if args.startup_profile:
+        startup_profile([arg for arg in sys.argv[1:] if arg != "--startup-profile"])
+    elif args.version:
+        print(f"Repl v{VERSION}")
+    elif args.serve:
+        from runtime.server import serve
+
+        serve(args.serve, args.engine, args.optimize, args.workers, limits=limits)
+    elif args.load_test:
+        from runtime.server import load_test
+
+        load_test(args.load_test, args.requests, args.connections)
+    elif args.batch:
+        from runtime.batch import run_batch
+
+        all_ok = run_batch(
+            args.batch, args.engine, args.optimize, args.workers, limits, args.check
+        )
+        exit(0 if all_ok else 1)
+    elif args.file and args.check:
+        check(args.file)
+    elif args.file:
         filename = args.file
-        run(filename)
+        run(filename, args.engine, args.optimize, not args.no_cache, limits)
     else:
-        repl()
+        repl(args.engine, args.optimize, limits)
@@ -0,0 +1,64 @@
+import asyncio
+
+from frontend.syntax_tree import Stmt
+from runtime.environment import Environment
+from runtime.interpreter import walk
+from runtime.quota import Quota
+from runtime.values import RuntimeVal
+
+"""
+Async evaluation:
+    `await evaluate_async(program, env)` runs the tree walk of
+    runtime/interpreter.evaluate, the same explicit-stack loop, but hands
+    control back to the event loop every `step_budget` node evaluations, so
+    long scripts don't block other tasks and many scripts can interleave on
+    one loop. Every node is counted, a literal inside a big object or array
+    included, and nesting depth is only limited by memory.
+
+    The yield points are also where a script can be stopped: cancelling the
+    task, or passing `timeout` (seconds), raises CancelledError /
+    TimeoutError at the next yield. A script that never reaches one (fewer
+    nodes than the budget) always runs to completion.
+
+    Steps are counted by a Quota: the environment's if it has one, which is
+    then enforced the same way as by `evaluate`, otherwise an unlimited one.
+"""
+
+DEFAULT_STEP_BUDGET = 1000
+
+
+class AsyncInterpreter:
+    def __init__(self, step_budget: int = DEFAULT_STEP_BUDGET):
+        if step_budget < 1:
+            raise ValueError(f"step_budget must be at least 1, got {step_budget}.")
+
+        self.step_budget = step_budget
+        self.yields = 0  # times control went back to the event loop
+
+    async def evaluate(self, astNode: Stmt, env: Environment) -> RuntimeVal:
+        quota = env.quota if env.quota is not None else Quota()
+        steps = walk(astNode, env, quota, self.step_budget)
+        try:
+            while True:
+                next(steps)
+                self.yields += 1
+                await asyncio.sleep(0)
+        except StopIteration as finished:
+            return finished.value
+        finally:
+            # Cancelled or timed out at a yield, nothing else will resume it.
+            steps.close()
+
+
+async def evaluate_async(
+    astNode: Stmt,
+    env: Environment,
+    step_budget: int = DEFAULT_STEP_BUDGET,
+    timeout: float | None = None,
+) -> RuntimeVal:
+    interpreter = AsyncInterpreter(step_budget)
+    if timeout is None:
+        return await interpreter.evaluate(astNode, env)
+
+    async with asyncio.timeout(timeout):
+        return await interpreter.evaluate(astNode, env)
@@ -0,0 +1,86 @@
+import glob
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from runtime.worker import check_source, init_worker, run_source
+
+"""
+Batch mode:
+    `main.py --batch <dir|glob>` parses and evaluates every matching file,
+    spread over a ProcessPoolExecutor. Each worker process keeps one warm
+    Parser for all of its files (runtime/worker) and gives every file a
+    fresh global environment. One JSON object per file is written to stdout,
+    in input order:
+        {"file": "a.txt", "ok": true, "type": "number", "result": 20.0,
+         "stdout": ""}
+        {"file": "b.txt", "ok": false, "error": "ValueError: ...",
+         "stdout": "[NumberVal] <value: 7.0, type: number>\n"}
+
+    With `--check` files are only parsed, every syntax error in a file is
+    reported in one pass:
+        {"file": "c.txt", "ok": false,
+         "errors": [{"message": "...", "line": 3, "column": 9}]}
+"""
+
+
+def collect_files(target: str) -> list[str]:
+    if os.path.isdir(target):
+        files = [os.path.join(target, name) for name in os.listdir(target)]
+    else:
+        files = glob.glob(target, recursive=True)
+
+    return sorted(path for path in files if os.path.isfile(path))
+
+
+def run_file(filename: str, check: bool = False) -> dict:
+    try:
+        with open(filename, "r") as file:
+            content = file.read()
+    except OSError as e:
+        return {"file": filename, "ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    if check:
+        return {"file": filename, **check_source(content)}
+    return {"file": filename, **run_source(content)}
+
+
+def check_file(filename: str) -> dict:
+    return run_file(filename, check=True)
+
+
+def run_batch(
+    target: str,
+    engine: str = "tree",
+    optimize: bool = False,
+    workers: int = None,
+    limits: dict | None = None,
+    check: bool = False,
+) -> bool:
+    files = collect_files(target)
+    task = check_file if check else run_file
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        # No point paying for a process pool, run everything right here.
+        init_worker(engine, optimize, limits=limits)
+        return write_results(map(task, files))
+
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(engine, optimize, 0, limits),
+    ) as executor:
+        # Several files per task keeps the inter-process overhead down.
+        chunksize = max(1, len(files) // (workers * 4))
+        return write_results(executor.map(task, files, chunksize=chunksize))
+
+
+def write_results(results) -> bool:
+    all_ok = True
+    for result in results:
+        all_ok = all_ok and result["ok"]
+        sys.stdout.write(json.dumps(result) + "\n")
+
+    return all_ok
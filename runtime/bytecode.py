@@ -0,0 +1,268 @@
+from array import array
+from enum import IntEnum
+
+from frontend.syntax_tree import (
+    ArrayLiteral,
+    AssignmentExpr,
+    BinaryExpr,
+    CallExpr,
+    Identifier,
+    MemberExpr,
+    NumericLiteral,
+    ObjectLiteral,
+    Program,
+    Stmt,
+    VarDeclaration,
+)
+from runtime.values import MK_NUMBER, NumberVal, literal_shape
+
+
+# Bytecode Opcodes
+class OpCode(IntEnum):
+    LOAD_CONST = 0  # <const index>       push constants[i]
+    LOAD_NULL = 1  #                      push null
+    LOAD_VAR = 2  # <name index>          push value of variable
+    STORE_VAR = 3  # <name index>         assign top of stack, leaves it pushed
+    DECLARE_VAR = 4  # <name index> <constant>  declare top of stack, leaves it pushed
+    BINARY_OP = 5  # <operator index>     pop right, pop left, push result
+    BUILD_OBJECT = 6  # <literal index>   pop one value per property, push ObjectVal
+    EVAL_NODE = 7  # <node index>         push evaluate(constants[i], env)
+    RAISE = 8  # <message index>          raise ValueError(constants[i])
+    POP = 9  #                            discard top of stack
+    RETURN = 10  #                        stop and return top of stack
+    GET_PROPERTY = 11  # <member index>   replace the object on top with obj.key
+    GET_COMPUTED = 12  #                  pop key, replace obj on top with obj[key]
+    BUILD_ARRAY = 13  # <element count>   pop that many values, push ArrayVal
+    LOAD_CALLEE = 14  # <call index>      push the callee of fn(...) via its cache
+    CALL = 15  # <arg count>              pop args, replace callee on top with result
+
+
+# Operand index -> operator, used by BINARY_OP.
+BINARY_OPERATORS = ["+", "-", "*", "/", "%"]
+
+# Number of operands that follow each opcode in the instruction stream.
+OPERAND_COUNT = {
+    OpCode.LOAD_CONST: 1,
+    OpCode.LOAD_NULL: 0,
+    OpCode.LOAD_VAR: 1,
+    OpCode.STORE_VAR: 1,
+    OpCode.DECLARE_VAR: 2,
+    OpCode.BINARY_OP: 1,
+    OpCode.BUILD_OBJECT: 1,
+    OpCode.EVAL_NODE: 1,
+    OpCode.RAISE: 1,
+    OpCode.POP: 0,
+    OpCode.RETURN: 0,
+    OpCode.GET_PROPERTY: 1,
+    OpCode.GET_COMPUTED: 0,
+    OpCode.BUILD_ARRAY: 1,
+    OpCode.LOAD_CALLEE: 1,
+    OpCode.CALL: 1,
+}
+
+
+class Chunk:
+    """
+    A compiled program: a flat array('i') of opcodes with their operands
+    inline, plus a constant pool holding numbers, names, object literal
+    shapes and AST nodes: the ones handed back to the tree-walker, the
+    MemberExpr of each GET_PROPERTY and the CallExpr of each LOAD_CALLEE,
+    whose caches the VM uses.
+    """
+
+    def __init__(self):
+        self.code = array("i")
+        self.constants: list = []
+        self._constant_index: dict = {}
+
+    def emit(self, op: OpCode, *operands: int):
+        self.code.append(op)
+        self.code.extend(operands)
+
+    def add_constant(self, value) -> int:
+        # Numbers, names and literal shapes are deduplicated, AST nodes are not.
+        if isinstance(value, NumberVal):
+            # repr keeps 0.0 and -0.0 apart, they compare (and hash) equal.
+            key = (NumberVal, repr(value.value))
+        elif isinstance(value, (str, tuple)):
+            key = (type(value), value)
+        else:
+            key = (type(value), id(value))
+        index = self._constant_index.get(key)
+        if index is None:
+            index = len(self.constants)
+            self.constants.append(value)
+            self._constant_index[key] = index
+
+        return index
+
+    def __str__(self):
+        lines = []
+        pc = 0
+        while pc < len(self.code):
+            op = OpCode(self.code[pc])
+            operands = self.code[pc + 1 : pc + 1 + OPERAND_COUNT[op]].tolist()
+            detail = ""
+            if op == OpCode.BINARY_OP:
+                detail = f"  ({BINARY_OPERATORS[operands[0]]})"
+            elif op == OpCode.GET_PROPERTY:
+                detail = f"  (.{self.constants[operands[0]].prop.symbol})"
+            elif op == OpCode.BUILD_OBJECT:
+                detail = f"  ({self.constants[operands[0]][0].keys})"
+            elif op == OpCode.LOAD_CALLEE:
+                detail = f"  ({self.constants[operands[0]].caller.symbol})"
+            elif op in (OpCode.BUILD_ARRAY, OpCode.CALL):
+                pass  # the operand is a count, not a constant
+            elif len(operands) > 0:
+                constant = self.constants[operands[0]]
+                detail = (
+                    f"  ({constant.kind if isinstance(constant, Stmt) else constant})"
+                )
+            lines.append(f"{pc:>6} {op.name:<14}{' '.join(map(str, operands))}{detail}")
+            pc += 1 + len(operands)
+
+        return "\n".join(lines)
+
+
+"""
+Bytecode compiler:
+    Emits a Chunk for a Program. Every expression leaves exactly one value on
+    the stack, statements in a program body are separated by POP so only the
+    last evaluated value is returned, matching `evaluate`.
+
+    Nodes are emitted from an explicit work stack instead of by recursion,
+    like runtime/interpreter.evaluate walks them, so nesting depth is only
+    limited by memory. The emit_* functions emit a node's leading
+    instructions right away and push what follows them: its children, and
+    (op, *operands) tuples for the instructions that come after those.
+"""
+
+
+def compile_bytecode(program: Program) -> Chunk:
+    chunk = Chunk()
+    emit_node(chunk, program)
+    chunk.emit(OpCode.RETURN)
+    return chunk
+
+
+def emit_node(chunk: Chunk, astNode: Stmt):
+    todo: list = [astNode]
+    while todo:
+        item = todo.pop()
+        if type(item) is tuple:
+            chunk.emit(*item)
+            continue
+
+        match item.kind:
+            case "NumericLiteral":
+                emit_numeric_literal(chunk, item)
+            case "Identifier":
+                emit_identifier(chunk, item)
+            case "ObjectLiteral":
+                emit_object_expr(chunk, item, todo)
+            case "ArrayLiteral":
+                emit_array_expr(chunk, item, todo)
+            case "AssignmentExpr":
+                emit_assignment(chunk, item, todo)
+            case "BinaryExpr":
+                emit_binary_expr(chunk, item, todo)
+            case "MemberExpr":
+                emit_member_expr(chunk, item, todo)
+            case "CallExpr":
+                emit_call_expr(chunk, item, todo)
+            case "Program":
+                emit_program(chunk, item, todo)
+            case "VarDeclaration":
+                emit_var_declaration(chunk, item, todo)
+            case _:
+                # No bytecode for this node yet, the VM hands it to `evaluate`.
+                chunk.emit(OpCode.EVAL_NODE, chunk.add_constant(item))
+
+
+def emit_numeric_literal(chunk: Chunk, literal: NumericLiteral):
+    chunk.emit(OpCode.LOAD_CONST, chunk.add_constant(MK_NUMBER(literal.value)))
+
+
+def emit_identifier(chunk: Chunk, ident: Identifier):
+    chunk.emit(OpCode.LOAD_VAR, chunk.add_constant(ident.symbol))
+
+
+# The functions below push onto `todo` in reverse, the last push is emitted first.
+
+
+def emit_binary_expr(chunk: Chunk, binop: BinaryExpr, todo: list):
+    todo.append((OpCode.BINARY_OP, BINARY_OPERATORS.index(binop.operator)))
+    todo.append(binop.right)
+    todo.append(binop.left)
+
+
+def emit_assignment(chunk: Chunk, node: AssignmentExpr, todo: list):
+    if node.assigne.kind != "Identifier":
+        message = f"Invalid LHS inaide assignment expr {node.assigne}"
+        chunk.emit(OpCode.RAISE, chunk.add_constant(message))
+        return
+
+    todo.append((OpCode.STORE_VAR, chunk.add_constant(node.assigne.symbol)))
+    todo.append(node.value)
+
+
+def emit_object_expr(chunk: Chunk, obj_lit: ObjectLiteral, todo: list):
+    keys = tuple(prop.key for prop in obj_lit.properties)
+    # (shape, layout, property count), see runtime/values.literal_shape
+    shape, layout = literal_shape(keys)
+    todo.append((OpCode.BUILD_OBJECT, chunk.add_constant((shape, layout, len(keys)))))
+
+    for prop in reversed(obj_lit.properties):
+        # { foo } == { foo: foo }
+        if prop.value is None:
+            todo.append((OpCode.LOAD_VAR, chunk.add_constant(prop.key)))
+        else:
+            todo.append(prop.value)
+
+
+def emit_array_expr(chunk: Chunk, array_lit: ArrayLiteral, todo: list):
+    todo.append((OpCode.BUILD_ARRAY, len(array_lit.elements)))
+    todo.extend(reversed(array_lit.elements))
+
+
+def emit_member_expr(chunk: Chunk, member: MemberExpr, todo: list):
+    if member.computed:
+        todo.append((OpCode.GET_COMPUTED,))
+        todo.append(member.prop)
+    else:
+        todo.append((OpCode.GET_PROPERTY, chunk.add_constant(member)))
+    todo.append(member.obj)
+
+
+def emit_call_expr(chunk: Chunk, call: CallExpr, todo: list):
+    todo.append((OpCode.CALL, len(call.args)))
+    todo.extend(reversed(call.args))
+    if call.caller.kind == "Identifier":
+        todo.append((OpCode.LOAD_CALLEE, chunk.add_constant(call)))
+    else:
+        todo.append(call.caller)
+
+
+def emit_program(chunk: Chunk, program: Program, todo: list):
+    if len(program.body) == 0:
+        chunk.emit(OpCode.LOAD_NULL)
+        return
+
+    for i in range(len(program.body) - 1, -1, -1):
+        todo.append(program.body[i])
+        if i > 0:
+            todo.append((OpCode.POP,))
+
+
+def emit_var_declaration(chunk: Chunk, declaration: VarDeclaration, todo: list):
+    todo.append(
+        (
+            OpCode.DECLARE_VAR,
+            chunk.add_constant(declaration.identifier),
+            int(declaration.constant),
+        )
+    )
+    if declaration.value is None:
+        todo.append((OpCode.LOAD_NULL,))
+    else:
+        todo.append(declaration.value)
@@ -0,0 +1,401 @@
+import gc
+from typing import Callable
+
+from frontend.syntax_tree import (
+    ArrayLiteral,
+    AssignmentExpr,
+    BinaryExpr,
+    CallExpr,
+    Identifier,
+    MemberExpr,
+    NumericLiteral,
+    ObjectLiteral,
+    Program,
+    PropertyLiteral,
+    Stmt,
+    VarDeclaration,
+)
+from runtime.environment import Environment, SlotEnvironment
+from runtime.eval.expressions import (
+    NUMERIC_OPERATORS,
+    eval_binary_expr,
+    eval_call,
+    eval_member,
+)
+from runtime.values import (
+    MK_NULL,
+    MK_NUMBER,
+    ObjectVal,
+    RuntimeVal,
+    array_from_values,
+    literal_shape,
+    literal_values,
+    property_key,
+)
+
+# A compiled node, call it with an environment to run it.
+Closure = Callable[[Environment], RuntimeVal]
+
+
+"""
+Closure compilation:
+    The AST is walked once and every node is turned into a Python closure with
+    its children already compiled and its fields already bound. Running the
+    program is then just calling closures, there is no `match astNode.kind`
+    dispatch or function-local import per node like in `evaluate`.
+
+    If the program went through runtime/resolver first, variables compile to
+    slot accesses and the closures must be run with a SlotEnvironment.
+
+    Compiling recurses into a node's children and the closures call their
+    children's closures, one Python frame per level of nesting each. A chain
+    of binary operators, a + b + c ..., compiles to a single closure that
+    runs the chain in a loop, so long flat expressions don't nest at all.
+    An expression nested deeper than MAX_CLOSURE_DEPTH anyway is handed to
+    the tree-walker, which walks it with an explicit stack.
+"""
+
+# Levels of nesting compiled to closures calling closures, well within the
+# recursion limit for compiling (two frames a level) and running them.
+MAX_CLOSURE_DEPTH = 200
+
+
+def compile_program(program: Program) -> Closure:
+    # Compiling allocates a closure per node and creates no garbage, so the
+    # cycle collector would only rescan the growing tree over and over.
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return compile_node(program)
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def child_nodes(astNode: Stmt) -> list[Stmt]:
+    # The nodes compile_node compiles `astNode`'s closure from, a binary
+    # chain's operands all count as its children.
+    match astNode.kind:
+        case "BinaryExpr":
+            children = []
+            while astNode.kind == "BinaryExpr":
+                children.append(astNode.right)
+                astNode = astNode.left
+            children.append(astNode)
+            return children
+        case "AssignmentExpr":
+            return [astNode.assigne, astNode.value]
+        case "VarDeclaration":
+            return [] if astNode.value is None else [astNode.value]
+        case "ObjectLiteral":
+            return [prop.value for prop in astNode.properties if prop.value is not None]
+        case "ArrayLiteral":
+            return astNode.elements
+        case "MemberExpr":
+            return [astNode.obj, astNode.prop]
+        case "CallExpr":
+            return [astNode.caller, *astNode.args]
+        case _:
+            return []
+
+
+def nesting_depth(astNode: Stmt) -> int:
+    # Levels of closures `astNode` compiles to, walked with an explicit stack.
+    deepest = 0
+    todo = [(astNode, 1)]
+    while todo:
+        node, depth = todo.pop()
+        deepest = max(deepest, depth)
+        todo.extend((child, depth + 1) for child in child_nodes(node))
+    return deepest
+
+
+def compile_statement(statement: Stmt) -> Closure:
+    if nesting_depth(statement) <= MAX_CLOSURE_DEPTH:
+        return compile_node(statement)
+
+    # Only the declared value falls back, a resolved declaration must still
+    # declare its slot.
+    if statement.kind == "VarDeclaration":
+        return compile_var_declaration(statement, compile_fallback(statement.value))
+    return compile_fallback(statement)
+
+
+def compile_node(astNode: Stmt) -> Closure:
+    match astNode.kind:
+        case "NumericLiteral":
+            return compile_numeric_literal(astNode)
+        case "Identifier":
+            return compile_identifier(astNode)
+        case "ObjectLiteral":
+            return compile_object_expr(astNode)
+        case "ArrayLiteral":
+            return compile_array_expr(astNode)
+        case "AssignmentExpr":
+            return compile_assignment(astNode)
+        case "BinaryExpr":
+            return compile_binary_expr(astNode)
+        case "MemberExpr":
+            return compile_member_expr(astNode)
+        case "CallExpr":
+            return compile_call_expr(astNode)
+        case "Program":
+            return compile_program_body(astNode)
+        case "VarDeclaration":
+            return compile_var_declaration(astNode)
+        case _:
+            return compile_fallback(astNode)
+
+
+def compile_fallback(astNode: Stmt) -> Closure:
+    # Nodes without a compiled form are handed back to the tree-walker.
+    from runtime.interpreter import evaluate
+
+    def run(env: Environment) -> RuntimeVal:
+        return evaluate(astNode, env)
+
+    return run
+
+
+def compile_numeric_literal(literal: NumericLiteral) -> Closure:
+    # Numbers are immutable, the literal's value is created once and shared.
+    value = MK_NUMBER(literal.value)
+
+    def run(env: Environment) -> RuntimeVal:
+        return value
+
+    return run
+
+
+def compile_identifier(ident: Identifier) -> Closure:
+    symbol = ident.symbol
+
+    # Resolved identifiers read straight out of a SlotEnvironment.
+    if ident.slot is not None:
+        depth, slot = ident.depth, ident.slot
+        if depth == 0:
+
+            def run_local(env: SlotEnvironment) -> RuntimeVal:
+                return env.values[slot]
+
+            return run_local
+
+        def run_slot(env: SlotEnvironment) -> RuntimeVal:
+            return env.lookup_slot(depth, slot)
+
+        return run_slot
+
+    def run(env: Environment) -> RuntimeVal:
+        return env.lookup_var(symbol)
+
+    return run
+
+
+def compile_binary_expr(binop: BinaryExpr) -> Closure:
+    if binop.left.kind == "BinaryExpr":
+        return compile_binary_chain(binop)
+
+    left = compile_node(binop.left)
+    right = compile_node(binop.right)
+    apply = NUMERIC_OPERATORS[binop.operator]
+    operator = binop.operator
+
+    def run(env: Environment) -> RuntimeVal:
+        leftHandSide = left(env)
+        rightHandSide = right(env)
+
+        if leftHandSide.type == "number" and rightHandSide.type == "number":
+            return MK_NUMBER(apply(leftHandSide.value, rightHandSide.value))
+
+        return eval_binary_expr(leftHandSide, rightHandSide, operator)
+
+    return run
+
+
+def compile_binary_chain(binop: BinaryExpr) -> Closure:
+    # a + b - c parses as ((a + b) - c), the left operands are followed in a
+    # loop and the chain runs as one, operands still left to right.
+    steps = []
+    while binop.kind == "BinaryExpr":
+        apply = NUMERIC_OPERATORS[binop.operator]
+        steps.append((apply, binop.operator, compile_node(binop.right)))
+        binop = binop.left
+    first = compile_node(binop)
+    steps.reverse()
+
+    def run(env: Environment) -> RuntimeVal:
+        leftHandSide = first(env)
+        for apply, operator, right in steps:
+            rightHandSide = right(env)
+            if leftHandSide.type == "number" and rightHandSide.type == "number":
+                leftHandSide = MK_NUMBER(apply(leftHandSide.value, rightHandSide.value))
+            else:
+                leftHandSide = eval_binary_expr(leftHandSide, rightHandSide, operator)
+        return leftHandSide
+
+    return run
+
+
+def compile_assignment(node: AssignmentExpr) -> Closure:
+    if node.assigne.kind != "Identifier":
+        # Raise when the statement runs, not at compile time, like `evaluate`.
+        def run_invalid(env: Environment) -> RuntimeVal:
+            raise ValueError(f"Invalid LHS inaide assignment expr {node.assigne}")
+
+        return run_invalid
+
+    varname = node.assigne.symbol
+    value = compile_node(node.value)
+
+    if node.assigne.slot is not None:
+        depth, slot = node.assigne.depth, node.assigne.slot
+
+        def run_slot(env: SlotEnvironment) -> RuntimeVal:
+            return env.assign_slot(depth, slot, value(env))
+
+        return run_slot
+
+    def run(env: Environment) -> RuntimeVal:
+        return env.assign_var(varname, value(env))
+
+    return run
+
+
+def compile_object_expr(obj_lit: ObjectLiteral) -> Closure:
+    # (key, compiled value) pairs, None marks the { foo } shorthand.
+    properties = [
+        (
+            prop.key,
+            (
+                compile_node(prop.value)
+                if prop.value is not None
+                else compile_shorthand(prop) if prop.slot is not None else None
+            ),
+        )
+        for prop in obj_lit.properties
+    ]
+
+    shape, layout = literal_shape(tuple(prop.key for prop in obj_lit.properties))
+    size = len(shape.keys)
+
+    def run(env: Environment) -> RuntimeVal:
+        values = [
+            # { foo } == { foo: foo }
+            env.lookup_var(key) if value is None else value(env)
+            for key, value in properties
+        ]
+        return ObjectVal(shape, literal_values(values, layout, size))
+
+    return run
+
+
+def compile_array_expr(array_lit: ArrayLiteral) -> Closure:
+    elements = [compile_node(element) for element in array_lit.elements]
+
+    def run(env: Environment) -> RuntimeVal:
+        return array_from_values([element(env) for element in elements])
+
+    return run
+
+
+def compile_member_expr(member: MemberExpr) -> Closure:
+    obj = compile_node(member.obj)
+
+    if member.computed:
+        prop = compile_node(member.prop)
+
+        def run_computed(env: Environment) -> RuntimeVal:
+            target = obj(env)
+            return eval_member(target, property_key(prop(env)))
+
+        return run_computed
+
+    key = member.prop.symbol
+    # The node's inline cache, copied into the closure so a hit is two
+    # comparisons and an index, and written back on a miss so the next
+    # compile of this program starts warm.
+    cachedShape = member.cached_shape
+    cachedIndex = member.cached_index
+
+    def run(env: Environment) -> RuntimeVal:
+        nonlocal cachedShape, cachedIndex
+        target = obj(env)
+        if target.type == "object" and target.shape is cachedShape:
+            return target.values[cachedIndex]
+
+        value = eval_member(target, key, member)
+        cachedShape, cachedIndex = member.cached_shape, member.cached_index
+        return value
+
+    return run
+
+
+def compile_call_expr(call: CallExpr) -> Closure:
+    args = [compile_node(arg) for arg in call.args]
+    caller = call.caller
+
+    if caller.kind == "Identifier" and caller.slot is None:
+        # fn(...) through the node's callee cache, see Environment.lookup_callee.
+        def run_cached(env: Environment) -> RuntimeVal:
+            if call.cached_env == env.serial:
+                callee = call.cached_callee
+            else:
+                callee = env.lookup_callee(call)
+            return eval_call(callee, [arg(env) for arg in args], env)
+
+        return run_cached
+
+    # Resolved identifiers are slot reads already, nothing to cache.
+    callee = compile_node(caller)
+
+    def run(env: Environment) -> RuntimeVal:
+        target = callee(env)
+        return eval_call(target, [arg(env) for arg in args], env)
+
+    return run
+
+
+def compile_shorthand(prop: PropertyLiteral) -> Closure:
+    # A resolved { foo } reads foo's slot like an identifier would.
+    ident = Identifier(prop.key)
+    ident.depth, ident.slot = prop.depth, prop.slot
+    return compile_identifier(ident)
+
+
+def compile_program_body(program: Program) -> Closure:
+    body = [compile_statement(statement) for statement in program.body]
+
+    def run(env: Environment) -> RuntimeVal:
+        lastEvaluated = MK_NULL()
+
+        for statement in body:
+            lastEvaluated = statement(env)
+
+        return lastEvaluated
+
+    return run
+
+
+def compile_var_declaration(
+    declaration: VarDeclaration, value: Closure | None = None
+) -> Closure:
+    # `value` is the declared value's closure when already compiled.
+    identifier = declaration.identifier
+    constant = declaration.constant
+    if value is None and declaration.value is not None:
+        value = compile_node(declaration.value)
+
+    if declaration.slot is not None:
+        slot = declaration.slot
+
+        def run_slot(env: SlotEnvironment) -> RuntimeVal:
+            return env.declare_slot(slot, MK_NULL() if value is None else value(env))
+
+        return run_slot
+
+    def run(env: Environment) -> RuntimeVal:
+        return env.declare_var(
+            identifier, MK_NULL() if value is None else value(env), constant
+        )
+
+    return run
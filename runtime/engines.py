@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+# Only the modules a run actually needs are imported, and only when needed,
+# so `--version` or a tiny script does not pay for every engine.
+if TYPE_CHECKING:
+    from typing import Callable
+
+    from frontend.syntax_tree import Program
+    from runtime.environment import Environment, SlotEnvironment
+    from runtime.values import RuntimeVal
+
+
+ENGINES = ["tree", "closure", "slots", "vm"]
+
+
+# Engines that enforce a Quota on every node, the compiled engines only check
+# it for nodes they hand back to `evaluate`.
+QUOTA_ENGINES = ["tree"]
+
+
+def create_env(
+    engine: str = "tree", limits: dict | None = None
+) -> Environment | SlotEnvironment:
+    # `limits` are Quota keyword arguments, every environment gets a new Quota.
+    quota = None
+    if limits is not None:
+        from runtime.quota import Quota
+
+        quota = Quota(**limits)
+
+    if engine == "slots":
+        from runtime.environment import create_global_slot_env
+
+        return create_global_slot_env(quota)
+
+    from runtime.environment import create_global_env
+
+    return create_global_env(quota)
+
+
+def prepare(
+    program: Program, env: Environment | SlotEnvironment, engine: str = "tree"
+) -> Callable[[], RuntimeVal]:
+    # Compiles `program` for `engine` once, the returned function runs it in
+    # `env` and can be called again to rerun it there.
+    if engine == "slots":
+        from runtime.closures import compile_program
+        from runtime.resolver import resolve_program
+
+        size = len(env.scope.slots)
+        try:
+            resolve_program(program, env.scope)
+        except Exception:
+            env.forget_undeclared(size)
+            raise
+        env.reserve()
+        closure = compile_program(program)
+
+        def run():
+            try:
+                return closure(env)
+            except BaseException:
+                # The program has to be prepared again after this.
+                env.forget_undeclared(size)
+                raise
+
+        return run
+    if engine == "closure":
+        from runtime.closures import compile_program
+
+        closure = compile_program(program)
+        return lambda: closure(env)
+    if engine == "vm":
+        from runtime.bytecode import compile_bytecode
+        from runtime.vm import run_bytecode
+
+        chunk = compile_bytecode(program)
+        return lambda: run_bytecode(chunk, env)
+
+    from runtime.interpreter import evaluate
+
+    return lambda: evaluate(program, env)
+
+
+def execute(
+    program: Program, env: Environment | SlotEnvironment, engine: str = "tree"
+) -> RuntimeVal:
+    return prepare(program, env, engine)()
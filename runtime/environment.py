@@ -1,16 +1,43 @@
+from itertools import count
+
+from runtime.natives import NATIVE_FUNCTIONS
+from runtime.quota import Quota
+from runtime.resolver import Scope
 from runtime.values import MK_BOOL, MK_NULL, RuntimeVal
 
+# A number per environment, call sites remember which environment their
+# cached callee came from by it, so the AST never keeps an environment alive.
+ENVIRONMENT_SERIALS = count()
+
+# Shared layers fork() stacks up before merging them into one, every layer
+# is one more dict lookup for names bound before the oldest fork.
+MAX_SHARED_LAYERS = 8
+
 
 class Environment:
-    def __init__(self, parent_env=None):
+    def __init__(self, parent_env=None, quota: Quota | None = None):
         self._parent = parent_env
+        # Child scopes share the quota of the environment they were made in.
+        self.quota = parent_env.quota if quota is None and parent_env else quota
         self._variables: dict[str, RuntimeVal] = {}
         self._constants: set[str] = set()
+        # Read-only bindings shared with forks, see fork(). The top layer,
+        # each layer links to the one below it.
+        self._shared: Environment | None = None
+        self._frozen = False  # True for the layers themselves
+        # Where `resolve` looks after this environment: the top shared layer,
+        # or else the parent scope.
+        self._next = parent_env
+        self.serial = next(ENVIRONMENT_SERIALS)
+        # name -> CallExprs that cached the value bound to it here
+        self._call_sites: dict[str, list] = {}
 
     def declare_var(
         self, varname: str, value: RuntimeVal, constant: bool
     ) -> RuntimeVal:
-        if varname in self._variables:
+        if varname in self._variables or (
+            self._shared is not None and self.is_shared(varname)
+        ):
             raise ValueError(
                 f"Cannot declare variable {varname} as it is already defined."
             )
@@ -29,7 +56,28 @@ class Environment:
                 f"Cannot reassign to variable {varname} as it was declared as constant."
             )
 
+        if env._frozen:
+            # Shared with forks, the scope it belongs to gets its own copy.
+            env = self.owner(env)
         env._variables[varname] = value
+        if env._call_sites:
+            # Forget the callee cached by calls through this binding.
+            for site in env._call_sites.pop(varname, ()):
+                if site.cached_env == env.serial:
+                    site.cached_env = None
+        return value
+
+    def lookup_callee(self, site) -> RuntimeVal:
+        # The value the call site `site`, a CallExpr on an identifier, calls.
+        # Cached on the site when the name is bound in this environment, the
+        # evaluators check `site.cached_env == env.serial` before calling this.
+        varname = site.caller.symbol
+        env = self.resolve(varname)
+        value = env._variables[varname]
+        if env is self or env._frozen and self.owner(env) is self:
+            site.cached_env = self.serial
+            site.cached_callee = value
+            self._call_sites.setdefault(varname, []).append(site)
         return value
 
     def lookup_var(self, varname: str) -> RuntimeVal:
@@ -37,20 +85,188 @@ class Environment:
         return env._variables[varname]
 
     def resolve(self, varname: str) -> "Environment":
-        if varname in self._variables:
-            return self
+        # Walk up the scope chain with a loop, deeply nested scopes must not
+        # run into the recursion limit. Shared layers are walked through
+        # before the parent, like part of the scope they belong to.
+        env = self
+        while varname not in env._variables:
+            env = env._next
+            if env is None:
+                raise ValueError(f"Cannot resolve <{varname}> as it does not exist.")
+
+        return env
+
+    def is_shared(self, varname: str) -> bool:
+        # Bound in one of this environment's shared layers.
+        layer = self._shared
+        while layer is not None:
+            if varname in layer._variables:
+                return True
+            layer = layer._shared
+        return False
+
+    def owner(self, layer: "Environment") -> "Environment":
+        # The environment the shared layer `layer`, found by resolve(), is part of.
+        env = owner = self
+        while env is not layer:
+            env = env._next
+            if not env._frozen:
+                owner = env
+        return owner
+
+    def fork(self, quota: Quota | None = None) -> "Environment":
+        """
+        A new environment with the same bindings as this one, in O(1) of
+        their number. This environment's own bindings become a read-only
+        layer shared by both, and assigning a binding copies just that one
+        into the assigning environment. Values are never mutated in place,
+        so both keep seeing the same objects until they rebind a name.
+
+        A fork is a sibling, not a child: it has this environment's parent,
+        and `quota`, not this environment's or its parent's Quota (their
+        counters are per script). Without `quota` the fork is unlimited.
+        """
+        if self._variables:
+            layer = Environment()
+            layer._variables, layer._constants = self._variables, self._constants
+            layer._shared, layer._next = self._shared, self._next
+            layer._frozen = True
+            self._variables, self._constants = {}, set()
+            self._shared = self._next = layer
+            if self.shared_depth() > MAX_SHARED_LAYERS:
+                self.merge_shared()
+
+        fork = Environment(self._parent, quota)
+        # Not the parent's Quota either, which Environment() would inherit.
+        fork.quota = quota
+        fork._shared, fork._next = self._shared, self._next
+        return fork
+
+    def shared_depth(self) -> int:
+        depth = 0
+        layer = self._shared
+        while layer is not None:
+            depth += 1
+            layer = layer._shared
+        return depth
 
-        if self._parent is None:
-            raise ValueError(f"Cannot resolve <{varname}> as it does not exist.")
+    def merge_shared(self):
+        # Replaces this environment's shared layers by one holding all of
+        # their bindings. Other forks keep the old ones, they never change.
+        layers = []
+        layer = self._shared
+        while layer is not None:
+            layers.append(layer)
+            layer = layer._shared
 
-        return self._parent.resolve(varname)
+        merged = Environment()
+        for layer in reversed(layers):
+            # A name is only in an upper layer too if it was reassigned there.
+            merged._variables.update(layer._variables)
+            merged._constants |= layer._constants
+        merged._next = layers[-1]._next
+        merged._frozen = True
+        self._shared = self._next = merged
+
+
+class SlotEnvironment:
+    """
+    Array-backed environment for programs that went through runtime/resolver.
+    Values live in a list indexed by the slot numbers the resolver computed,
+    the names themselves only live in the compile-time Scope.
+    """
+
+    def __init__(self, parent_env=None, quota: Quota | None = None):
+        self._parent = parent_env
+        # Only checked when a node falls back to `evaluate`.
+        self.quota = parent_env.quota if quota is None and parent_env else quota
+        self.scope = Scope(parent_env.scope if parent_env is not None else None)
+        self.values: list[RuntimeVal] = []
+        # Never cached by call sites, a slot read is already direct.
+        self.serial = next(ENVIRONMENT_SERIALS)
+
+    def ancestor(self, depth: int) -> "SlotEnvironment":
+        env = self
+        for _ in range(depth):
+            env = env._parent
+        return env
+
+    def reserve(self):
+        # Make room for every slot the resolver has handed out so far.
+        missing = len(self.scope.slots) - len(self.values)
+        if missing > 0:
+            self.values.extend([None] * missing)
+
+    def forget_undeclared(self, size: int):
+        # After a failed run, whose names were resolved into the scope from
+        # slot `size` on: the declarations that ran keep their names, like
+        # in an Environment, the ones that didn't must not leave a name
+        # bound to an empty slot. Declarations run in slot order.
+        declared = size
+        while declared < len(self.values) and self.values[declared] is not None:
+            declared += 1
+        self.scope.truncate(declared)
+        del self.values[declared:]
+
+    def lookup_slot(self, depth: int, slot: int) -> RuntimeVal:
+        return self.ancestor(depth).values[slot]
+
+    def assign_slot(self, depth: int, slot: int, value: RuntimeVal) -> RuntimeVal:
+        # Constant-ness was already checked by the resolver.
+        self.ancestor(depth).values[slot] = value
+        return value
+
+    def declare_slot(self, slot: int, value: RuntimeVal) -> RuntimeVal:
+        self.values[slot] = value
+        return value
+
+    """ Name based access, for nodes that are still evaluated by `evaluate` """
+
+    def declare_var(
+        self, varname: str, value: RuntimeVal, constant: bool
+    ) -> RuntimeVal:
+        slot = self.scope.declare(varname, constant)
+        self.reserve()
+        return self.declare_slot(slot, value)
+
+    def assign_var(self, varname: str, value: RuntimeVal) -> RuntimeVal:
+        depth, slot = self.scope.resolve(varname)
+
+        # Cannot assign to constatn
+        if self.scope.is_constant(depth, varname):
+            raise ValueError(
+                f"Cannot reassign to variable {varname} as it was declared as constant."
+            )
+
+        return self.assign_slot(depth, slot, value)
+
+    def lookup_var(self, varname: str) -> RuntimeVal:
+        depth, slot = self.scope.resolve(varname)
+        return self.lookup_slot(depth, slot)
+
+    def lookup_callee(self, site) -> RuntimeVal:
+        return self.lookup_var(site.caller.symbol)
+
+
+def create_global_env(quota: Quota | None = None) -> Environment:
+    env = Environment(quota=quota)
+
+    env.declare_var("true", MK_BOOL(True), True)
+    env.declare_var("false", MK_BOOL(False), False)
+    env.declare_var("null", MK_NULL(), True)
+    for name, fn in NATIVE_FUNCTIONS.items():
+        env.declare_var(name, fn, True)
+
+    return env
 
 
-def create_global_env() -> Environment:
-    env = Environment()
+def create_global_slot_env(quota: Quota | None = None) -> SlotEnvironment:
+    env = SlotEnvironment(quota=quota)
 
     env.declare_var("true", MK_BOOL(True), True)
     env.declare_var("false", MK_BOOL(False), False)
     env.declare_var("null", MK_NULL(), True)
+    for name, fn in NATIVE_FUNCTIONS.items():
+        env.declare_var(name, fn, True)
 
     return env
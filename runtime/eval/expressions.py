@@ -1,66 +1,130 @@
-from frontend.syntax_tree import AssignmentExpr, BinaryExpr, Identifier, ObjectLiteral
-from runtime.environment import Environment
-from runtime.values import MK_NULL, MK_NUMBER, NumberVal, ObjectVal, RuntimeVal
+from array import array
+from itertools import repeat
+
+from frontend.syntax_tree import OPERATOR_FUNCTIONS
+from runtime.memo import CALL_MEMO
+from runtime.values import (
+    MK_NULL,
+    MK_NUMBER,
+    ArrayVal,
+    NumberVal,
+    RuntimeVal,
+    numpy_module,
+)
+
+# Python implementations of the numeric binary operators, BinaryExpr.apply
+# is looked up in the same table.
+NUMERIC_OPERATORS = OPERATOR_FUNCTIONS
 
 
 def eval_numeric_binary_expr(
     leftHandSide: NumberVal, rightHandSide: NumberVal, operator: str
 ) -> NumberVal:
-    result: float = 0
-    if operator == "+":
-        result = leftHandSide.value + rightHandSide.value
-    elif operator == "-":
-        result = leftHandSide.value - rightHandSide.value
-    elif operator == "*":
-        result = leftHandSide.value * rightHandSide.value
-    elif operator == "/":
-        # TODO: Division by zero checks
-        result = leftHandSide.value / rightHandSide.value
-    elif operator == "%":
-        result = leftHandSide.value % rightHandSide.value
-
-    return MK_NUMBER(result)
-
-
-def eval_binary_expr(binop: BinaryExpr, env: Environment) -> RuntimeVal:
-    from runtime.interpreter import evaluate
-
-    leftHandSide = evaluate(binop.left, env)
-    rightHandSide = evaluate(binop.right, env)
-
-    if leftHandSide.type == "number" and rightHandSide.type == "number":
-        return eval_numeric_binary_expr(leftHandSide, rightHandSide, binop.operator)
-
+    # TODO: Division by zero checks
+    return MK_NUMBER(
+        NUMERIC_OPERATORS[operator](leftHandSide.value, rightHandSide.value)
+    )
+
+
+# Operand types arithmetic on arrays takes, a number is used for every element.
+ARRAY_OPERANDS = ("number", "array")
+
+
+def eval_binary_expr(
+    leftHandSide: RuntimeVal, rightHandSide: RuntimeVal, operator: str
+) -> RuntimeVal:
+    # Any two values. The engines inline number op number and only call this
+    # for the rest.
+    leftType, rightType = leftHandSide.type, rightHandSide.type
+    if leftType == "number" and rightType == "number":
+        return eval_numeric_binary_expr(leftHandSide, rightHandSide, operator)
+    if (
+        (leftType == "array" or rightType == "array")
+        and leftType in ARRAY_OPERANDS
+        and rightType in ARRAY_OPERANDS
+    ):
+        return eval_array_binary_expr(leftHandSide, rightHandSide, operator)
     # One or both are NULL
     return MK_NULL()
 
 
-def eval_identifier(ident: Identifier, env: Environment) -> RuntimeVal:
-    val = env.lookup_var(ident.symbol)
-    return val
-
-
-def eval_assignment(node: AssignmentExpr, env: Environment) -> RuntimeVal:
-    from runtime.interpreter import evaluate
-
-    if node.assigne.kind != "Identifier":
-        raise ValueError(f"Invalid LHS inaide assignment expr {node.assigne}")
-
-    if isinstance(node.assigne, Identifier):
-        varname = node.assigne.symbol
-    return env.assign_var(varname, evaluate(node.value, env))
-
-
-def eval_object_expr(obj_lit: ObjectLiteral, env: Environment) -> RuntimeVal:
-    from runtime.interpreter import evaluate
-
-    obj = ObjectVal({})
-    for prop in obj_lit.properties:
-        key = prop.key
-        value = prop.value
-        # { foo } == { foo: foo }
-        runtime_val = env.lookup_var(key) if value is None else evaluate(value, env)
+def eval_array_binary_expr(
+    leftHandSide: RuntimeVal, rightHandSide: RuntimeVal, operator: str
+) -> ArrayVal:
+    # Element-wise, one side may be a number. With NumPy the operator runs as
+    # one vectorized kernel over the buffers, array('d') buffers are combined
+    # by map() in C. Either way no NumberVal is made per element.
+    leftIsArray = leftHandSide.type == "array"
+    rightIsArray = rightHandSide.type == "array"
+    left = leftHandSide.elements if leftIsArray else leftHandSide.value
+    right = rightHandSide.elements if rightIsArray else rightHandSide.value
+    if leftIsArray and rightIsArray and len(left) != len(right):
+        raise ValueError(
+            f"Cannot apply {operator} to arrays of length {len(left)} and {len(right)}."
+        )
+
+    apply = NUMERIC_OPERATORS[operator]
+    numpy = numpy_module()
+    if operator in ("/", "%"):
+        # Raise like numbers do, NumPy would give inf / nan and a warning.
+        if rightIsArray:
+            zero = bool((right == 0).any()) if numpy else 0.0 in right
+        else:
+            zero = right == 0
+        if zero:
+            raise ZeroDivisionError(f"Array {operator} by zero.")
+
+    if numpy:
+        return ArrayVal(apply(left, right))
+    if leftIsArray and rightIsArray:
+        return ArrayVal(array("d", map(apply, left, right)))
+    if leftIsArray:
+        return ArrayVal(array("d", map(apply, left, repeat(right))))
+    return ArrayVal(array("d", map(apply, repeat(left), right)))
+
+
+def eval_array_member(target: ArrayVal, key: str) -> RuntimeVal:
+    # arr.length, or arr[i] for a whole number i in range. Anything else is
+    # missing and reads as null, like an object's missing properties.
+    elements = target.elements
+    if key == "length":
+        return MK_NUMBER(float(len(elements)))
+    if key.isascii() and key.isdecimal() and (key == "0" or key[0] != "0"):
+        index = int(key)
+        if index < len(elements):
+            return MK_NUMBER(float(elements[index]))
+    return MK_NULL()
 
-        obj.properties[key] = runtime_val
 
-    return obj
+def eval_member(target: RuntimeVal, key: str, site=None) -> RuntimeVal:
+    # target.key, or target[key]. `site` is the MemberExpr doing the read,
+    # its inline cache remembers the last shape seen there and where the key
+    # is in it, so objects of that shape are read without hashing the key.
+    if target.type == "array":
+        return eval_array_member(target, key)
+    if target.type != "object":
+        raise ValueError(f"Cannot read property <{key}> of {target.type}.")
+
+    shape = target.shape
+    if site is not None and shape is site.cached_shape:
+        return target.values[site.cached_index]
+
+    index = shape.index.get(key)
+    if index is None:
+        return MK_NULL()  # missing properties read as null
+    if site is not None:
+        site.cached_shape = shape
+        site.cached_index = index
+    return target.values[index]
+
+
+def eval_call(callee: RuntimeVal, args: list[RuntimeVal], env) -> RuntimeVal:
+    # callee(...args) with the arguments already evaluated. Natives are the
+    # only callable values so far.
+    if callee.type != "native-fn":
+        raise ValueError(f"Cannot call value of type {callee.type}.")
+    if callee.pure:
+        return CALL_MEMO.call(callee, args, env)
+
+    result = callee.call(args, env)
+    return MK_NULL() if result is None else result
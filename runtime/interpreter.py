@@ -1,40 +1,369 @@
-import sys
-from rich import print
-from frontend.syntax_tree import NumericLiteral, Stmt
+from typing import Generator
+
+from frontend.syntax_tree import Stmt
 from runtime.environment import Environment
-from runtime.eval.expressions import (
-    eval_assignment,
-    eval_binary_expr,
-    eval_identifier,
-    eval_object_expr,
+from runtime.eval.expressions import eval_binary_expr, eval_call, eval_member
+from runtime.quota import UNLIMITED, Quota
+from runtime.values import (
+    MK_NULL,
+    MK_NUMBER,
+    ObjectVal,
+    RuntimeVal,
+    array_from_values,
+    box,
+    literal_shape,
+    literal_values,
+    property_key,
 )
-from runtime.eval.statements import eval_program, eval_var_declaration
-from runtime.values import NumberVal, RuntimeVal
+
+"""
+Tree-walking evaluator:
+    Nodes are walked with an explicit work stack instead of Python recursion,
+    so nesting depth is only limited by memory, not by the recursion limit.
+    A node with children is visited twice: the first visit pushes the node,
+    the COMBINE marker and its children (in reverse, so they are evaluated
+    left to right), the second visit pops the children's values off `values`
+    and pushes the node's own value.
+
+    A Python call is cheaper than a push and pop per node, so the common
+    shallow shapes (a BinaryExpr of two leaves, an object of leaves, obj.key
+    on a variable) are evaluated in place without touching the stacks.
+
+    Numbers are unboxed on `values`: literals and arithmetic push raw
+    floats, a BinaryExpr calls its `apply` (operator.add ...) on them and
+    pushes the float it returns. Only storing a number (in a variable,
+    object or array) or returning it boxes it into a NumberVal, so a deep
+    arithmetic expression allocates nothing per node. Variables hold
+    NumberVals, BinaryExpr unwraps those.
+
+    obj.key reads go through the MemberExpr's inline cache (see
+    runtime/eval/expressions.eval_member). obj[expr] can read a different key
+    every time, so it always looks the key up.
+
+    fn(...) reads fn before its arguments, through the CallExpr's callee
+    cache (see Environment.lookup_callee): while fn is bound in the
+    environment the call runs in and not reassigned, the lookup is skipped.
+
+    The loop itself is the generator `walk`, which can pause every
+    `pause_every` counted nodes (runtime/async_interpreter hands control
+    back to the event loop there). `evaluate` runs it without pauses.
+"""
+
+# Marks that the node below it on the work stack has had its children evaluated.
+COMBINE = object()
+
+# Children BinaryExpr evaluates in place when both of its sides are one.
+LEAF_KINDS = frozenset(("NumericLiteral", "Identifier"))
 
 
 def evaluate(astNode: Stmt, env: Environment) -> RuntimeVal:
-    match astNode.kind:
-        case "NumericLiteral":
-            if isinstance(astNode, NumericLiteral):
-                return NumberVal(astNode.value)
-        case "Identifier":
-            return eval_identifier(astNode, env)
-        case "ObjectLiteral":
-            return eval_object_expr(astNode, env)
-        case "AssignmentExpr":
-            return eval_assignment(astNode, env)
-        case "BinaryExpr":
-            return eval_binary_expr(astNode, env)
-        case "Program":
-            return eval_program(astNode, env)
-        case "VarDeclaration":  # Handle statements
-            return eval_var_declaration(astNode, env)
-        case _:
-            print(
-                (
-                    f"[bold red]This AST Node has not yet been setup for interpretation.[/bold red]\n"
-                    f"{astNode}"
-                ),
-                file=sys.stderr,
-            )
-            exit(1)
+    # Without `pause_every` the walk never yields, it only returns.
+    try:
+        next(walk(astNode, env, env.quota))
+    except StopIteration as finished:
+        return finished.value
+
+
+def walk(
+    astNode: Stmt, env: Environment, quota: Quota | None, pause_every: int | None = None
+) -> Generator[None, None, RuntimeVal]:
+    # Pauses are counted in quota steps, so they need a quota to count with.
+    pause_at = UNLIMITED
+    todo: list = []
+    values: list[RuntimeVal | float] = []
+    push = todo.append
+    pop = todo.pop
+    push_value = values.append
+    pop_value = values.pop
+
+    if astNode.kind == "Program":
+        if quota is not None:
+            quota.enter()
+        statements = astNode.body
+    else:
+        statements = (astNode,)
+    if pause_every is not None:
+        pause_at = quota.steps + pause_every
+
+    # Statements run one at a time, only the last value is kept.
+    lastEvaluated = MK_NULL()
+    for statement in statements:
+        push(statement)
+        while todo:
+            node = pop()
+
+            if node is COMBINE:
+                node = pop()
+                match node.kind:
+                    case "BinaryExpr":
+                        rightHandSide = pop_value()
+                        leftHandSide = pop_value()
+                        if type(leftHandSide) is not float:
+                            if leftHandSide.type == "number":
+                                leftHandSide = leftHandSide.value
+                        if type(rightHandSide) is not float:
+                            if rightHandSide.type == "number":
+                                rightHandSide = rightHandSide.value
+                        if type(leftHandSide) is float and type(rightHandSide) is float:
+                            push_value(node.apply(leftHandSide, rightHandSide))
+                        else:
+                            result = eval_binary_expr(
+                                box(leftHandSide), box(rightHandSide), node.operator
+                            )
+                            if quota is not None and result.type == "array":
+                                quota.charge_array(len(result))
+                            push_value(result)
+                    case "AssignmentExpr":
+                        push_value(
+                            env.assign_var(node.assigne.symbol, box(pop_value()))
+                        )
+                    case "VarDeclaration":
+                        push_value(
+                            env.declare_var(
+                                node.identifier, box(pop_value()), node.constant
+                            )
+                        )
+                    case "ObjectLiteral":
+                        done = pop()  # properties stored before the values below
+                        start = len(values) - (len(node.properties) - done)
+                        obj = values[start - 1]
+                        obj.values.extend(map(box, values[start:]))
+                        del values[start:]
+                        obj.values = literal_values(
+                            obj.values, node.layout, len(obj.shape.keys)
+                        )
+                    case "ArrayLiteral":
+                        start = len(values) - len(node.elements)
+                        array = array_from_values(list(map(box, values[start:])))
+                        del values[start:]
+                        push_value(array)
+                    case "MemberExpr":
+                        if node.computed:
+                            key = property_key(box(pop_value()))
+                            push_value(eval_member(box(pop_value()), key))
+                        else:
+                            push_value(
+                                eval_member(box(pop_value()), node.prop.symbol, node)
+                            )
+                    case "CallExpr":
+                        # The callee sits below its arguments.
+                        start = len(values) - len(node.args)
+                        callee = box(values[start - 1])
+                        args = list(map(box, values[start:]))
+                        del values[start - 1 :]
+                        push_value(eval_call(callee, args, env))
+
+                if quota is not None:
+                    quota.depth -= 1
+                continue
+
+            kind = node.kind
+            if kind == "PropertyLiteral":
+                # { foo } == { foo: foo }, only shorthand properties are pushed.
+                push_value(env.lookup_var(node.key))
+                continue
+
+            if quota is not None:
+                # Inlined Quota.enter(), a method call per node costs more than this.
+                quota.steps += 1
+                quota.depth += 1
+                if quota.steps > quota.max_steps or quota.depth > quota.max_depth:
+                    quota.exceeded()
+                if quota.steps >= pause_at:
+                    yield
+                    pause_at = quota.steps + pause_every
+
+            match kind:
+                case "NumericLiteral":
+                    push_value(node.value)
+                    if quota is not None:
+                        quota.depth -= 1
+                case "Identifier":
+                    push_value(env.lookup_var(node.symbol))
+                    if quota is not None:
+                        quota.depth -= 1
+                case "BinaryExpr":
+                    left, right = node.left, node.right
+                    if left.kind in LEAF_KINDS and right.kind in LEAF_KINDS:
+                        # `a * 3`, the commonest shape, without the stack round trip.
+                        if quota is not None:
+                            quota.steps += 2
+                            if (
+                                quota.steps > quota.max_steps
+                                or quota.depth >= quota.max_depth
+                            ):
+                                quota.depth += 1  # where the two sides would be
+                                quota.exceeded()
+                            quota.depth -= 1
+                        if left.kind == "NumericLiteral":
+                            leftHandSide = left.value
+                        else:
+                            leftHandSide = env.lookup_var(left.symbol)
+                            if leftHandSide.type == "number":
+                                leftHandSide = leftHandSide.value
+                        if right.kind == "NumericLiteral":
+                            rightHandSide = right.value
+                        else:
+                            rightHandSide = env.lookup_var(right.symbol)
+                            if rightHandSide.type == "number":
+                                rightHandSide = rightHandSide.value
+                        if type(leftHandSide) is float and type(rightHandSide) is float:
+                            push_value(node.apply(leftHandSide, rightHandSide))
+                        else:
+                            result = eval_binary_expr(
+                                box(leftHandSide), box(rightHandSide), node.operator
+                            )
+                            if quota is not None and result.type == "array":
+                                quota.charge_array(len(result))
+                            push_value(result)
+                        continue
+                    push(node)
+                    push(COMBINE)
+                    push(right)
+                    push(left)
+                case "AssignmentExpr":
+                    if node.assigne.kind != "Identifier":
+                        raise ValueError(
+                            f"Invalid LHS inaide assignment expr {node.assigne}"
+                        )
+                    push(node)
+                    push(COMBINE)
+                    push(node.value)
+                case "VarDeclaration":  # Handle statements
+                    if node.value is None:
+                        push_value(
+                            env.declare_var(node.identifier, MK_NULL(), node.constant)
+                        )
+                        if quota is not None:
+                            quota.depth -= 1
+                    else:
+                        push(node)
+                        push(COMBINE)
+                        push(node.value)
+                case "MemberExpr":
+                    obj = node.obj
+                    if not node.computed and obj.kind == "Identifier":
+                        # obj.key on a variable without the stack round trip.
+                        if quota is not None:
+                            quota.steps += 1
+                            if (
+                                quota.steps > quota.max_steps
+                                or quota.depth >= quota.max_depth
+                            ):
+                                quota.depth += 1  # where the object would be
+                                quota.exceeded()
+                            quota.depth -= 1
+                        push_value(
+                            eval_member(
+                                env.lookup_var(obj.symbol), node.prop.symbol, node
+                            )
+                        )
+                        continue
+                    push(node)
+                    push(COMBINE)
+                    if node.computed:
+                        push(node.prop)
+                    push(obj)
+                case "ArrayLiteral":
+                    elements = node.elements
+                    if quota is not None:
+                        quota.charge_array(len(elements))
+                    push(node)
+                    push(COMBINE)
+                    for index in range(len(elements) - 1, -1, -1):
+                        push(elements[index])
+                case "ObjectLiteral":
+                    properties = node.properties
+                    if node.shape is None:
+                        node.shape, node.layout = literal_shape(
+                            tuple(prop.key for prop in properties)
+                        )
+                    fields = []
+                    obj = ObjectVal(node.shape, fields)
+                    done = 0
+                    if quota is not None:
+                        quota.charge_object(len(properties))
+                    else:
+                        # Values are evaluated in order, so a leading run of
+                        # literals, identifiers and shorthands is stored right
+                        # away. With a quota they go through the loop to be counted.
+                        for prop in properties:
+                            value = prop.value
+                            # { foo } == { foo: foo }
+                            if value is None:
+                                fields.append(env.lookup_var(prop.key))
+                            elif value.kind == "NumericLiteral":
+                                fields.append(MK_NUMBER(value.value))
+                            elif value.kind == "Identifier":
+                                fields.append(env.lookup_var(value.symbol))
+                            else:
+                                break
+                            done += 1
+
+                    push_value(obj)
+                    if done == len(properties):
+                        obj.values = literal_values(
+                            fields, node.layout, len(node.shape.keys)
+                        )
+                        if quota is not None:
+                            quota.depth -= 1
+                        continue
+
+                    # The remaining values land on `values` above the object.
+                    push(done)
+                    push(node)
+                    push(COMBINE)
+                    for index in range(len(properties) - 1, done - 1, -1):
+                        prop = properties[index]
+                        push(prop if prop.value is None else prop.value)
+                case "CallExpr":
+                    caller, args = node.caller, node.args
+                    done = 0
+                    if caller.kind == "Identifier":
+                        if quota is not None:
+                            quota.steps += 1
+                            if (
+                                quota.steps > quota.max_steps
+                                or quota.depth >= quota.max_depth
+                            ):
+                                quota.depth += 1  # where the callee would be
+                                quota.exceeded()
+                        if node.cached_env == env.serial:
+                            push_value(node.cached_callee)
+                        else:
+                            push_value(env.lookup_callee(node))
+                        if quota is None:
+                            # Like object literals, a leading run of literal and
+                            # identifier arguments is evaluated right away.
+                            for arg in args:
+                                if arg.kind == "NumericLiteral":
+                                    push_value(arg.value)
+                                elif arg.kind == "Identifier":
+                                    push_value(env.lookup_var(arg.symbol))
+                                else:
+                                    break
+                                done += 1
+                            if done == len(args):
+                                start = len(values) - done
+                                callee = values[start - 1]
+                                args = list(map(box, values[start:]))
+                                del values[start - 1 :]
+                                push_value(eval_call(callee, args, env))
+                                continue
+
+                    push(node)
+                    push(COMBINE)
+                    for index in range(len(args) - 1, done - 1, -1):
+                        push(args[index])
+                    if caller.kind != "Identifier":
+                        push(caller)
+                case _:
+                    raise ValueError(
+                        f"This AST Node has not yet been setup for interpretation.\n{node}"
+                    )
+
+        lastEvaluated = box(pop_value())
+
+    if quota is not None and astNode.kind == "Program":
+        quota.exit()
+    return lastEvaluated
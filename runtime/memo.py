@@ -0,0 +1,127 @@
+from collections import OrderedDict
+from math import copysign
+
+from runtime.values import MK_NULL, NativeFnVal, RuntimeVal
+
+"""
+Call memoization:
+    Calls to natives marked @pure (runtime/natives) go through CALL_MEMO,
+    which remembers the result for the callee and its arguments, so a pure
+    lookup called again with the same arguments is not run again. It is
+    shared by every engine and every environment of the process, a pure
+    native's result does not depend on where it was called from.
+
+    Only calls whose arguments are all numbers, booleans or null are keyed,
+    and only number, boolean and null results are kept: those are immutable,
+    an object or array handed out twice could be changed through either.
+    A NaN argument is not keyed either, NaN != NaN so it could never hit.
+    Other calls are made as usual and counted as `skipped`.
+
+    The memo holds at most `capacity` results and evicts the least recently
+    used one beyond that. Its counters are never reset, `stats()` reads
+    them for monitoring.
+"""
+
+DEFAULT_MEMO_CAPACITY = 4096
+
+# Result types worth keeping, see above.
+MEMO_RESULT_TYPES = frozenset(("number", "boolean", "null"))
+
+# Key of -0.0, which equals (and hashes like) 0.0 but 1 / x tells apart.
+NEGATIVE_ZERO = object()
+
+
+def memo_key(callee: NativeFnVal, args: list[RuntimeVal]) -> tuple | None:
+    # A hashable stand-in for the call, None if an argument cannot be keyed.
+    # Keyed on the Python function, the same native wrapped twice shares results.
+    key = [callee.call]
+    for arg in args:
+        kind = arg.type
+        if kind == "number":
+            number = arg.value
+            if number != number:
+                return None  # NaN, would only fill the memo with misses
+            if number == 0.0 and copysign(1.0, number) < 0:
+                key.append(NEGATIVE_ZERO)
+            else:
+                key.append(number)
+        elif kind == "boolean" or kind == "null":
+            # MK_BOOL / MK_NULL share one object per value, compared by
+            # identity. A separately made BooleanVal only ever misses.
+            key.append(arg)
+        else:
+            return None
+    return tuple(key)
+
+
+class CallMemo:
+    __slots__ = ("capacity", "hits", "misses", "skipped", "evictions", "_entries")
+
+    def __init__(self, capacity: int = DEFAULT_MEMO_CAPACITY):
+        if capacity < 0:
+            raise ValueError(f"Memo capacity must not be negative, got {capacity}.")
+
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0  # calls with an argument or result that is not kept
+        self.evictions = 0
+        # (function, argument keys...) -> result, least recently used first
+        self._entries: OrderedDict[tuple, RuntimeVal] = OrderedDict()
+
+    def call(self, callee: NativeFnVal, args: list[RuntimeVal], env) -> RuntimeVal:
+        key = memo_key(callee, args)
+        if key is None or self.capacity == 0:
+            self.skipped += 1
+            result = callee.call(args, env)
+            return MK_NULL() if result is None else result
+
+        entries = self._entries
+        result = entries.get(key)
+        if result is not None:
+            self.hits += 1
+            entries.move_to_end(key)
+            return result
+
+        result = callee.call(args, env)
+        if result is None:
+            result = MK_NULL()
+        if result.type not in MEMO_RESULT_TYPES:
+            self.skipped += 1
+            return result
+
+        self.misses += 1
+        entries[key] = result
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+        return result
+
+    def resize(self, capacity: int):
+        # Evicts the least recently used results that no longer fit.
+        if capacity < 0:
+            raise ValueError(f"Memo capacity must not be negative, got {capacity}.")
+
+        self.capacity = capacity
+        while len(self._entries) > capacity:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        # Forgets every result, the counters keep counting.
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "skipped": self.skipped,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+CALL_MEMO = CallMemo()
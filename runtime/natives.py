@@ -0,0 +1,76 @@
+import time
+from contextvars import ContextVar
+from typing import TextIO
+
+from util.printer import print
+from runtime.values import MK_NATIVE_FN, MK_NUMBER, NativeCall, NativeFnVal
+
+"""
+Native functions:
+    Python functions exposed to scripts. A native is called with a list of
+    its evaluated arguments (RuntimeVals) and the calling environment, and
+    returns a RuntimeVal, or None for null. Natives do their own argument
+    checking, raising ValueError like the evaluator does.
+
+    Every registered native is declared as a constant in each environment
+    made by create_global_env() / create_global_slot_env(), natives
+    registered later only show up in environments made after that.
+
+        @native()
+        @pure
+        def double(args, env):
+            return MK_NUMBER(args[0].value * 2)
+
+    or `register_native("double", fn)` for a function defined elsewhere.
+
+    @pure (below @native) marks a native whose result only depends on its
+    arguments and that has no side effects, its calls are memoized by
+    runtime/memo.CALL_MEMO.
+"""
+
+# Where `print` writes, stdout when unset. Set per script by runtime/worker
+# to capture a script's output, a context variable so scripts interleaved
+# on one event loop each get their own.
+SCRIPT_OUTPUT: ContextVar[TextIO | None] = ContextVar("SCRIPT_OUTPUT", default=None)
+
+# name -> function, in registration order
+NATIVE_FUNCTIONS: dict[str, NativeFnVal] = {}
+
+
+def register_native(name: str, call: NativeCall) -> NativeFnVal:
+    # Identifiers are letters only, so must the name be to be callable.
+    if not name.isalpha():
+        raise ValueError(f"Native function name <{name}> must be letters only.")
+
+    fn = MK_NATIVE_FN(call, name)
+    NATIVE_FUNCTIONS[name] = fn
+    return fn
+
+
+def pure(call: NativeCall) -> NativeCall:
+    # Read when the native is registered, see MK_NATIVE_FN.
+    call.pure = True
+    return call
+
+
+def native(name: str | None = None):
+    # Decorator form of register_native, the name defaults to the function's.
+    def register(call: NativeCall) -> NativeCall:
+        register_native(name or call.__name__, call)
+        return call
+
+    return register
+
+
+""" Builtins """
+
+
+@native("print")
+def native_print(args, env):
+    print(*args, file=SCRIPT_OUTPUT.get())
+
+
+@native("time")
+def native_time(args, env):
+    # Milliseconds since the epoch, like Date.now().
+    return MK_NUMBER(time.time() * 1000)
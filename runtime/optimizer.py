@@ -0,0 +1,183 @@
+from frontend.syntax_tree import (
+    ArrayLiteral,
+    AssignmentExpr,
+    BinaryExpr,
+    CallExpr,
+    Expr,
+    Identifier,
+    MemberExpr,
+    NumericLiteral,
+    ObjectLiteral,
+    Program,
+    Stmt,
+    VarDeclaration,
+)
+from runtime.eval.expressions import NUMERIC_OPERATORS
+
+
+"""
+Optimizer:
+    An AST -> AST pass run between `Parser.produce_ast` and evaluation.
+        - Folds BinaryExpr whose sides are both NumericLiteral (40 / 2 -> 20).
+        - Propagates `const x = <number>;` into later uses of x.
+        - Simplifies x * 1, 1 * x, x / 1 and x - 0 when x is known to be a number.
+
+    Programs are straight-line code, so a single forward pass knows which
+    variables hold numbers at every point. Identities are only applied to
+    operands known to be numbers, as `null * 1` evaluates to null, not to
+    null itself. x + 0 is left alone, it is not an identity for x = -0.0.
+    Division and modulo by zero are not folded, so they still fail at runtime.
+"""
+
+
+class Optimizer:
+    def __init__(self):
+        self.eliminated = 0  # AST nodes removed
+        self.folded = 0  # BinaryExpr folded into a NumericLiteral
+        self.propagated = 0  # Identifier replaced by its constant value
+        self._constants: dict[str, float] = {}
+        self._numeric: set[str] = set()  # variables currently holding a number
+
+    def optimize(self, program: Program) -> Program:
+        self._constants = {}
+        self._numeric = set()
+        program.body = [self.optimize_node(stmt) for stmt in program.body]
+        return program
+
+    def is_numeric(self, astNode: Stmt) -> bool:
+        match astNode.kind:
+            case "NumericLiteral":
+                return True
+            case "Identifier":
+                return astNode.symbol in self._numeric
+            case "BinaryExpr":
+                return self.is_numeric(astNode.left) and self.is_numeric(
+                    astNode.right
+                )
+            case "AssignmentExpr":
+                return self.is_numeric(astNode.value)
+            case _:
+                return False
+
+    def optimize_node(self, astNode: Stmt) -> Stmt:
+        match astNode.kind:
+            case "Identifier":
+                return self.optimize_identifier(astNode)
+            case "BinaryExpr":
+                return self.optimize_binary_expr(astNode)
+            case "AssignmentExpr":
+                return self.optimize_assignment(astNode)
+            case "ObjectLiteral":
+                return self.optimize_object_expr(astNode)
+            case "ArrayLiteral":
+                return self.optimize_array_expr(astNode)
+            case "VarDeclaration":
+                return self.optimize_var_declaration(astNode)
+            case "MemberExpr":
+                return self.optimize_member_expr(astNode)
+            case "CallExpr":
+                return self.optimize_call_expr(astNode)
+            case _:
+                return astNode
+
+    def optimize_identifier(self, ident: Identifier) -> Expr:
+        value = self._constants.get(ident.symbol)
+        if value is None:
+            return ident
+
+        self.propagated += 1
+        return NumericLiteral(value)
+
+    def optimize_binary_expr(self, binop: BinaryExpr) -> Expr:
+        # Numeric-ness is checked right after each side, an assignment on the
+        # right hand side must not affect what the left hand side saw.
+        binop.left = self.optimize_node(binop.left)
+        left_numeric = self.is_numeric(binop.left)
+        binop.right = self.optimize_node(binop.right)
+        right_numeric = self.is_numeric(binop.right)
+
+        left, right, operator = binop.left, binop.right, binop.operator
+        if left.kind == "NumericLiteral" and right.kind == "NumericLiteral":
+            if operator in ("/", "%") and right.value == 0:
+                return binop
+
+            self.folded += 1
+            self.eliminated += 2
+            return NumericLiteral(NUMERIC_OPERATORS[operator](left.value, right.value))
+
+        if right.kind == "NumericLiteral" and left_numeric:
+            # x * 1 | x / 1 | x - 0
+            if (operator in ("*", "/") and right.value == 1) or (
+                operator == "-" and right.value == 0
+            ):
+                self.eliminated += 2
+                return left
+
+        if left.kind == "NumericLiteral" and right_numeric:
+            # 1 * x
+            if operator == "*" and left.value == 1:
+                self.eliminated += 2
+                return right
+
+        return binop
+
+    def optimize_assignment(self, node: AssignmentExpr) -> Expr:
+        node.value = self.optimize_node(node.value)
+
+        if node.assigne.kind == "Identifier":
+            self.track(node.assigne.symbol, node.value)
+
+        return node
+
+    def optimize_object_expr(self, obj_lit: ObjectLiteral) -> Expr:
+        for prop in obj_lit.properties:
+            # { foo } == { foo: foo }
+            if prop.value is None:
+                value = self._constants.get(prop.key)
+                if value is not None:
+                    self.propagated += 1
+                    prop.value = NumericLiteral(value)
+            else:
+                prop.value = self.optimize_node(prop.value)
+
+        return obj_lit
+
+    def optimize_array_expr(self, array_lit: ArrayLiteral) -> Expr:
+        array_lit.elements = [
+            self.optimize_node(element) for element in array_lit.elements
+        ]
+        return array_lit
+
+    def optimize_var_declaration(self, declaration: VarDeclaration) -> Stmt:
+        if declaration.value is not None:
+            declaration.value = self.optimize_node(declaration.value)
+
+        self.track(declaration.identifier, declaration.value)
+
+        if (
+            declaration.constant
+            and declaration.value is not None
+            and declaration.value.kind == "NumericLiteral"
+        ):
+            self._constants[declaration.identifier] = declaration.value.value
+
+        return declaration
+
+    def optimize_member_expr(self, member: MemberExpr) -> Expr:
+        member.obj = self.optimize_node(member.obj)
+        # obj.x names a property, only obj[expr] holds an expression.
+        if member.computed:
+            member.prop = self.optimize_node(member.prop)
+
+        return member
+
+    def optimize_call_expr(self, call: CallExpr) -> Expr:
+        call.caller = self.optimize_node(call.caller)
+        call.args = [self.optimize_node(arg) for arg in call.args]
+        return call
+
+    def track(self, varname: str, value: Expr | None):
+        if value is not None and self.is_numeric(value):
+            self._numeric.add(varname)
+        else:
+            self._numeric.discard(varname)
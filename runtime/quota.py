@@ -0,0 +1,104 @@
+import sys
+from array import array
+
+from runtime.values import EMPTY_SHAPE, ArrayVal, NumberVal, ObjectVal
+
+"""
+Execution quotas:
+    A Quota is attached to the global Environment (`create_global_env(quota)`)
+    and enforced by the tree-walking evaluator, so a runaway script cannot
+    starve a shared worker:
+        - max_steps:      AST nodes evaluated
+        - max_depth:      nested evaluation depth (deep BinaryExpr chains,
+                          deeply nested object literals)
+        - max_properties: properties in a single object literal
+        - max_bytes:      approximate bytes allocated for objects and arrays
+
+    Only objects and arrays are charged against max_bytes, arrays for their
+    literals and for every array an arithmetic step makes. Numbers are fixed
+    size and a step allocates at most one, so max_steps already bounds them.
+
+    Limits that are None are not enforced. A Quota's counters are not reset
+    between runs, create a new one per script.
+"""
+
+UNLIMITED = sys.maxsize
+
+# Rough CPython sizes: an ObjectVal with an empty value list, and the extra
+# list entry plus value held per property. Keys live in the shared Shape.
+OBJECT_BYTES = sys.getsizeof(ObjectVal(EMPTY_SHAPE, [])) + sys.getsizeof([])
+PROPERTY_BYTES = 8 + sys.getsizeof(NumberVal(0.0))
+# sys.getsizeof() of an empty float64 ndarray on 64-bit CPython, its header
+# without any elements. Written out because measuring it would import NumPy
+# on every startup.
+NDARRAY_HEADER_BYTES = 112
+# An ArrayVal plus its buffer's header, an ndarray or, without NumPy, an
+# array('d'), whichever is larger. The elements are unboxed doubles.
+ARRAY_BYTES = sys.getsizeof(ArrayVal(None)) + max(
+    NDARRAY_HEADER_BYTES, sys.getsizeof(array("d"))
+)
+ELEMENT_BYTES = 8
+
+
+class QuotaExceeded(Exception):
+    pass
+
+
+class Quota:
+    __slots__ = (
+        "max_steps",
+        "max_depth",
+        "max_properties",
+        "max_bytes",
+        "steps",
+        "depth",
+        "bytes",
+    )
+
+    def __init__(
+        self,
+        max_steps: int | None = None,
+        max_depth: int | None = None,
+        max_properties: int | None = None,
+        max_bytes: int | None = None,
+    ):
+        # Unlimited is just a limit that is never reached, so the checks
+        # below are always a plain comparison.
+        self.max_steps = UNLIMITED if max_steps is None else max_steps
+        self.max_depth = UNLIMITED if max_depth is None else max_depth
+        self.max_properties = UNLIMITED if max_properties is None else max_properties
+        self.max_bytes = UNLIMITED if max_bytes is None else max_bytes
+        self.steps = 0
+        self.depth = 0
+        self.bytes = 0
+
+    def enter(self):
+        # Called before evaluating a node, `depth` is decremented by the
+        # evaluator once the node is done. runtime/interpreter inlines this.
+        self.steps += 1
+        self.depth += 1
+        if self.steps > self.max_steps or self.depth > self.max_depth:
+            self.exceeded()
+
+    def exit(self):
+        self.depth -= 1
+
+    def exceeded(self):
+        if self.steps > self.max_steps:
+            raise QuotaExceeded(f"Step limit of {self.max_steps} nodes exceeded.")
+        raise QuotaExceeded(f"Nesting depth limit of {self.max_depth} exceeded.")
+
+    def charge_object(self, properties: int):
+        if properties > self.max_properties:
+            raise QuotaExceeded(
+                f"Object with {properties} properties exceeds the limit of {self.max_properties}."
+            )
+
+        self.bytes += OBJECT_BYTES + properties * PROPERTY_BYTES
+        if self.bytes > self.max_bytes:
+            raise QuotaExceeded(f"Memory limit of {self.max_bytes} bytes exceeded.")
+
+    def charge_array(self, elements: int):
+        self.bytes += ARRAY_BYTES + elements * ELEMENT_BYTES
+        if self.bytes > self.max_bytes:
+            raise QuotaExceeded(f"Memory limit of {self.max_bytes} bytes exceeded.")
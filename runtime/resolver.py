@@ -0,0 +1,150 @@
+from frontend.syntax_tree import (
+    AssignmentExpr,
+    Identifier,
+    Program,
+    Stmt,
+    VarDeclaration,
+)
+
+
+class Scope:
+    """
+    Compile-time mirror of an Environment: maps each declared name to the
+    index of its slot in the matching SlotEnvironment's value list.
+    """
+
+    def __init__(self, parent=None):
+        self._parent = parent
+        self.slots: dict[str, int] = {}
+        self.constants: set[str] = set()
+
+    def declare(self, varname: str, constant: bool) -> int:
+        if varname in self.slots:
+            raise ValueError(
+                f"Cannot declare variable {varname} as it is already defined."
+            )
+
+        slot = len(self.slots)
+        self.slots[varname] = slot
+        if constant:
+            self.constants.add(varname)
+        return slot
+
+    def truncate(self, size: int):
+        # Forget every name declared after the first `size` slots.
+        forgotten = [name for name, slot in self.slots.items() if slot >= size]
+        for name in forgotten:
+            del self.slots[name]
+            self.constants.discard(name)
+
+    def resolve(self, varname: str) -> tuple[int, int]:
+        # Returns (depth, slot), depth being how many parents up the name lives.
+        scope = self
+        depth = 0
+        while scope is not None:
+            slot = scope.slots.get(varname)
+            if slot is not None:
+                return depth, slot
+            scope = scope._parent
+            depth += 1
+
+        raise ValueError(f"Cannot resolve <{varname}> as it does not exist.")
+
+    def is_constant(self, depth: int, varname: str) -> bool:
+        scope = self
+        for _ in range(depth):
+            scope = scope._parent
+        return varname in scope.constants
+
+
+"""
+Resolver:
+    A static pass run before execution that stores (depth, slot) on every
+    Identifier and shorthand PropertyLiteral and the declared slot on every
+    VarDeclaration, declaring names into the Scope in program order.
+    Undefined names, redeclarations and assignments to constants are
+    reported here instead of at runtime.
+"""
+
+
+# Marks that the node below it on the work stack has had its value resolved.
+RESOLVED = object()
+
+
+def resolve_program(program: Program, scope: Scope):
+    for statement in program.body:
+        resolve_node(statement, scope)
+
+
+def resolve_node(astNode: Stmt, scope: Scope):
+    # Walked with an explicit work stack like runtime/interpreter.evaluate,
+    # children pushed in reverse so they resolve left to right, in the order
+    # they are evaluated. Nesting depth is not limited by the recursion limit.
+    todo: list = [astNode]
+    push = todo.append
+    while todo:
+        node = todo.pop()
+        if node is RESOLVED:
+            node = todo.pop()
+            if node.kind == "AssignmentExpr":
+                resolve_assignment(node, scope)
+            else:
+                resolve_var_declaration(node, scope)
+            continue
+
+        match node.kind:
+            case "Identifier":
+                resolve_identifier(node, scope)
+            case "ObjectLiteral":
+                todo.extend(reversed(node.properties))
+            case "PropertyLiteral":
+                # { foo } == { foo: foo }
+                if node.value is None:
+                    node.depth, node.slot = scope.resolve(node.key)
+                else:
+                    push(node.value)
+            case "ArrayLiteral":
+                todo.extend(reversed(node.elements))
+            case "AssignmentExpr":
+                # An invalid LHS is left for the evaluator to reject when it runs.
+                if node.assigne.kind == "Identifier":
+                    push(node)
+                    push(RESOLVED)
+                    push(node.value)
+            case "BinaryExpr":
+                push(node.right)
+                push(node.left)
+            case "MemberExpr":
+                # obj.key names a property, only obj[expr] holds an expression.
+                if node.computed:
+                    push(node.prop)
+                push(node.obj)
+            case "CallExpr":
+                todo.extend(reversed(node.args))
+                push(node.caller)
+            case "Program":
+                todo.extend(reversed(node.body))
+            case "VarDeclaration":
+                push(node)
+                push(RESOLVED)
+                if node.value is not None:
+                    push(node.value)
+
+
+def resolve_identifier(ident: Identifier, scope: Scope):
+    ident.depth, ident.slot = scope.resolve(ident.symbol)
+
+
+def resolve_assignment(node: AssignmentExpr, scope: Scope):
+    # After its value, the name is only looked up once the value is known.
+    resolve_identifier(node.assigne, scope)
+
+    if scope.is_constant(node.assigne.depth, node.assigne.symbol):
+        raise ValueError(
+            f"Cannot reassign to variable {node.assigne.symbol} as it was declared as constant."
+        )
+
+
+def resolve_var_declaration(declaration: VarDeclaration, scope: Scope):
+    # After its value, `let a = a` must not see the new `a`.
+    declaration.slot = scope.declare(declaration.identifier, declaration.constant)
@@ -0,0 +1,283 @@
+import asyncio
+import json
+import os
+import sys
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+
+from runtime.engines import ENGINES
+from runtime.worker import init_worker, run_source, run_source_async
+from util.printer import print
+
+"""
+Interpreter server:
+    `main.py --serve <socket path>` listens on a Unix socket, `--serve -`
+    talks over stdin/stdout. Both speak JSON-RPC 2.0, one JSON object per
+    line:
+        -> {"jsonrpc": "2.0", "id": 1, "method": "evaluate",
+            "params": {"source": "40 / 2", "engine": "vm"}}
+        <- {"jsonrpc": "2.0", "id": 1,
+            "result": {"type": "number", "value": 20.0}}
+    Script errors come back as error code -32000 with the interpreter's
+    message, syntax errors also list every error found in `error.data` as
+    {"message", "line", "column"} objects. What a script printed comes back
+    as "stdout" in the result, or in `error.data` when it failed. `engine` is optional and defaults to the server's --engine.
+
+    Requests are evaluated by warm workers (runtime/worker) that keep their
+    Parser and an LRU cache of parsed programs between requests. With one
+    worker everything runs in the server process, tree engine scripts through
+    the async evaluator so long scripts don't hold up other connections.
+    Otherwise requests go to a ProcessPoolExecutor where every worker process
+    has its own cache.
+"""
+
+SCRIPT_ERROR = -32000
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+METHOD_NOT_FOUND = -32601
+
+DEFAULT_AST_CACHE_SIZE = 256
+
+
+class InlineExecutor(Executor):
+    # Runs work in the calling thread, used for a single worker.
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def create_executor(
+    engine: str,
+    optimize: bool,
+    workers: int,
+    ast_cache_size: int,
+    limits: dict | None = None,
+) -> Executor:
+    if workers == 1:
+        init_worker(engine, optimize, ast_cache_size, limits)
+        return InlineExecutor()
+
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_worker,
+        initargs=(engine, optimize, ast_cache_size, limits),
+    )
+
+
+def error_response(id, code: int, message: str) -> dict:
+    return {"jsonrpc": "2.0", "id": id, "error": {"code": code, "message": message}}
+
+
+def parse_request(line: str) -> tuple[dict | None, dict | None]:
+    # Returns (request, None) or (None, error response).
+    try:
+        request = json.loads(line)
+    except json.JSONDecodeError as e:
+        return None, error_response(None, PARSE_ERROR, f"Parse error: {e}")
+
+    if not isinstance(request, dict) or not isinstance(request.get("method"), str):
+        return None, error_response(None, INVALID_REQUEST, "Invalid request")
+
+    id = request.get("id")
+    if request["method"] == "ping":
+        return None, {"jsonrpc": "2.0", "id": id, "result": "pong"}
+    if request["method"] != "evaluate":
+        return None, error_response(
+            id, METHOD_NOT_FOUND, f"Method not found: {request['method']}"
+        )
+
+    params = request.get("params")
+    if not isinstance(params, dict) or not isinstance(params.get("source"), str):
+        return None, error_response(id, INVALID_REQUEST, "params.source is required")
+    engine = params.get("engine")
+    if engine is not None and engine not in ENGINES:
+        return None, error_response(
+            id,
+            INVALID_REQUEST,
+            f"params.engine must be one of {', '.join(ENGINES)}, got {engine!r}",
+        )
+
+    return request, None
+
+
+def make_response(id, outcome: dict) -> dict:
+    stdout = outcome.get("stdout")
+    if outcome["ok"]:
+        result = {"type": outcome["type"], "value": outcome["result"]}
+        if stdout:
+            result["stdout"] = stdout
+        return {"jsonrpc": "2.0", "id": id, "result": result}
+
+    response = error_response(id, SCRIPT_ERROR, outcome["error"])
+    if "errors" in outcome:
+        response["error"]["data"] = outcome["errors"]
+    elif stdout:
+        response["error"]["data"] = {"stdout": stdout}
+    return response
+
+
+async def handle_line(line: str, executor: Executor) -> dict:
+    request, response = parse_request(line)
+    if response is not None:
+        return response
+
+    params = request["params"]
+    if isinstance(executor, InlineExecutor):
+        outcome = await run_source_async(params["source"], params.get("engine"))
+    else:
+        loop = asyncio.get_running_loop()
+        outcome = await loop.run_in_executor(
+            executor, run_source, params["source"], params.get("engine")
+        )
+    return make_response(request.get("id"), outcome)
+
+
+async def serve_unix(path: str, executor: Executor):
+    async def handle_connection(reader, writer):
+        # Requests on one connection are answered in order, clients wanting
+        # concurrency open more connections.
+        try:
+            while line := await reader.readline():
+                if not line.strip():
+                    continue
+                response = await handle_line(line.decode(), executor)
+                writer.write((json.dumps(response) + "\n").encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    if os.path.exists(path):
+        os.remove(path)  # stale socket from a previous run
+
+    server = await asyncio.start_unix_server(
+        handle_connection, path, limit=64 * 1024 * 1024
+    )
+    print(f"Listening on {path}", file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+
+def serve_stdio(executor: Executor):
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        request, response = parse_request(line)
+        if response is None:
+            params = request["params"]
+            outcome = executor.submit(
+                run_source, params["source"], params.get("engine")
+            ).result()
+            response = make_response(request.get("id"), outcome)
+
+        sys.stdout.write(json.dumps(response) + "\n")
+        sys.stdout.flush()
+
+
+def serve(
+    target: str,
+    engine: str = "tree",
+    optimize: bool = False,
+    workers: int = None,
+    ast_cache_size: int = DEFAULT_AST_CACHE_SIZE,
+    limits: dict | None = None,
+):
+    workers = workers or os.cpu_count() or 1
+    executor = create_executor(engine, optimize, workers, ast_cache_size, limits)
+
+    try:
+        if target == "-":
+            serve_stdio(executor)
+        else:
+            asyncio.run(serve_unix(target, executor))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown()
+
+
+"""
+Load test client:
+    `main.py --load-test <socket path>` sends --requests evaluate calls over
+    --connections concurrent connections and reports latency percentiles and
+    throughput. Sources cycle through a small set, like a service re-running
+    the same scripts.
+"""
+
+LOAD_TEST_SOURCES = [
+    "let foo = 40 / 2; const obj = { x: 100, y: 200, foo, complex: { bar: true } }; obj",
+    "let a = 1; let b = 2; a = (a * 3 + b) % 7 + 1; b = (b + a) % 5; a * b",
+    "const width = 40 / 2; const height = width * 3 + 10 % 4; width * height",
+]
+
+
+async def load_test_connection(
+    path: str, count: int, offset: int, latencies: list[float], failures: list[int]
+):
+    reader, writer = await asyncio.open_unix_connection(path, limit=64 * 1024 * 1024)
+    for i in range(count):
+        source = LOAD_TEST_SOURCES[(offset + i) % len(LOAD_TEST_SOURCES)]
+        request = {
+            "jsonrpc": "2.0",
+            "id": i,
+            "method": "evaluate",
+            "params": {"source": source},
+        }
+        start = time.perf_counter()
+        writer.write((json.dumps(request) + "\n").encode())
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        if "error" in response:
+            failures.append(i)
+
+    writer.close()
+
+
+async def run_load_test(path: str, requests: int, connections: int) -> dict:
+    if requests < 1 or connections < 1:
+        raise ValueError(
+            f"A load test needs at least 1 request and connection, got "
+            f"{requests} and {connections}."
+        )
+
+    latencies: list[float] = []
+    failures: list[int] = []
+    per_connection = [
+        requests // connections + (1 if i < requests % connections else 0)
+        for i in range(connections)
+    ]
+
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            load_test_connection(path, count, i, latencies, failures)
+            for i, count in enumerate(per_connection)
+        )
+    )
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": len(failures),
+        "seconds": elapsed,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1000,
+    }
+
+
+def load_test(path: str, requests: int = 1000, connections: int = 4):
+    stats = asyncio.run(run_load_test(path, requests, connections))
+    print(
+        f"{stats['requests']} requests ({stats['errors']} errors) over "
+        f"{connections} connections in {stats['seconds']:.2f}s: "
+        f"{stats['rps']:.0f} req/s, p50 {stats['p50_ms']:.2f} ms, "
+        f"p99 {stats['p99_ms']:.2f} ms"
+    )
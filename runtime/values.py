@@ -1,10 +1,15 @@
-from typing import Literal
+from array import array
+from math import copysign
+from typing import Callable, Literal
 from util.printer import value_print
 
-ValueType = Literal["null", "number", "boolean", "object"]
+ValueType = Literal["null", "number", "boolean", "object", "array", "native-fn"]
 
 
 class RuntimeVal:
+    # No per-instance __dict__, values are created for every intermediate result.
+    __slots__ = ("type",)
+
     def __init__(self, type: ValueType):
         self.type = type
 
@@ -13,6 +18,8 @@ class RuntimeVal:
 
 
 class NullVal(RuntimeVal):
+    __slots__ = ("value",)
+
     def __init__(self):
         super().__init__("null")
         self.value = None
@@ -22,6 +29,8 @@ class NullVal(RuntimeVal):
 
 
 class NumberVal(RuntimeVal):
+    __slots__ = ("value",)
+
     def __init__(self, value: float):
         super().__init__("number")
         self.value = value
@@ -31,6 +40,8 @@ class NumberVal(RuntimeVal):
 
 
 class BooleanVal(RuntimeVal):
+    __slots__ = ("value",)
+
     def __init__(self, value: bool):
         super().__init__("boolean")
         self.value = value
@@ -39,10 +50,51 @@ class BooleanVal(RuntimeVal):
         return value_print(self.__class__.__name__, self.value, self.type)
 
 
+class Shape:
+    """
+    Hidden class shared by every object with the same keys in the same
+    order: maps each key to the index of its value in ObjectVal.values.
+    Shapes form a tree of transitions from EMPTY_SHAPE, adding a key to a
+    shape always gives back the same child shape, so objects built the same
+    way can be recognised by comparing shapes with `is`.
+    """
+
+    __slots__ = ("keys", "index", "transitions")
+
+    def __init__(self, keys: tuple[str, ...]):
+        self.keys = keys
+        self.index: dict[str, int] = {key: i for i, key in enumerate(keys)}
+        self.transitions: dict[str, "Shape"] = {}
+
+    def with_key(self, key: str) -> "Shape":
+        if key in self.index:
+            return self
+        shape = self.transitions.get(key)
+        if shape is None:
+            shape = Shape(self.keys + (key,))
+            self.transitions[key] = shape
+        return shape
+
+
+EMPTY_SHAPE = Shape(())
+
+
 class ObjectVal(RuntimeVal):
-    def __init__(self, properties: dict[str, RuntimeVal]):
+    __slots__ = ("shape", "values")
+
+    def __init__(self, shape: Shape, values: list[RuntimeVal]):
         super().__init__("object")
-        self.properties = properties
+        self.shape = shape
+        self.values = values  # in shape.keys order
+
+    @property
+    def properties(self) -> dict[str, RuntimeVal]:
+        # A copy, only for printing and converting, reads go through get().
+        return dict(zip(self.shape.keys, self.values))
+
+    def get(self, key: str) -> RuntimeVal | None:
+        index = self.shape.index.get(key)
+        return None if index is None else self.values[index]
 
     def __str__(self, level=0):
         indent = "  " * level
@@ -59,16 +111,189 @@ class ObjectVal(RuntimeVal):
         return result
 
 
+class ArrayVal(RuntimeVal):
+    """
+    Numeric array. The elements are unboxed doubles in one contiguous
+    buffer, a float64 NumPy array, or an array('d') when NumPy is not
+    installed (see numeric_buffer). Arithmetic on arrays works on the whole
+    buffer at once (runtime/eval/expressions.eval_array_binary_expr), no
+    NumberVal is made per element.
+    """
+
+    __slots__ = ("elements",)
+
+    def __init__(self, elements):
+        super().__init__("array")
+        self.elements = elements
+
+    def __len__(self):
+        return len(self.elements)
+
+    def __str__(self):
+        return value_print(self.__class__.__name__, self.elements.tolist(), self.type)
+
+
+class NativeFnVal(RuntimeVal):
+    # A Python function scripts can call, see runtime/natives. Calls to pure
+    # ones are memoized, see runtime/memo.
+    __slots__ = ("name", "call", "pure")
+
+    def __init__(self, name: str, call: "NativeCall", pure: bool = False):
+        super().__init__("native-fn")
+        self.name = name
+        self.call = call
+        self.pure = pure
+
+    def __str__(self):
+        return value_print(self.__class__.__name__, self.name, self.type)
+
+
+# (evaluated arguments, calling environment) -> result, None for null.
+NativeCall = Callable[[list[RuntimeVal], object], "RuntimeVal | None"]
+
+
 """Helper Functions"""
 
+# Null and booleans are immutable, every MK_NULL()/MK_BOOL() shares one object.
+NULL = NullVal()
+TRUE = BooleanVal(True)
+FALSE = BooleanVal(False)
+
+# Whole numbers in this range are interned, like CPython's small int cache.
+SMALL_NUMBER_MIN = -128
+SMALL_NUMBER_MAX = 1024
+SMALL_NUMBERS = {
+    float(n): NumberVal(float(n)) for n in range(SMALL_NUMBER_MIN, SMALL_NUMBER_MAX + 1)
+}
+
 
 def MK_NULL():
-    return NullVal()
+    return NULL
 
 
-def MK_NUMBER(n: float = 0):
+def MK_NUMBER(n: float = 0.0):
+    # Numbers are always floats, the evaluators tell unboxed numbers apart
+    # by `type(value) is float`. Natives may well pass an int.
+    if type(n) is not float:
+        n = float(n)
+    # 0.0 == -0.0, so only a positive zero may come from the cache.
+    cached = SMALL_NUMBERS.get(n)
+    if cached is not None and (n != 0 or copysign(1.0, n) > 0):
+        return cached
     return NumberVal(n)
 
 
+def box(value) -> RuntimeVal:
+    # runtime/interpreter keeps arithmetic results as raw floats, they become
+    # NumberVals only where they are stored or returned.
+    return MK_NUMBER(value) if type(value) is float else value
+
+
 def MK_BOOL(b=True):
-    return BooleanVal(b)
+    return TRUE if b else FALSE
+
+
+def MK_NATIVE_FN(
+    call: NativeCall, name: str | None = None, pure: bool | None = None
+) -> NativeFnVal:
+    # `pure` defaults to whether the function was marked @pure.
+    if pure is None:
+        pure = getattr(call, "pure", False)
+    return NativeFnVal(name or call.__name__, call, pure)
+
+
+# keys of an object literal -> (its shape, where each property's value goes)
+_literal_shapes: dict[tuple[str, ...], tuple[Shape, tuple[int, ...] | None]] = {}
+
+
+def literal_shape(keys: tuple[str, ...]) -> tuple[Shape, tuple[int, ...] | None]:
+    # The layout is None when every key is different, the values are then
+    # stored in the order they are written. A repeated key keeps its first
+    # position and its last value, like a dict.
+    cached = _literal_shapes.get(keys)
+    if cached is None:
+        shape = EMPTY_SHAPE
+        for key in keys:
+            shape = shape.with_key(key)
+        layout = None
+        if len(shape.keys) != len(keys):
+            layout = tuple(shape.index[key] for key in keys)
+        cached = _literal_shapes[keys] = (shape, layout)
+    return cached
+
+
+def literal_values(
+    values: list[RuntimeVal], layout: tuple[int, ...] | None, size: int
+) -> list[RuntimeVal]:
+    # An object literal's values in the order they were written -> in the
+    # order of its shape's keys, `size` of them.
+    if layout is None:
+        return values
+    placed = [None] * size
+    for index, value in zip(layout, values):
+        placed[index] = value
+    return placed
+
+
+def MK_OBJECT(properties: dict[str, RuntimeVal] | None = None) -> ObjectVal:
+    properties = properties or {}
+    shape, _ = literal_shape(tuple(properties))
+    return ObjectVal(shape, list(properties.values()))
+
+
+# The numpy module, False when it is not installed. Imported on the first
+# array, scripts without arrays never pay for the import.
+_numpy = None
+
+
+def numpy_module():
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy
+
+
+def numeric_buffer(numbers):
+    # A contiguous buffer of doubles holding `numbers`, any iterable of floats.
+    numpy = numpy_module()
+    if numpy:
+        return numpy.fromiter(numbers, numpy.float64)
+    return array("d", numbers)
+
+
+def MK_ARRAY(numbers=()) -> ArrayVal:
+    return ArrayVal(numeric_buffer(numbers))
+
+
+def array_from_values(values: list[RuntimeVal]) -> ArrayVal:
+    # An array literal's element values -> its ArrayVal, arrays only hold numbers.
+    for value in values:
+        if value.type != "number":
+            raise ValueError(f"Array elements must be numbers, got {value.type}.")
+    return MK_ARRAY([value.value for value in values])
+
+
+def property_key(value: RuntimeVal) -> str:
+    # The key obj[value] reads, the value's text like in JavaScript: 1 -> "1".
+    if value.type == "number":
+        number = value.value
+        return str(int(number)) if number.is_integer() else repr(number)
+    if value.type == "boolean":
+        return "true" if value.value else "false"
+    if value.type == "null":
+        return "null"
+    return "[object Object]"
+
+
+def to_python(val: RuntimeVal):
+    # Plain Python (JSON serialisable) form: None, float, bool, dict or list.
+    if isinstance(val, ObjectVal):
+        return {key: to_python(value) for key, value in val.properties.items()}
+    if isinstance(val, ArrayVal):
+        return val.elements.tolist()
+
+    return getattr(val, "value", None)
@@ -0,0 +1,136 @@
+from runtime.bytecode import BINARY_OPERATORS, Chunk, OpCode
+from runtime.environment import Environment
+from runtime.eval.expressions import (
+    NUMERIC_OPERATORS,
+    eval_binary_expr,
+    eval_call,
+    eval_member,
+)
+from runtime.values import (
+    MK_NULL,
+    MK_NUMBER,
+    ObjectVal,
+    RuntimeVal,
+    array_from_values,
+    literal_values,
+    property_key,
+)
+
+# Plain ints for the dispatch loop, comparing IntEnum members is slower.
+LOAD_CONST = int(OpCode.LOAD_CONST)
+LOAD_NULL = int(OpCode.LOAD_NULL)
+LOAD_VAR = int(OpCode.LOAD_VAR)
+STORE_VAR = int(OpCode.STORE_VAR)
+DECLARE_VAR = int(OpCode.DECLARE_VAR)
+BINARY_OP = int(OpCode.BINARY_OP)
+BUILD_OBJECT = int(OpCode.BUILD_OBJECT)
+EVAL_NODE = int(OpCode.EVAL_NODE)
+RAISE = int(OpCode.RAISE)
+POP = int(OpCode.POP)
+RETURN = int(OpCode.RETURN)
+GET_PROPERTY = int(OpCode.GET_PROPERTY)
+GET_COMPUTED = int(OpCode.GET_COMPUTED)
+BUILD_ARRAY = int(OpCode.BUILD_ARRAY)
+LOAD_CALLEE = int(OpCode.LOAD_CALLEE)
+CALL = int(OpCode.CALL)
+
+# Operator index -> Python implementation, same order as BINARY_OPERATORS.
+OPERATOR_TABLE = [NUMERIC_OPERATORS[operator] for operator in BINARY_OPERATORS]
+
+
+def run_bytecode(chunk: Chunk, env: Environment) -> RuntimeVal:
+    code = chunk.code.tolist()  # list indexing is faster than array indexing
+    constants = chunk.constants
+    operators = OPERATOR_TABLE
+    stack = []
+    push = stack.append
+    pop = stack.pop
+    pc = 0
+
+    while True:
+        op = code[pc]
+
+        if op == LOAD_VAR:
+            push(env.lookup_var(constants[code[pc + 1]]))
+            pc += 2
+        elif op == LOAD_CONST:
+            push(constants[code[pc + 1]])
+            pc += 2
+        elif op == BINARY_OP:
+            rightHandSide = pop()
+            leftHandSide = pop()
+            if leftHandSide.type == "number" and rightHandSide.type == "number":
+                push(
+                    MK_NUMBER(
+                        operators[code[pc + 1]](leftHandSide.value, rightHandSide.value)
+                    )
+                )
+            else:
+                push(
+                    eval_binary_expr(
+                        leftHandSide, rightHandSide, BINARY_OPERATORS[code[pc + 1]]
+                    )
+                )
+            pc += 2
+        elif op == STORE_VAR:
+            env.assign_var(constants[code[pc + 1]], stack[-1])
+            pc += 2
+        elif op == POP:
+            pop()
+            pc += 1
+        elif op == DECLARE_VAR:
+            env.declare_var(constants[code[pc + 1]], stack[-1], code[pc + 2] == 1)
+            pc += 3
+        elif op == LOAD_NULL:
+            push(MK_NULL())
+            pc += 1
+        elif op == GET_PROPERTY:
+            member = constants[code[pc + 1]]
+            target = stack[-1]
+            # Inline cache hit, see runtime/eval/expressions.eval_member.
+            if target.type == "object" and target.shape is member.cached_shape:
+                stack[-1] = target.values[member.cached_index]
+            else:
+                stack[-1] = eval_member(target, member.prop.symbol, member)
+            pc += 2
+        elif op == BUILD_OBJECT:
+            shape, layout, count = constants[code[pc + 1]]
+            values = stack[len(stack) - count :]
+            del stack[len(stack) - count :]
+            push(ObjectVal(shape, literal_values(values, layout, len(shape.keys))))
+            pc += 2
+        elif op == GET_COMPUTED:
+            key = property_key(pop())
+            stack[-1] = eval_member(stack[-1], key)
+            pc += 1
+        elif op == BUILD_ARRAY:
+            count = code[pc + 1]
+            values = stack[len(stack) - count :]
+            del stack[len(stack) - count :]
+            push(array_from_values(values))
+            pc += 2
+        elif op == LOAD_CALLEE:
+            call = constants[code[pc + 1]]
+            # Callee cache hit, see Environment.lookup_callee.
+            if call.cached_env == env.serial:
+                push(call.cached_callee)
+            else:
+                push(env.lookup_callee(call))
+            pc += 2
+        elif op == CALL:
+            count = code[pc + 1]
+            args = stack[len(stack) - count :]
+            del stack[len(stack) - count :]
+            stack[-1] = eval_call(stack[-1], args, env)
+            pc += 2
+        elif op == EVAL_NODE:
+            from runtime.interpreter import evaluate
+
+            push(evaluate(constants[code[pc + 1]], env))
+            pc += 2
+        elif op == RAISE:
+            raise ValueError(constants[code[pc + 1]])
+        elif op == RETURN:
+            return pop()
+        else:
+            raise ValueError(f"Unknown opcode {op} at {pc}.")
@@ -0,0 +1,141 @@
+import io
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from frontend.diagnostics import ParseError
+from frontend.parser import Parser
+from frontend.source_map import LineTable
+from frontend.syntax_tree import Program
+from runtime.engines import create_env, execute
+from runtime.natives import SCRIPT_OUTPUT
+
+"""
+Warm worker state, shared by `--batch` and `--serve`:
+    init_worker runs once per worker process (or once in-process) and keeps a
+    Parser plus an LRU cache of parsed programs keyed by engine and source
+    text, so repeated scripts skip lexing and parsing. The engine is part of
+    the key because the slots engine's resolver writes slots onto the AST,
+    which the other engines must not see. Every run_source call gets a
+    fresh global environment, and a fresh Quota when limits were given.
+
+    What a script prints is captured and returned in "stdout", success or
+    not, "error" is only ever the error that stopped it.
+
+    Syntax errors come back with all of the source's errors, rendered in
+    "error" and as {"message", "line", "column"} objects in "errors".
+    check_source only parses, for validating scripts without running them.
+"""
+
+_parser: Parser | None = None
+_engine = "tree"
+_optimize = False
+_ast_cache: OrderedDict[tuple[str, str], Program] = OrderedDict()
+_ast_cache_size = 0
+_limits: dict | None = None  # Quota keyword arguments
+
+
+def init_worker(
+    engine: str, optimize: bool, ast_cache_size: int = 0, limits: dict | None = None
+):
+    global _parser, _engine, _optimize, _ast_cache_size, _limits
+    _parser = Parser()
+    _engine = engine
+    _optimize = optimize
+    _ast_cache_size = ast_cache_size
+    _limits = limits
+    _ast_cache.clear()
+
+
+def parse_source(sourceCode: str, engine: str) -> Program:
+    key = (engine, sourceCode)
+    program = _ast_cache.get(key)
+    if program is not None:
+        _ast_cache.move_to_end(key)
+        return program
+
+    program = _parser.produce_ast(sourceCode)
+    if _optimize:
+        from runtime.optimizer import Optimizer
+
+        program = Optimizer().optimize(program)
+
+    if _ast_cache_size > 0:
+        _ast_cache[key] = program
+        if len(_ast_cache) > _ast_cache_size:
+            _ast_cache.popitem(last=False)  # least recently used
+
+    return program
+
+
+@contextmanager
+def captured_output():
+    # Everything the script prints while in the block, see SCRIPT_OUTPUT.
+    output = io.StringIO()
+    token = SCRIPT_OUTPUT.set(output)
+    try:
+        yield output
+    finally:
+        SCRIPT_OUTPUT.reset(token)
+
+
+def run_source(sourceCode: str, engine: str | None = None) -> dict:
+    from runtime.values import to_python
+
+    engine = engine or _engine
+
+    with captured_output() as output:
+        try:
+            program = parse_source(sourceCode, engine)
+            result = execute(program, create_env(engine, _limits), engine)
+            outcome = {"ok": True, "type": result.type, "result": to_python(result)}
+        except ParseError as e:
+            outcome = parse_error_result(e)
+        except (Exception, SystemExit) as e:
+            outcome = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    outcome["stdout"] = output.getvalue()
+    return outcome
+
+
+def parse_error_result(error: ParseError) -> dict:
+    return {
+        "ok": False,
+        "error": str(error),
+        "errors": [diagnostic.to_dict(error.lines) for diagnostic in error.diagnostics],
+    }
+
+
+def check_source(sourceCode: str) -> dict:
+    _, diagnostics = _parser.produce_ast_with_diagnostics(sourceCode)
+    lines = LineTable(sourceCode)
+    return {
+        "ok": not diagnostics,
+        "errors": [diagnostic.to_dict(lines) for diagnostic in diagnostics],
+    }
+
+
+async def run_source_async(sourceCode: str, engine: str | None = None) -> dict:
+    # Like run_source, but the tree engine is evaluated by runtime/
+    # async_interpreter so other requests on the same event loop keep running.
+    # Other engines have no async variant and run to completion.
+    from runtime.async_interpreter import evaluate_async
+    from runtime.values import to_python
+
+    engine = engine or _engine
+    if engine != "tree":
+        return run_source(sourceCode, engine)
+
+    # SCRIPT_OUTPUT is per task, other requests interleaved with this one
+    # print into their own output.
+    with captured_output() as output:
+        try:
+            program = parse_source(sourceCode, engine)
+            result = await evaluate_async(program, create_env(engine, _limits))
+            outcome = {"ok": True, "type": result.type, "result": to_python(result)}
+        except ParseError as e:
+            outcome = parse_error_result(e)
+        except Exception as e:
+            outcome = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+    outcome["stdout"] = output.getvalue()
+    return outcome
@@ -0,0 +1,86 @@
+from array import array
+
+import pytest
+
+import runtime.values
+from frontend.parser import Parser
+from runtime.engines import ENGINES, create_env, execute
+from runtime.values import to_python
+
+
+@pytest.fixture(params=["numpy", "array"])
+def backend(request, monkeypatch):
+    # Every test runs on NumPy buffers and on the array('d') fallback.
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+        monkeypatch.setattr(runtime.values, "_numpy", None)
+    else:
+        monkeypatch.setattr(runtime.values, "_numpy", False)
+    return request.param
+
+
+def results(source: str) -> dict:
+    outcomes = {}
+    for engine in ENGINES:
+        try:
+            program = Parser().produce_ast(source)
+            outcomes[engine] = to_python(execute(program, create_env(engine), engine))
+        except Exception as e:
+            outcomes[engine] = type(e).__name__
+    return outcomes
+
+
+@pytest.mark.parametrize(
+    "source, expected",
+    [
+        ("[1, 2, 3]", [1.0, 2.0, 3.0]),
+        ("[]", []),
+        ("[1, 2, 3] * [4, 5, 6]", [4.0, 10.0, 18.0]),
+        ("[1, 2, 3] + 1", [2.0, 3.0, 4.0]),
+        ("10 - [1, 2, 3]", [9.0, 8.0, 7.0]),
+        ("12 / [1, 2, 3]", [12.0, 6.0, 4.0]),
+        ("[7, 8, 9] % 3", [1.0, 2.0, 0.0]),
+        ("(0 - 7) % [3]", [2.0]),
+        ("let k = 2; let a = [k, k * k]; a * a - a / k", [3.0, 14.0]),
+        ("[1, 2] + null", None),
+        ("let o = { a: 1 }; [1, 2] * o", None),
+        # Members
+        ("[4, 5, 6].length", 3.0),
+        ("[4, 5, 6][0] + [4, 5, 6][2]", 10.0),
+        ("let a = [4, 5, 6]; let i = 1; a[i + 1]", 6.0),
+        ("[4, 5, 6][3]", None),
+        ("[4, 5, 6][1 / 2]", None),
+        ("[4, 5, 6][true]", None),
+        ("[4, 5, 6].foo", None),
+        # Errors
+        ("[1, 2] + [1, 2, 3]", "ValueError"),
+        ("[1, null]", "ValueError"),
+        ("[1, [2]]", "ValueError"),
+        ("[1, 2] / [1, 0]", "ZeroDivisionError"),
+        ("[1, 2] % 0", "ZeroDivisionError"),
+    ],
+)
+def test_engines(backend, source, expected):
+    outcomes = results(source)
+
+    assert outcomes == {engine: expected for engine in ENGINES}
+
+
+def test_elements_are_one_buffer(backend):
+    result = execute(Parser().produce_ast("[1, 2] * 3"), create_env())
+
+    if backend == "numpy":
+        import numpy
+
+        assert isinstance(result.elements, numpy.ndarray)
+        assert result.elements.dtype == numpy.float64
+    else:
+        assert isinstance(result.elements, array)
+        assert result.elements.typecode == "d"
+
+
+def test_arrays_are_values(backend):
+    # Arithmetic makes a new array, the operands are left as they were.
+    source = "let a = [1, 2]; let b = a * 2; a = a + 1; [a[0], a[1], b[0], b[1]]"
+
+    assert results(source) == {engine: [2.0, 3.0, 2.0, 4.0] for engine in ENGINES}
@@ -0,0 +1,111 @@
+import pytest
+
+from frontend.ast_cache import (
+    MAGIC,
+    cache_path,
+    load_cached_ast,
+    produce_cached_ast,
+    store_cached_ast,
+)
+from frontend.parser import Parser
+from runtime.worker import init_worker, parse_source
+
+SOURCE = """let a = 2;
+const p = { x: 1, y: a, z: { w: 7 }, a };
+let s = p.x + p.z.w * a;
+let l = [1, s, 3][1];
+s = print(s, l) % 3
+"""
+
+
+class CountingParser(Parser):
+    def __init__(self):
+        super().__init__()
+        self.parsed = 0
+
+    def produce_ast(self, sourceCode: str):
+        self.parsed += 1
+        return super().produce_ast(sourceCode)
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "script.txt"
+    path.write_text(SOURCE)
+    return str(path)
+
+
+def test_round_trip(script):
+    program = Parser().produce_ast(SOURCE)
+    store_cached_ast(script, SOURCE, program)
+
+    assert str(load_cached_ast(script, SOURCE)) == str(program)
+
+
+def test_parses_once(script):
+    parser = CountingParser()
+    first = produce_cached_ast(parser, script, SOURCE)
+    second = produce_cached_ast(parser, script, SOURCE)
+
+    assert parser.parsed == 1
+    assert str(second) == str(first)
+
+
+def test_changed_source_is_parsed_again(script):
+    parser = CountingParser()
+    produce_cached_ast(parser, script, SOURCE)
+    changed = SOURCE.replace("let a = 2;", "let a = 3;")
+    program = produce_cached_ast(parser, script, changed)
+
+    assert parser.parsed == 2
+    assert str(program) == str(Parser().produce_ast(changed))
+
+
+@pytest.mark.parametrize(
+    "corrupt",
+    [
+        lambda data: b"X" + data[1:],  # magic
+        lambda data: data[: len(MAGIC)] + bytes(32) + data[len(MAGIC) + 32 :],  # hash
+        lambda data: data[:-5],  # truncated payload
+        lambda data: b"",
+    ],
+)
+def test_bad_cache_falls_back_to_parsing(script, corrupt):
+    produce_cached_ast(Parser(), script, SOURCE)
+    with open(cache_path(script), "rb") as file:
+        data = file.read()
+    with open(cache_path(script), "wb") as file:
+        file.write(corrupt(data))
+
+    assert load_cached_ast(script, SOURCE) is None
+    parser = CountingParser()
+    program = produce_cached_ast(parser, script, SOURCE)
+    assert parser.parsed == 1
+    assert str(program) == str(Parser().produce_ast(SOURCE))
+    # and the cache was rewritten
+    assert str(load_cached_ast(script, SOURCE)) == str(program)
+
+
+def test_worker_cache_evicts_the_least_recently_used():
+    init_worker("tree", False, ast_cache_size=2)
+    a = parse_source("1 + 1", "tree")
+    b = parse_source("2 + 2", "tree")
+
+    assert parse_source("1 + 1", "tree") is a  # now the most recently used
+    parse_source("3 + 3", "tree")
+    assert parse_source("1 + 1", "tree") is a
+    assert parse_source("2 + 2", "tree") is not b
+
+
+def test_worker_cache_is_per_engine():
+    init_worker("tree", False, ast_cache_size=4)
+    tree = parse_source("let a = 1; a", "tree")
+
+    assert parse_source("let a = 1; a", "slots") is not tree
+    assert parse_source("let a = 1; a", "tree") is tree
+
+
+def test_worker_cache_can_be_off():
+    init_worker("tree", False)
+
+    assert parse_source("1 + 1", "tree") is not parse_source("1 + 1", "tree")
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from frontend.parser import Parser
+from runtime.async_interpreter import AsyncInterpreter, evaluate_async
+from runtime.engines import create_env, execute
+from runtime.quota import QuotaExceeded
+
+# A 10000 element array of literals only.
+LITERAL_ARRAY = "[" + ", ".join(["1"] * 10000) + "]"
+
+
+def evaluate(source: str, limits: dict | None = None, **kwargs):
+    return asyncio.run(
+        evaluate_async(
+            Parser().produce_ast(source), create_env(limits=limits), **kwargs
+        )
+    )
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "let a = 2;\nconst p = { x: 1, y: a, z: { w: 7 } };\nlet s = p.x + p.z.w * a;\ns",
+        "let a = [1, 2, 3]; a * 2 + [1, 1, 1]",
+        "let z = 1; let w = { z }; w",
+        "let f = time; f = print; f",
+        # Deep input, well past the recursion limit
+        "let a = 1; " + "(" * 5000 + "a" + " * a)" * 5000,
+        "let o = { a: 1 }; let a = 0; " + "o[" * 3000 + "a" + "]" * 3000,
+        LITERAL_ARRAY + "[9999]",
+    ],
+)
+def test_matches_evaluate(source):
+    expected = execute(Parser().produce_ast(source), create_env(), "tree")
+
+    assert str(evaluate(source)) == str(expected)
+
+
+def test_yields_inside_literals():
+    interpreter = AsyncInterpreter(step_budget=100)
+    program = Parser().produce_ast(LITERAL_ARRAY)
+    asyncio.run(interpreter.evaluate(program, create_env()))
+
+    assert interpreter.yields == 100
+
+
+def test_timeout_interrupts_literals():
+    with pytest.raises(TimeoutError):
+        evaluate(LITERAL_ARRAY, step_budget=100, timeout=0)
+
+
+def test_quota_is_enforced():
+    with pytest.raises(QuotaExceeded):
+        evaluate(LITERAL_ARRAY, {"max_steps": 5000})
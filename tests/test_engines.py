@@ -0,0 +1,151 @@
+from math import copysign
+
+import pytest
+
+from frontend.parser import Parser
+from runtime.engines import ENGINES, create_env, execute
+
+# Programs every engine must agree on, errors included.
+CORPUS = [
+    "let foo = 40 / 2; foo",
+    "let x = 3; const y = 4; x = x * y + 2 - 1 % 5; x",
+    "const obj = { x: 100, y: 200, foo: 7, complex: { bar: true, }, }; obj",
+    "let a; a",
+    "(1 + 2) * (3 - 4) / 8",
+    "10 - 5 * 10",
+    "7 % 3 + 2 * (8 - 3) / 4 - 1",
+    "let z = 1; let w = { z }; w",
+    "let a = 1; let b = 2; b = a = 5; b + a",
+    "const k = 4; let m = k * 2 + 40 / 2; m * 1",
+    "const k = 3; let p = { k, j: k * k }; p",
+    "let x = 2; let y = x + (x = true); y * 1",
+    "let t = true; t + 1",
+    "let n = null; n * 2",
+    "let o = { a: 1 }; o * 1",
+    "let a = 2;\nconst p = { x: 1, y: a, z: { w: 7 } };\nlet s = p.x + p.z.w * a;\ns",
+    "let d = { k: 1, k: 5, j: 2, true: 3 };\nd.k * d[true] + d.j",
+    "let o = { a: { b: { c: { d: 4 } } } };\no.a.b.c.d + o.a.b.c.d",
+    "let o = { x: 1 };\nlet n = null;\nn.x",
+    "let a = [1, 2, 3]; a * 2 + [1, 1, 1]",
+    "const k = 3; [k, k * 2, k + 1][1]",
+    "let a = [1, 2]; a + [1, 2, 3]",
+    "let n = [5, 0 - 3, 2]; n % 4 - n * 0",
+    "let x = 5; x(1)",
+    "let f = time; f = print; f",
+    # Undeclared variables
+    "nope + 1",
+    "let a = 1; a = b",
+    "nope(1)",
+    # Constants and redeclarations
+    "const c = 1; c = 2;",
+    "const c = 1; let d = { c }; c = d;",
+    "let q = 1; let q = 2;",
+    # Division and modulo edge cases
+    "1 / 0",
+    "5 % 0",
+    "0 / 0",
+    "let z = 0; 1 / (z * (0 - 1))",
+    "let x = 0 * (0 - 1); x + 0",
+    "(0 - 7) % 3",
+    "7 % (0 - 3)",
+    "1 / 3 * 3",
+    "[1, 2] / [1, 0]",
+    "[4, 5] % 0",
+    "let z = [0, 1]; 1 / z",
+    # Deep input, well past the recursion limit for a recursive compiler
+    "let a = 1; " + " + ".join(["a"] * 500),
+    "let a = 2; let s = " + " - ".join(["a"] * 2000) + "; s",
+    "let a = 1; " + "(" * 1500 + "a" + " * a)" * 1500,
+    "let o = { a: 1 }; let a = 0; " + "o[" * 600 + "a" + "]" * 600,
+]
+
+
+def outcome(source: str, engine: str) -> str:
+    # The result, or the error raised, as text. Parsed per engine, the slots
+    # engine writes its resolved slots onto the AST.
+    try:
+        program = Parser().produce_ast(source)
+        return str(execute(program, create_env(engine), engine))
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+@pytest.mark.parametrize("source", CORPUS)
+def test_engines_agree(source):
+    outcomes = {engine: outcome(source, engine) for engine in ENGINES}
+
+    assert len(set(outcomes.values())) == 1, outcomes
+
+
+@pytest.mark.parametrize(
+    "source, error",
+    [
+        ("nope + 1", "ValueError: Cannot resolve <nope> as it does not exist."),
+        (
+            "const c = 1; c = 2;",
+            "ValueError: Cannot reassign to variable c as it was declared as constant.",
+        ),
+        (
+            "let q = 1; let q = 2;",
+            "ValueError: Cannot declare variable q as it is already defined.",
+        ),
+        ("1 / 0", "ZeroDivisionError: float division by zero"),
+        # "float modulo by zero" from Python 3.13 on
+        ("5 % 0", "ZeroDivisionError: float modulo"),
+        ("[4, 5] % 0", "ZeroDivisionError: Array % by zero."),
+    ],
+)
+def test_errors(source, error):
+    # Python's own messages differ between versions, only their start is pinned.
+    for engine in ENGINES:
+        assert outcome(source, engine).startswith(error), engine
+
+
+@pytest.mark.parametrize(
+    "source, value",
+    [
+        ("(0 - 7) % 3", 2.0),
+        ("7 % (0 - 3)", -2.0),
+        ("0 * (0 - 1)", -0.0),
+        ("let x = 0 * (0 - 1); x + 0", 0.0),
+        ("1 / 3 * 3", 1.0),
+    ],
+)
+def test_arithmetic_edge_cases(source, value):
+    for engine in ENGINES:
+        result = execute(Parser().produce_ast(source), create_env(engine), engine)
+        assert result.value == value, engine
+        assert copysign(1.0, result.value) == copysign(1.0, value), engine
+
+
+def run_in_turn(sources: list[str], engine: str) -> list:
+    # Programs run one after the other in one environment, like REPL lines.
+    env = create_env(engine)
+    outcomes = []
+    for source in sources:
+        try:
+            result = execute(Parser().produce_ast(source), env, engine)
+            outcomes.append(result.value)
+        except Exception as e:
+            outcomes.append(type(e).__name__)
+    return outcomes
+
+
+def test_failed_runs_leave_the_environment_usable():
+    sources = [
+        "let b = 3; let c = 1 / 0;",
+        "b + 1",
+        "c",
+        "let c = 4; c",
+    ]
+    for engine in ENGINES:
+        outcomes = run_in_turn(sources, engine)
+        assert outcomes == ["ZeroDivisionError", 4.0, "ValueError", 4.0], engine
+
+
+def test_failed_resolve_declares_nothing():
+    # The slots engine reports `nope` before running anything, `a` must not
+    # be left bound to an empty slot.
+    outcomes = run_in_turn(["let a = 1; nope", "a", "let a = 2; a"], "slots")
+
+    assert outcomes == ["ValueError", "ValueError", 2.0]
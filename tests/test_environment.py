@@ -0,0 +1,85 @@
+import pytest
+
+from frontend.parser import Parser
+from runtime.environment import MAX_SHARED_LAYERS, Environment
+from runtime.interpreter import evaluate
+from runtime.quota import Quota
+from runtime.values import MK_NATIVE_FN, MK_NUMBER
+
+
+def returning(number: float):
+    # A native returning `number`, whatever its arguments.
+    return MK_NATIVE_FN(lambda args, env: MK_NUMBER(number), f"returns{number:.0f}")
+
+
+def test_fork_of_a_child_scope_does_not_share_the_quota():
+    quota = Quota(max_bytes=10_000)
+    child = Environment(Environment(quota=quota))
+    child.declare_var("x", MK_NUMBER(1), False)
+
+    fork = child.fork()
+    assert child.quota is quota
+    assert fork.quota is None
+    assert fork.lookup_var("x").value == 1.0
+
+    own = Quota(max_bytes=10_000)
+    fork = child.fork(own)
+    fork.quota.charge_object(3)
+    assert own.bytes > 0
+    assert quota.bytes == 0
+
+
+def test_fork_writes_do_not_leak():
+    env = Environment()
+    env.declare_var("x", MK_NUMBER(1), False)
+    env.declare_var("c", MK_NUMBER(2), True)
+
+    fork = env.fork()
+    fork.assign_var("x", MK_NUMBER(10))
+    fork.declare_var("y", MK_NUMBER(3), False)
+    env.assign_var("x", MK_NUMBER(20))
+
+    assert fork.lookup_var("x").value == 10.0
+    assert env.lookup_var("x").value == 20.0
+    with pytest.raises(ValueError):
+        env.lookup_var("y")
+    with pytest.raises(ValueError):
+        fork.assign_var("c", MK_NUMBER(4))
+    with pytest.raises(ValueError):
+        fork.declare_var("x", MK_NUMBER(5), False)
+
+
+def test_shared_layers_are_merged():
+    env = Environment()
+    env.declare_var("n", MK_NUMBER(0), False)
+    forks = []
+    for i in range(MAX_SHARED_LAYERS * 3):
+        env.declare_var(f"v{i}", MK_NUMBER(i), False)
+        env.assign_var("n", MK_NUMBER(i))
+        forks.append(env.fork())
+        assert env.shared_depth() <= MAX_SHARED_LAYERS
+
+    assert env.lookup_var("n").value == MAX_SHARED_LAYERS * 3 - 1
+    for i, fork in enumerate(forks):
+        # Every fork still sees the bindings as they were when it was made.
+        assert fork.lookup_var("n").value == float(i)
+        assert fork.lookup_var(f"v{i}").value == float(i)
+        with pytest.raises(ValueError):
+            fork.lookup_var(f"v{i + 1}")
+
+
+@pytest.mark.parametrize("forked", [False, True])
+def test_assign_var_invalidates_cached_callees(forked):
+    env = Environment()
+    env.declare_var("f", returning(1), False)
+    if forked:
+        env.fork()  # f now lives in a shared layer
+    program = Parser().produce_ast("f()")
+    call = program.body[0]
+
+    assert evaluate(program, env).value == 1.0
+    assert call.cached_env == env.serial
+
+    env.assign_var("f", returning(2))
+    assert call.cached_env is None
+    assert evaluate(program, env).value == 2.0
@@ -0,0 +1,58 @@
+import random
+
+import pytest
+
+from frontend.incremental import IncrementalParser
+from frontend.parser import Parser
+
+SOURCE = """let foo = 40 / 2;
+const obj = { x: 100, y: foo, z: { w: 7 } };
+let s = obj.x + obj.z.w * foo;
+let a = [1, 2, s][1];
+s = (s - 1) % 3
+print(s, a)
+"""
+
+# Edits are built from these, some of them break the source.
+FRAGMENTS = [
+    "let ", "const ", "a", "foo", "1", "23", " ", "\n", ";", "=", "+", "*",
+    "(", ")", "{", "}", "[", "]", ":", ",", ".", "@", "let b = 2;\n",
+]  # fmt: skip
+
+
+def fresh(source: str) -> tuple[str, list]:
+    program, diagnostics = Parser().produce_ast_with_diagnostics(source)
+    return str(program), [(d.message, d.start, d.end) for d in diagnostics]
+
+
+def incremental(parser: IncrementalParser) -> tuple[str, list]:
+    diagnostics = parser.diagnostics()
+    return str(parser.program), [(d.message, d.start, d.end) for d in diagnostics]
+
+
+def random_edit(rng: random.Random, source: str) -> tuple[int, int, str]:
+    start = rng.randint(0, len(source))
+    end = min(start + rng.choice([0, 0, 1, 2, 5, 20]), len(source))
+    text = "".join(rng.choices(FRAGMENTS, k=rng.choice([0, 1, 1, 2, 3])))
+    return start, end, text
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_random_edits_match_a_fresh_parse(seed):
+    rng = random.Random(seed)
+    parser = IncrementalParser()
+    parser.update(SOURCE)
+    undo = []  # (start, end, text) edits reverting the ones made
+    for _ in range(200):
+        # Undoing half the time keeps the source mostly valid.
+        if undo and rng.random() < 0.6:
+            start, end, text = undo.pop()
+        else:
+            start, end, text = random_edit(rng, parser.source)
+            undo.append((start, start + len(text), parser.source[start:end]))
+        if rng.random() < 0.5:
+            parser.edit(start, end, text)
+        else:
+            parser.update(parser.source[:start] + text + parser.source[end:])
+
+        assert incremental(parser) == fresh(parser.source), parser.source
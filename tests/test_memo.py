@@ -0,0 +1,39 @@
+from runtime.memo import CallMemo
+from runtime.values import MK_NATIVE_FN, MK_NUMBER
+
+
+def counting_native():
+    # A pure native returning its argument plus one, and its list of calls.
+    calls = []
+
+    def call(args, env):
+        calls.append(args[0].value)
+        return MK_NUMBER(args[0].value + 1)
+
+    return MK_NATIVE_FN(call, "inc", pure=True), calls
+
+
+def test_hits_and_evicts_the_least_recently_used():
+    memo = CallMemo(capacity=2)
+    inc, calls = counting_native()
+    for number in (1.0, 2.0, 1.0, 3.0, 1.0, 2.0):
+        assert memo.call(inc, [MK_NUMBER(number)], None).value == number + 1
+
+    assert calls == [1.0, 2.0, 3.0, 2.0]
+    stats = memo.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"]) == (2, 4, 2)
+
+
+def test_nan_arguments_are_not_memoized():
+    memo = CallMemo(capacity=2)
+    inc, calls = counting_native()
+    memo.call(inc, [MK_NUMBER(1.0)], None)
+    for _ in range(3):
+        memo.call(inc, [MK_NUMBER(float("nan"))], None)
+
+    # The NaN calls run every time without evicting what can still hit.
+    assert memo.call(inc, [MK_NUMBER(1.0)], None).value == 2.0
+    assert len(calls) == 4
+    stats = memo.stats()
+    assert (stats["size"], stats["hits"], stats["skipped"]) == (1, 1, 3)
+    assert stats["evictions"] == 0
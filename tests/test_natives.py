@@ -0,0 +1,27 @@
+from frontend.parser import Parser
+from runtime.engines import ENGINES, create_env, execute
+from runtime.values import MK_NATIVE_FN, MK_NUMBER
+
+
+def native_three(args, env):
+    return MK_NUMBER(3)  # an int, not 3.0
+
+
+def run(source: str, engine: str):
+    env = create_env(engine)
+    env.declare_var("three", MK_NATIVE_FN(native_three, "three"), True)
+    env.declare_var("zero", MK_NATIVE_FN(lambda args, env: MK_NUMBER(), "zero"), True)
+    return execute(Parser().produce_ast(source), env, engine)
+
+
+def test_int_returning_native_is_a_number_on_every_engine():
+    for engine in ENGINES:
+        result = run("let x = three(); x + 1 + zero() * three()", engine)
+        assert result.type == "number", engine
+        assert result.value == 4.0 and type(result.value) is float, engine
+
+
+def test_mk_number_stores_floats():
+    assert type(MK_NUMBER(3).value) is float
+    assert type(MK_NUMBER().value) is float
+    assert MK_NUMBER(3) is MK_NUMBER(3.0)  # ints are interned like floats
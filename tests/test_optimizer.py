@@ -0,0 +1,112 @@
+from math import copysign
+
+import pytest
+
+from frontend.parser import Parser
+from runtime.engines import ENGINES, create_env, execute
+from runtime.optimizer import Optimizer
+
+
+def optimized(source: str) -> tuple:
+    # The last statement after optimizing, and the optimizer for its counters.
+    optimizer = Optimizer()
+    program = optimizer.optimize(Parser().produce_ast(source))
+    return program.body[-1], optimizer
+
+
+def outcome(source: str, engine: str, optimize: bool) -> str:
+    try:
+        program = Parser().produce_ast(source)
+        if optimize:
+            program = Optimizer().optimize(program)
+        return str(execute(program, create_env(engine), engine))
+    except Exception as e:
+        return f"{type(e).__name__}: {e}"
+
+
+@pytest.mark.parametrize(
+    "source, value",
+    [
+        ("40 / 2", 20.0),
+        ("(1 + 2) * (3 - 4) / 8", -0.375),
+        ("const k = 4; k * 2 + 40 / 2", 28.0),
+        ("const k = 3; k * k", 9.0),
+    ],
+)
+def test_folds_constants(source, value):
+    node, optimizer = optimized(source)
+
+    assert node.kind == "NumericLiteral"
+    assert node.value == value
+    assert optimizer.folded > 0
+
+
+@pytest.mark.parametrize(
+    "source, symbol",
+    [
+        ("let x = 3; x * 1", "x"),
+        ("let x = 3; 1 * x", "x"),
+        ("let x = 3; x / 1", "x"),
+        ("let x = 3; x - 0", "x"),
+    ],
+)
+def test_simplifies_identities_on_numbers(source, symbol):
+    node, _ = optimized(source)
+
+    assert node.kind == "Identifier"
+    assert node.symbol == symbol
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        # x + 0 is -0.0 + 0 == 0.0 for x = -0.0, not x
+        "let x = 0 * (0 - 1); x + 0",
+        # Not known to be numbers
+        "let n = null; n * 1",
+        "let o = { a: 1 }; o - 0",
+        "let a = [1, 2]; a * 1",
+        "let x = 3; x = null; x * 1",
+        # Left to fail at runtime
+        "1 / 0",
+        "5 % 0",
+    ],
+)
+def test_leaves_the_rest_alone(source):
+    node, _ = optimized(source)
+
+    assert node.kind == "BinaryExpr"
+
+
+def test_keeps_negative_zero():
+    for engine in ENGINES:
+        program = Optimizer().optimize(
+            Parser().produce_ast("let x = 0 * (0 - 1); x + 0")
+        )
+        result = execute(program, create_env(engine), engine)
+        assert copysign(1.0, result.value) == 1.0, engine
+
+
+@pytest.mark.parametrize(
+    "source",
+    [
+        "let foo = 40 / 2; foo",
+        "const k = 4; let m = k * 2 + 40 / 2; m * 1",
+        "const k = 3; let p = { k, j: k * k }; p",
+        "let x = 2; let y = x + (x = true); y * 1",
+        "let x = 5; x = x * 1 - 0; x",
+        "let n = null; n * 1",
+        "const k = 3; [k, k * 2, k + 1][1]",
+        "let x = 0 * (0 - 1); x + 0",
+        "1 / 0",
+        "const c = 1; c = 2;",
+    ],
+)
+def test_optimized_programs_behave_the_same(source):
+    outcomes = {
+        (engine, optimize): outcome(source, engine, optimize)
+        for engine in ENGINES
+        for optimize in (False, True)
+    }
+
+    assert len(set(outcomes.values())) == 1, outcomes
@@ -0,0 +1,73 @@
+import pytest
+
+from frontend.parser import Parser
+from runtime.engines import create_env, execute
+from runtime.quota import (
+    ARRAY_BYTES,
+    ELEMENT_BYTES,
+    OBJECT_BYTES,
+    PROPERTY_BYTES,
+    Quota,
+    QuotaExceeded,
+)
+
+
+def run(source: str, **limits):
+    # The tree engine is the one enforcing quotas.
+    env = create_env("tree", limits)
+    execute(Parser().produce_ast(source), env, "tree")
+    return env.quota
+
+
+def test_charges():
+    quota = Quota()
+    quota.charge_object(3)
+    assert quota.bytes == OBJECT_BYTES + 3 * PROPERTY_BYTES
+
+    quota.charge_array(5)
+    assert quota.bytes == OBJECT_BYTES + 3 * PROPERTY_BYTES + ARRAY_BYTES + 40
+    assert ELEMENT_BYTES == 8  # unboxed doubles
+
+
+@pytest.mark.parametrize(
+    "source, charged",
+    [
+        ("let a = 1; a + 2", 0),
+        ("{ a: 1, b: 2 }", OBJECT_BYTES + 2 * PROPERTY_BYTES),
+        ("let a = 1; { a, b: { c: a } }", 2 * OBJECT_BYTES + 3 * PROPERTY_BYTES),
+        ("[1, 2, 3]", ARRAY_BYTES + 3 * ELEMENT_BYTES),
+        # The literal, then the array the multiplication makes
+        ("[1, 2] * 2", 2 * (ARRAY_BYTES + 2 * ELEMENT_BYTES)),
+        ("let a = [1, 2]; a + a + a", 3 * (ARRAY_BYTES + 2 * ELEMENT_BYTES)),
+    ],
+)
+def test_scripts_are_charged_for_what_they_allocate(source, charged):
+    assert run(source).bytes == charged
+
+
+def test_memory_limit():
+    size = OBJECT_BYTES + 2 * PROPERTY_BYTES
+    # Up to the limit is fine
+    assert run("{ a: 1, b: 2 }", max_bytes=size).bytes == size
+    with pytest.raises(QuotaExceeded, match="Memory limit"):
+        run("{ a: 1, b: 2 }", max_bytes=size - 1)
+    with pytest.raises(QuotaExceeded, match="Memory limit"):
+        run("let a = [1, 2, 3, 4]; a * a", max_bytes=ARRAY_BYTES * 2)
+
+
+def test_property_limit():
+    run("{ a: 1, b: 2 }", max_properties=2)
+    with pytest.raises(QuotaExceeded, match="properties"):
+        run("{ a: 1, b: 2, c: 3 }", max_properties=2)
+
+
+def test_step_and_depth_limits():
+    quota = run("1 + 2 * 3")
+    steps = quota.steps
+    assert quota.depth == 0
+
+    run("1 + 2 * 3", max_steps=steps)
+    with pytest.raises(QuotaExceeded, match="Step limit"):
+        run("1 + 2 * 3", max_steps=steps - 1)
+    with pytest.raises(QuotaExceeded, match="depth"):
+        run("let a = 1; " + "(" * 50 + "a" + " + a)" * 50, max_depth=20)
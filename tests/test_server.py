@@ -0,0 +1,56 @@
+import asyncio
+import json
+
+import pytest
+
+from runtime.engines import ENGINES
+from runtime.server import INVALID_REQUEST, create_executor, handle_line, run_load_test
+
+SOURCE = "let a = 40 / 2; const b = { x: a }; b.x * 2 + a"
+
+
+def request(id: int, source: str, engine: str | None = None) -> str:
+    params = {"source": source}
+    if engine is not None:
+        params["engine"] = engine
+    return json.dumps(
+        {"jsonrpc": "2.0", "id": id, "method": "evaluate", "params": params}
+    )
+
+
+def evaluate_lines(lines: list[str]) -> list[dict]:
+    # One warm in-process worker answers every line, like `--workers 1`.
+    executor = create_executor("tree", False, 1, 16)
+
+    async def run():
+        return [await handle_line(line, executor) for line in lines]
+
+    return asyncio.run(run())
+
+
+def test_same_source_on_mixed_engines():
+    # The slots engine resolves the cached AST, the other engines must not
+    # get that resolved AST back for the same source.
+    engines = ["slots", *ENGINES, "slots", "closure", "vm", "tree"]
+    responses = evaluate_lines(
+        [request(id, SOURCE, engine) for id, engine in enumerate(engines)]
+    )
+
+    for id, response in enumerate(responses):
+        assert response["id"] == id
+        assert response.get("result") == {"type": "number", "value": 60.0}, response
+
+
+def test_unknown_engine_is_an_invalid_request():
+    response = evaluate_lines([request(1, SOURCE, "closures")])[0]
+
+    assert response["id"] == 1
+    assert response["error"]["code"] == INVALID_REQUEST
+    assert "closures" in response["error"]["message"]
+
+
+@pytest.mark.parametrize("requests, connections", [(0, 4), (10, 0)])
+def test_load_test_needs_requests_and_connections(requests, connections):
+    # Rejected before connecting, the socket does not exist.
+    with pytest.raises(ValueError):
+        asyncio.run(run_load_test("/nonexistent.sock", requests, connections))
@@ -0,0 +1,49 @@
+import asyncio
+import json
+
+from runtime.batch import run_batch
+from runtime.worker import init_worker, run_source, run_source_async
+
+PRINTS_THEN_FAILS = "let x = print(1); nope"
+NOPE = "ValueError: Cannot resolve <nope> as it does not exist."
+
+
+def test_output_does_not_replace_the_error():
+    init_worker("tree", False)
+    outcome = run_source(PRINTS_THEN_FAILS)
+
+    assert outcome["ok"] is False
+    assert outcome["error"] == NOPE
+    assert outcome["stdout"] == "[NumberVal] <value: 1.0, type: number>\n"
+
+
+def test_output_is_kept_on_success():
+    init_worker("tree", False)
+    for engine in ("tree", "vm"):
+        outcome = run_source("print(2)\n3", engine)
+
+        assert outcome["ok"] is True
+        assert outcome["result"] == 3.0
+        assert outcome["stdout"] == "[NumberVal] <value: 2.0, type: number>\n"
+
+
+def test_async_run_captures_output(capsys):
+    init_worker("tree", False)
+    outcome = asyncio.run(run_source_async(PRINTS_THEN_FAILS))
+
+    assert outcome["error"] == NOPE
+    assert outcome["stdout"] == "[NumberVal] <value: 1.0, type: number>\n"
+    assert capsys.readouterr().out == ""
+
+
+def test_batch_reports_the_error_of_a_script_that_printed(tmp_path, capsys):
+    (tmp_path / "one.txt").write_text("40 / 2")
+    (tmp_path / "two.txt").write_text("print(7)\nnope")
+
+    assert run_batch(str(tmp_path), workers=1) is False
+
+    one, two = map(json.loads, capsys.readouterr().out.splitlines())
+    assert one["ok"] is True and one["result"] == 20.0
+    assert two["ok"] is False
+    assert two["error"] == NOPE
+    assert two["stdout"] == "[NumberVal] <value: 7.0, type: number>\n"
@@ -1,6 +1,58 @@
+import builtins
+import os
+import re
+import sys
+
+
 def value_print(class_name: str, value, type) -> str:
     # ? Remove class_name maybe, lowkey looks ugly
     return f"[{class_name}] <value: {value}, type: {type}>"
 
 
+# rich markup tags like [bold], [/cyan] or [bold red]. Value prints such as
+# [NumberVal] start with a capital letter, rich leaves those alone too.
+MARKUP_TAG = re.compile(r"\[/?[a-z][a-z #]*\]")
+
+_rich_print = None
+
+
+def wants_color(file) -> bool:
+    if os.environ.get("NO_COLOR"):
+        return False
+    return hasattr(file, "isatty") and file.isatty()
+
+
+def print(*objects, sep=" ", end="\n", file=None, flush=False):
+    """
+    Drop-in for `rich.print`. rich is only imported the first time something
+    is printed to a terminal, piped or redirected output is written as plain
+    text with the markup stripped, so short scripts never pay for the import.
+    """
+    global _rich_print
+    stream = sys.stdout if file is None else file
+
+    if wants_color(stream):
+        if _rich_print is None:
+            try:
+                from rich import print as rich_print
+            except ImportError:
+                rich_print = False  # not installed, always print plain text
+            _rich_print = rich_print
+
+        if _rich_print:
+            _rich_print(*objects, sep=sep, end=end, file=file, flush=flush)
+            return
+
+    builtins.print(
+        *(
+            MARKUP_TAG.sub("", obj) if isinstance(obj, str) else obj
+            for obj in objects
+        ),
+        sep=sep,
+        end=end,
+        file=stream,
+        flush=flush,
+    )
+
+
 #! TODO: ADD ERROR SHIT
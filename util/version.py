@@ -0,0 +1,2 @@
+# Interpreter version, shown in the banner and part of the AST cache key.
+VERSION = "0.0.1"